@@ -45,6 +45,11 @@ MINERS_PER_PAGE = 3
 # Example: 56 = 8-week cycle
 MAINTENANCE_CYCLE_DAYS = 56
 
+# Lightweight kiosk page (http://<server-ip>:8788/kiosk) for Pi 3s and cheap tablets:
+# plain table, canvas ticker, no CSS animations, paused while the screen is hidden
+KIOSK_REFRESH_SECONDS = 15
+KIOSK_TICKER_FPS = 24
+
 # ------------------------------------------------------------
 # MINERS (EDIT THESE)
 # ------------------------------------------------------------
@@ -106,6 +111,34 @@ CUSTOM_MINING_RULES = [
     # {"host_contains": "mining.example.com", "port": 6666, "coin": "DGB"},
 ]
 
+# ------------------------------------------------------------
+# UPSTREAM API BASE URLS (ADVANCED)
+# ------------------------------------------------------------
+# Leave these alone for normal use.
+# To test the coin pipeline offline, run mock_upstreams.py and point these at it,
+# e.g. COINGECKO_BASE_URL = "http://127.0.0.1:8799/api/v3"
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+WHATTOMINE_BASE_URL = "https://whattomine.com"
+KRYPTEX_BASE_URL = "https://pool.kryptex.com"
+CASPLORER_BASE_URL = "https://casplorer.com/api"
+# logo image hosts (fallback and fixed logos; live CoinGecko logos come from its API)
+COINGECKO_ASSETS_BASE_URL = "https://assets.coingecko.com"
+COINMARKETCAP_STATIC_BASE_URL = "https://s2.coinmarketcap.com"
+CASCOIN_BASE_URL = "https://cascoin.net"
+
+# ------------------------------------------------------------
+# MINER RESTARTS
+# ------------------------------------------------------------
+# Weekly rollover restarts miners in small batches so the farm never drops to 0 H/s.
+# Each batch must come back online before the next one is restarted.
+RESTART_MINERS_ON_ROLLOVER = True
+RESTART_BATCH_SIZE = 2            # miners restarted per batch
+RESTART_CONCURRENCY = 2           # parallel restart/verify calls within a batch
+RESTART_ONLINE_TIMEOUT_SECONDS = 180
+
+# Allow POST /restart_miners from the dashboard network (off by default)
+RESTART_API_ENABLED = False
+
 # Web server settings
 HOST = "0.0.0.0"
 PORT = 8788
@@ -118,10 +151,27 @@ from flask import Flask, jsonify, Response, request
 import time
 import threading
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import json
 import re
+import hashlib
+import bisect
+import heapq
+import random
+import math
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+try:
+    import numpy as np   # optional: vectorised fleet scoring
+except ImportError:
+    np = None
 
 app = Flask(__name__)
 
@@ -134,12 +184,17 @@ WEEKLY_CURRENT_FILE = os.path.join(BASE_DIR, "weekly_current.json")
 MOTW_FILE = os.path.join(BASE_DIR, "miner_of_week.json")
 MAINT_FILE = os.path.join(BASE_DIR, "maintenance.json")
 
+COIN_HISTORY_FILE = os.path.join(BASE_DIR, "coin_history.json")
+WEEK_ARCHIVE_FILE = os.path.join(BASE_DIR, "weeks_archive.json")
+
 # notifications persistence (stacked popups + cross-device clearing)
 NOTIFS_FILE = os.path.join(BASE_DIR, "notifications.json")
+DISCORD_OUTBOX_FILE = os.path.join(BASE_DIR, "discord_outbox.json")
 
 IP_TO_LABEL = {cfg["ip"]: cfg.get("label", name) for name, cfg in MINERS.items()}
 
 miners_state = {}
+first_poll_done = threading.Event()   # set once miners_state holds a full poll
 last_block_popup = None  # {"miner": "...", "ts_unix": int, "is_test": bool}
 
 _blocks_lock = threading.Lock()
@@ -155,18 +210,60 @@ _coin_lock = threading.Lock()
 coin_state = {sym: {"price_gbp": None, "diff": None} for sym in COIN_ORDER}
 coin_last_ok_unix = None
 coin_last_err = None
+coin_sources = {}  # source -> {"ok", "err", "ms", "cache", "last_ok_unix"} from the last refresh
+
+# compact per-coin history: one [ts_unix, price, diff] point per COIN_HISTORY_STEP_SECONDS bucket
+_coin_hist_lock = threading.Lock()
+coin_history = {sym: [] for sym in COIN_ORDER}
+coin_trends = {sym: {} for sym in COIN_ORDER}  # precomputed deltas + trend per coin
 
 _logo_lock = threading.Lock()
 coin_logos = {sym: None for sym in COIN_ORDER}
 logos_last_ok_unix = None
 logos_last_err = None
 
+# known-good logos, tried after the live CoinGecko ones: (host, path) where host is
+# one of the logo base URLs in the config section (see logo_url())
+FALLBACK_LOGOS = {
+    "BTC": [("coingecko", "coins/images/1/large/bitcoin.png")],
+    "BCH": [("coingecko", "coins/images/780/large/bitcoin-cash-circle.png")],
+    "FB":  [("coingecko", "coins/images/37001/large/fractal-bitcoin.png")],
+    "DGB": [("coingecko", "coins/images/63/large/digibyte.png")],
+    "CAS": [("cascoin", "assets/logo.CIwpWNZk_Z1m8T3m.webp")],
+    "QUAI": [
+        ("coinmarketcap", "static/img/coins/64x64/22354.png"),
+        ("coingecko", "coins/images/27928/standard/QuaiLogoFinal.png?1696526947"),
+    ],
+    "XEC": [("coingecko", "coins/images/16646/large/Logo_Final-21.png")],
+}
+
+def logo_url(host: str, path: str):
+    """Absolute URL for a (host, path) logo, built from the configured base URLs."""
+    base = {
+        "coingecko": COINGECKO_ASSETS_BASE_URL,
+        "coinmarketcap": COINMARKETCAP_STATIC_BASE_URL,
+        "cascoin": CASCOIN_BASE_URL,
+    }[host]
+    return str(base or "").rstrip("/") + "/" + path.lstrip("/")
+
+def fallback_logo_urls(sym: str):
+    return [logo_url(host, path) for host, path in FALLBACK_LOGOS.get(sym, [])]
+
+# local logo proxy cache (/logo/<sym>)
+LOGO_CACHE_DIR = os.path.join(BASE_DIR, "logo_cache")
+LOGO_INDEX_FILE = os.path.join(LOGO_CACHE_DIR, "index.json")
+_logo_file_lock = threading.Lock()
+logo_files = {}  # sym -> {"file", "content_type", "etag", "url", "fetched_unix"}
+
 _last_seen_lock = threading.Lock()
 last_seen_ts = {}  # keyed by display name (hostname/label), ephemeral
 
 _weekly_lock = threading.Lock()
 weekly_best = {"prev_name": None, "prev_value": None, "prev_str": None}
 weekly_current = {}  # { ip: numeric best diff for THIS week }
+weekly_agg = {}      # { ip: streaming weekly accumulators, see _update_weekly_agg() }
+carried_best = {}    # { ip: [last week's session best, rollover unix] } until the miner reboots
+_weekly_agg_saved_unix = 0
 
 _uptime_lock = threading.Lock()
 last_uptime_seen = {}  # keyed by IP -> int uptime seconds last seen
@@ -344,7 +441,7 @@ def _safe_read_json(path: str):
     except Exception:
         return None
 
-def _safe_write_json(path: str, obj):
+def _safe_write_json(path: str, obj, indent=2):
     tmp = path + ".tmp"
     bak = path + ".bak"
     try:
@@ -358,7 +455,7 @@ def _safe_write_json(path: str, obj):
                 pass
 
         with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(obj, f, ensure_ascii=False, indent=2)
+            json.dump(obj, f, ensure_ascii=False, indent=indent, separators=None if indent else (",", ":"))
         os.replace(tmp, path)
         return True
     except Exception:
@@ -613,10 +710,12 @@ def _save_weekly_best():
     _safe_write_json(WEEKLY_BEST_FILE, weekly_best)
 
 def _load_weekly_current():
-    global weekly_current
+    global weekly_current, weekly_agg, carried_best
     data = _safe_read_json(WEEKLY_CURRENT_FILE) or _safe_read_json(WEEKLY_CURRENT_FILE + ".bak")
     if not isinstance(data, dict):
         weekly_current = {}
+        weekly_agg = {}
+        carried_best = {}
         return
 
     stored_week = data.get("week_start_unix")
@@ -630,6 +729,8 @@ def _load_weekly_current():
     if stored_week_int is not None and isinstance(week_start_unix, (int, float)):
         if int(week_start_unix) != stored_week_int:
             weekly_current = {}
+            weekly_agg = {}
+            carried_best = {}
             return
 
     cleaned = {}
@@ -640,9 +741,98 @@ def _load_weekly_current():
             continue
     weekly_current = cleaned
 
+    aggs = data.get("aggregates") if isinstance(data.get("aggregates"), dict) else {}
+    cleaned_agg = {}
+    for k, v in aggs.items():
+        if not isinstance(v, dict):
+            continue
+        a = _new_weekly_agg()
+        for field in a:
+            val = v.get(field)
+            if isinstance(val, (int, float)):
+                a[field] = float(val)
+        cleaned_agg[str(k)] = a
+    weekly_agg = cleaned_agg
+
+    carried = data.get("carried_best") if isinstance(data.get("carried_best"), dict) else {}
+    cleaned_carried = {}
+    for k, v in carried.items():
+        try:
+            cleaned_carried[str(k)] = [float(v[0]), int(v[1])]
+        except Exception:
+            continue
+    carried_best = cleaned_carried
+
 def _save_weekly_current():
-    obj = {"week_start_unix": week_start_unix, "current": weekly_current}
+    global _weekly_agg_saved_unix
+    obj = {"week_start_unix": week_start_unix, "current": weekly_current, "aggregates": weekly_agg,
+           "carried_best": carried_best}
     _safe_write_json(WEEKLY_CURRENT_FILE, obj)
+    _weekly_agg_saved_unix = int(time.time())
+
+def _new_weekly_agg():
+    return {
+        "observed_seconds": 0.0,   # time the dashboard was polling this miner
+        "online_seconds": 0.0,     # ... of which the miner answered
+        "hr_ths_seconds": 0.0,     # integral of hashrate over online time (TH/s * s)
+        "hr_seconds": 0.0,         # online time with a hashrate reading
+        "shares_accepted": 0.0,    # accepted shares this week (reset-safe deltas)
+        "shares_rejected": 0.0,
+        "max_diff": 0.0,
+        "samples": 0.0,
+        "last_poll_unix": None,
+        "last_accepted": None,
+        "last_rejected": None,
+    }
+
+def _counter_delta(cur, prev):
+    """Delta between two lifetime counters; a drop means the miner restarted and counts from 0."""
+    if cur is None or prev is None:
+        return 0.0
+    return cur - prev if cur >= prev else cur
+
+def _update_weekly_agg(ip: str, now_unix: int, online: bool, ths, accepted, rejected, best_diff):
+    """
+    O(1) per poll. Call with _weekly_lock held.
+    Gaps longer than a few poll intervals (dashboard down) are not counted as observed time.
+    """
+    a = weekly_agg.get(ip)
+    if a is None:
+        a = weekly_agg[ip] = _new_weekly_agg()
+
+    max_gap = max(30, 3 * int(REFRESH_SECONDS))
+    last = a.get("last_poll_unix")
+    dt = float(now_unix - last) if last is not None and 0 < now_unix - last <= max_gap else 0.0
+    a["last_poll_unix"] = now_unix
+    a["samples"] += 1
+    a["observed_seconds"] += dt
+
+    if not online:
+        return
+
+    a["online_seconds"] += dt
+    try:
+        hr = float(ths) if ths is not None else None
+    except Exception:
+        hr = None
+    if hr is not None:
+        a["hr_ths_seconds"] += hr * dt
+        a["hr_seconds"] += dt
+
+    for field, raw in (("accepted", accepted), ("rejected", rejected)):
+        try:
+            cur = float(raw) if raw is not None else None
+        except Exception:
+            cur = None
+        if cur is None:
+            continue
+        # after a gap only re-base the counter: those shares have no observed time
+        if dt > 0:
+            a[f"shares_{field}"] += _counter_delta(cur, a.get(f"last_{field}"))
+        a[f"last_{field}"] = cur
+
+    if best_diff is not None and best_diff > a["max_diff"]:
+        a["max_diff"] = float(best_diff)
 
 def _load_motw():
     global motw
@@ -675,10 +865,483 @@ def _load_maintenance():
         _safe_write_json(MAINT_FILE, {"base_unix": maintenance_base_unix})
 
 
+# =========================
+# SHARE RATES
+# =========================
+
+# Windowed accepted/rejected share rates per miner. Each window is a ring of
+# fixed time buckets with a running sum, so a poll is O(1) and memory is fixed.
+SHARE_RATE_WINDOWS = {
+    "5m": (30, 10),       # bucket seconds, buckets
+    "1h": (60, 60),
+    "24h": (900, 96),
+}
+
+_rates_lock = threading.Lock()
+share_rates = {}   # ip -> {"last_poll_unix", "last_accepted", "last_rejected", "since_unix", "w": {window: ring}}
+
+def _new_rate_ring(bucket_s, n):
+    return {"head": None, "acc": [0.0] * n, "rej": [0.0] * n, "sum_acc": 0.0, "sum_rej": 0.0}
+
+def _new_share_rates(now_unix):
+    return {
+        "last_poll_unix": None,
+        "last_accepted": None,
+        "last_rejected": None,
+        "since_unix": now_unix,
+        "w": {k: _new_rate_ring(b, n) for k, (b, n) in SHARE_RATE_WINDOWS.items()},
+    }
+
+def _ring_add(ring, bucket_s, n, now_unix, d_acc, d_rej):
+    idx = int(now_unix // bucket_s)
+    head = ring["head"]
+    if head is None:
+        head = idx
+    elif idx > head:
+        # clear the buckets that fell out of the window (at most n)
+        for k in range(1, min(idx - head, n) + 1):
+            slot = (head + k) % n
+            ring["sum_acc"] -= ring["acc"][slot]
+            ring["sum_rej"] -= ring["rej"][slot]
+            ring["acc"][slot] = 0.0
+            ring["rej"][slot] = 0.0
+        head = idx
+    ring["head"] = head
+    slot = head % n
+    ring["acc"][slot] += d_acc
+    ring["rej"][slot] += d_rej
+    ring["sum_acc"] += d_acc
+    ring["sum_rej"] += d_rej
+
+def update_share_rates(ip: str, now_unix: int, online: bool, accepted, rejected):
+    """O(1) per poll. Counter drops (miner reboot) count from 0 like the weekly aggregates."""
+    try:
+        acc = float(accepted) if accepted is not None else None
+        rej = float(rejected) if rejected is not None else None
+    except Exception:
+        acc = rej = None
+    if not online or acc is None:
+        return
+
+    with _rates_lock:
+        st = share_rates.get(ip)
+        max_gap = max(30, 3 * int(REFRESH_SECONDS))
+        last = st.get("last_poll_unix") if st else None
+        if st is None:
+            st = share_rates[ip] = _new_share_rates(now_unix)
+        if last is None or not (0 <= now_unix - last <= max_gap):
+            # first sight, a reboot or the dashboard was away: shares in the gap can't be
+            # placed in time, so only re-base the counters and keep the windows
+            st["last_poll_unix"] = now_unix
+            st["last_accepted"] = acc
+            st["last_rejected"] = rej
+            return
+
+        d_acc = _counter_delta(acc, st["last_accepted"])
+        d_rej = _counter_delta(rej, st["last_rejected"]) if rej is not None else 0.0
+        st["last_poll_unix"] = now_unix
+        st["last_accepted"] = acc
+        if rej is not None:
+            st["last_rejected"] = rej
+
+        for k, (b, n) in SHARE_RATE_WINDOWS.items():
+            _ring_add(st["w"][k], b, n, now_unix, d_acc, d_rej)
+
+def share_rates_for(ip: str, now_unix: int = None):
+    """{window: {"acc_per_min", "rej_per_min", "reject_pct", "seconds"}} or {} if not enough data."""
+    if now_unix is None:
+        now_unix = int(time.time())
+    with _rates_lock:
+        st = share_rates.get(ip)
+        if not st:
+            return {}
+        out = {}
+        for k, (b, n) in SHARE_RATE_WINDOWS.items():
+            ring = st["w"][k]
+            head = ring["head"]
+            if head is None:
+                continue
+            # the window ends now, not at the last poll: an offline miner stops
+            # updating its ring, so buckets older than now - b*n are skipped here
+            first_idx = int(now_unix // b) - n + 1
+            if head < first_idx:
+                continue
+            window_start = max(first_idx * b, st["since_unix"])
+            secs = min(float(now_unix - window_start), float(b * n))
+            if secs <= 0:
+                continue
+            if first_idx <= head - n + 1:
+                acc, rej = ring["sum_acc"], ring["sum_rej"]
+            else:
+                acc = rej = 0.0
+                for idx in range(first_idx, head + 1):
+                    acc += ring["acc"][idx % n]
+                    rej += ring["rej"][idx % n]
+            acc = max(0.0, acc)
+            rej = max(0.0, rej)
+            total = acc + rej
+            out[k] = {
+                "acc_per_min": round(acc * 60.0 / secs, 3),
+                "rej_per_min": round(rej * 60.0 / secs, 3),
+                "reject_pct": round(rej * 100.0 / total, 3) if total > 0 else None,
+                "seconds": int(secs),
+            }
+        return out
+
+
+# =========================
+# FARM AGGREGATES
+# =========================
+
+# Farm-wide totals for the ticker, kept up to date as each miner's sample
+# changes: running sums (subtract old sample, add new) plus a max-heap of
+# temperatures with lazy deletion. Every screen gets the same numbers.
+_farm_lock = threading.Lock()
+_farm_samples = {}   # ip -> {"ver", "online", "ths", "power_w", "temps", "blocks"}
+_farm_sums = {
+    "miners": 0, "active": 0,
+    "ths_sum": 0.0, "ths_n": 0,
+    "power_sum": 0.0, "power_n": 0,
+    "temp_sum": 0.0, "temp_n": 0,
+    "blocks_sum": 0, "blocks_n": 0,
+}
+_farm_temp_heap = []   # (-temp_c, ip, ver); stale when ver != _farm_samples[ip]["ver"]
+_farm_ver = 0
+
+def miner_power_watts(m):
+    """Power from the miner's reported watts (summed if per-chain), else voltage * current."""
+    raw_power = m.get("power_raw")
+    power_w = None
+    try:
+        if isinstance(raw_power, (list, tuple)):
+            vals = [float(x) for x in raw_power if x is not None]
+            if vals:
+                power_w = sum(vals)
+        elif raw_power is not None:
+            power_w = float(raw_power)
+    except Exception:
+        power_w = None
+
+    if power_w is None:
+        v = m.get("voltage")
+        a = m.get("currentA")
+        try:
+            if v is not None and a is not None:
+                v_f = float(v)
+                a_f = float(a)
+                if v_f > 0 and a_f > 0:
+                    power_w = v_f * a_f
+        except Exception:
+            power_w = None
+    return power_w
+
+def _farm_num(v):
+    try:
+        f = float(v)
+        return f if math.isfinite(f) else None
+    except Exception:
+        return None
+
+def _farm_apply(sample, sign):
+    fs = _farm_sums
+    fs["miners"] += sign
+    fs["active"] += sign if sample["online"] else 0
+    if sample["ths"] is not None:
+        fs["ths_sum"] += sign * sample["ths"]
+        fs["ths_n"] += sign
+    if sample["power_w"] is not None:
+        fs["power_sum"] += sign * sample["power_w"]
+        fs["power_n"] += sign
+    for t in sample["temps"]:
+        fs["temp_sum"] += sign * t
+        fs["temp_n"] += sign
+    if sample["blocks"] is not None:
+        fs["blocks_sum"] += sign * sample["blocks"]
+        fs["blocks_n"] += sign
+
+def update_farm_sample(ip: str, m: dict):
+    """O(log n) per miner per poll."""
+    global _farm_ver
+    power_w = miner_power_watts(m)
+    sample = {
+        "online": bool(m.get("online")),
+        "ths": _farm_num(m.get("hashrate_ths")),
+        "power_w": power_w if power_w is not None and power_w > 0 else None,
+        "temps": tuple(t for t in (_farm_num(m.get("asic_temp")), _farm_num(m.get("vr_temp"))) if t is not None),
+        "blocks": int(m["blocks"]) if _farm_num(m.get("blocks")) is not None and m["blocks"] >= 0 else None,
+    }
+    with _farm_lock:
+        old = _farm_samples.get(ip)
+        if old is not None:
+            if all(old[k] == sample[k] for k in sample):
+                return
+            _farm_apply(old, -1)
+        _farm_ver += 1
+        sample["ver"] = _farm_ver
+        _farm_samples[ip] = sample
+        _farm_apply(sample, +1)
+        for t in sample["temps"]:
+            heapq.heappush(_farm_temp_heap, (-t, ip, _farm_ver))
+        if len(_farm_temp_heap) > 4 * max(8, len(_farm_samples) * 2):
+            _rebuild_farm_heap()
+
+def remove_farm_sample(ip: str):
+    with _farm_lock:
+        old = _farm_samples.pop(ip, None)
+        if old is not None:
+            _farm_apply(old, -1)
+
+def _rebuild_farm_heap():
+    # compaction is also a good moment to re-derive the sums and drop float drift
+    for k in _farm_sums:
+        _farm_sums[k] = 0.0 if isinstance(_farm_sums[k], float) else 0
+    for sample in _farm_samples.values():
+        _farm_apply(sample, +1)
+    _farm_temp_heap[:] = [(-t, ip, s["ver"]) for ip, s in _farm_samples.items() for t in s["temps"]]
+    heapq.heapify(_farm_temp_heap)
+
+def farm_aggregates():
+    with _farm_lock:
+        fs = dict(_farm_sums)
+        while _farm_temp_heap:
+            neg_t, ip, ver = _farm_temp_heap[0]
+            cur = _farm_samples.get(ip)
+            if cur is not None and cur["ver"] == ver:
+                break
+            heapq.heappop(_farm_temp_heap)
+        max_temp = -_farm_temp_heap[0][0] if _farm_temp_heap else None
+
+    total_ths = fs["ths_sum"] if fs["ths_n"] > 0 else None
+    total_power = fs["power_sum"] if fs["power_n"] > 0 else None
+    return {
+        "total_miners": fs["miners"],
+        "active_miners": fs["active"],
+        "total_hashrate_ths": total_ths,
+        "total_power_w": total_power,
+        "avg_efficiency_jth": (total_power / total_ths) if total_power is not None and total_ths else None,
+        "avg_temp_c": (fs["temp_sum"] / fs["temp_n"]) if fs["temp_n"] > 0 else None,
+        "max_temp_c": max_temp,
+        "total_blocks": fs["blocks_sum"] if fs["blocks_n"] > 0 else None,
+    }
+
+
+# =========================
+# LEADERBOARD INDEX
+# =========================
+
+# Dashboard order (blocks desc, best ever desc, name) as a sorted list that only
+# moves when a miner's sort keys change: bisect out the old entry, insort the new
+# one. Two more sorted lists give the weekly-best and best-ever leaders; ties go
+# to whoever ranks higher. /data is emitted in this order with each miner's rank,
+# so screens never sort and ?limit=N is the top N.
+_rank_lock = threading.Lock()
+_rank_entries = {}   # ip -> (rank_key, weekly_key or None, best_key)
+_rank_sorted = []    # rank_key: (-blocks, -best_overall, name.casefold(), name, ip)
+_rank_weekly = []    # (-weekly_best, rank_key)
+_rank_best = []      # (-best_overall, rank_key)
+rank_version = 0     # bumped whenever a miner's place in the order may have changed
+
+def _rank_num(v):
+    f = _farm_num(diff_to_number(v))
+    return f if f is not None else None
+
+def _rank_keys(ip: str, m: dict):
+    blocks = _farm_num(m.get("blocks")) or 0
+    best = _rank_num(m.get("best_overall")) or 0.0
+    weekly = _rank_num(m.get("weekly_best"))
+    if weekly is None:
+        weekly = _rank_num(m.get("session_best"))
+    name = str(m.get("name") or "")
+    rank_key = (-blocks, -best, name.casefold(), name, ip)
+    return rank_key, ((-weekly, rank_key) if weekly is not None else None), (-best, rank_key)
+
+def _sorted_remove(lst, item):
+    i = bisect.bisect_left(lst, item)
+    if i < len(lst) and lst[i] == item:
+        del lst[i]
+
+def update_rank(ip: str, m: dict):
+    """O(log n) search per miner per poll; nothing moves unless its keys changed."""
+    global rank_version
+    keys = _rank_keys(ip, m)
+    with _rank_lock:
+        old = _rank_entries.get(ip)
+        if old == keys:
+            return
+        if old is not None:
+            _sorted_remove(_rank_sorted, old[0])
+            if old[1] is not None:
+                _sorted_remove(_rank_weekly, old[1])
+            _sorted_remove(_rank_best, old[2])
+        _rank_entries[ip] = keys
+        bisect.insort(_rank_sorted, keys[0])
+        if keys[1] is not None:
+            bisect.insort(_rank_weekly, keys[1])
+        bisect.insort(_rank_best, keys[2])
+        if old is None or old[0] != keys[0]:
+            rank_version += 1
+
+def remove_rank(ip: str):
+    global rank_version
+    with _rank_lock:
+        old = _rank_entries.pop(ip, None)
+        if old is None:
+            return
+        _sorted_remove(_rank_sorted, old[0])
+        if old[1] is not None:
+            _sorted_remove(_rank_weekly, old[1])
+        _sorted_remove(_rank_best, old[2])
+        rank_version += 1
+
+def rank_of(ip: str):
+    with _rank_lock:
+        keys = _rank_entries.get(ip)
+        return bisect.bisect_left(_rank_sorted, keys[0]) if keys is not None else None
+
+def leaderboard(top_n=None):
+    """IPs in dashboard order (first top_n only if given), the leaders by name, and the version."""
+    with _rank_lock:
+        order = [k[4] for k in (_rank_sorted if top_n is None else _rank_sorted[:max(0, top_n)])]
+        leaders = {
+            "block_leader": _rank_sorted[0][3] if _rank_sorted else None,
+            "top_weekly": _rank_weekly[0][1][3] if _rank_weekly else None,
+            "top_best": _rank_best[0][1][3] if _rank_best else None,
+        }
+        return order, leaders, rank_version
+
+
+# =========================
+# SPARKLINE HISTORY
+# =========================
+
+# Per-miner hashrate/ASIC temp points for the row sparklines, one per step.
+# Served as a little-endian binary feed (see encode_spark_feed) so browsers can
+# view it straight as typed arrays and fetch only points newer than `since`.
+SPARK_STEP_SECONDS = 60
+SPARK_POINTS = 360            # 6 hours at 1/min
+SPARK_MAGIC = b"MSDS"
+SPARK_VERSION = 1
+
+_spark_lock = threading.Lock()
+spark_hist = {}   # ip -> {"ts": array('I'), "hr": array('f'), "temp": array('f')}
+
+def record_spark(ip: str, now_unix: int, online: bool, ths, temp):
+    """Appends at most one point per SPARK_STEP_SECONDS; offline/unknown values are NaN (a gap)."""
+    def num(v):
+        try:
+            return float(v) if online and v is not None else float("nan")
+        except Exception:
+            return float("nan")
+
+    with _spark_lock:
+        h = spark_hist.get(ip)
+        if h is None:
+            h = spark_hist[ip] = {"ts": array("I"), "hr": array("f"), "temp": array("f")}
+        if h["ts"] and now_unix - h["ts"][-1] < SPARK_STEP_SECONDS:
+            return
+        h["ts"].append(int(now_unix))
+        h["hr"].append(num(ths))
+        h["temp"].append(num(temp))
+        # trim in chunks so appends stay amortised O(1)
+        extra = len(h["ts"]) - SPARK_POINTS
+        if extra >= 64:
+            for k in ("ts", "hr", "temp"):
+                del h[k][:extra]
+
+def _le_bytes(arr):
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+def encode_spark_feed(since: int = 0, ips=None) -> bytes:
+    """
+    Layout (little-endian, every array 4-byte aligned):
+      header : "MSDS" | u16 version | u16 miner_count | u32 latest_ts | u32 step_seconds
+      miner  : u16 key_len | key (utf-8 IP) | pad to 4 | u32 n | u32 ts[n] | f32 hashrate_ths[n] | f32 asic_temp_c[n]
+    Only points with ts > since are included; miners without new points are left out.
+    """
+    parts = []
+    latest = int(since or 0)
+    with _spark_lock:
+        for ip, h in spark_hist.items():
+            if ips is not None and ip not in ips:
+                continue
+            start = bisect.bisect_right(h["ts"], since) if since else 0
+            n = len(h["ts"]) - start
+            if n <= 0:
+                continue
+            latest = max(latest, h["ts"][-1])
+            parts.append((ip, n, h["ts"][start:], h["hr"][start:], h["temp"][start:]))
+
+    out = bytearray(struct.pack("<4sHHII", SPARK_MAGIC, SPARK_VERSION, len(parts), latest, SPARK_STEP_SECONDS))
+    for ip, n, ts, hr, temp in parts:
+        key = ip.encode("utf-8")
+        out += struct.pack("<H", len(key)) + key
+        out += b"\0" * (-len(out) % 4)
+        out += struct.pack("<I", n)
+        out += _le_bytes(ts) + _le_bytes(hr) + _le_bytes(temp)
+    return bytes(out)
+
+
 # =========================
 # DISCORD BLOCK ALERT
 # =========================
 
+# Alerts are queued and sent by a background dispatcher, so block detection never
+# waits on Discord. Undelivered messages survive restarts in discord_outbox.json.
+DISCORD_MAX_CHARS = 2000            # Discord message content limit
+DISCORD_BATCH_LINGER_SECONDS = 2.0  # wait this long to merge alerts arriving together
+DISCORD_BACKOFF_BASE_SECONDS = 5
+DISCORD_BACKOFF_MAX_SECONDS = 600
+DISCORD_MAX_AGE_SECONDS = 24 * 3600 # give up on alerts older than this
+
+_outbox_lock = threading.Lock()
+_outbox_cv = threading.Condition(_outbox_lock)
+discord_outbox = []     # [{"id", "content", "created_unix", "attempts"}], oldest first
+discord_stats = {"sent": 0, "batches": 0, "retries": 0, "dropped": 0, "rate_limited": 0, "last_err": None, "last_ok_unix": None}
+_discord_next_unix = 0.0   # no sends before this (rate limit / backoff)
+_discord_fail_streak = 0
+_outbox_dirty = False      # outbox changed since the last write to disk
+_outbox_save_lock = threading.Lock()   # orders the writes; never taken while holding _outbox_lock
+
+def _load_discord_outbox():
+    global discord_outbox
+    data = _safe_read_json(DISCORD_OUTBOX_FILE) or _safe_read_json(DISCORD_OUTBOX_FILE + ".bak")
+    items = data.get("items") if isinstance(data, dict) else None
+    with _outbox_lock:
+        discord_outbox = [m for m in (items or []) if isinstance(m, dict) and m.get("content")]
+
+def _flush_discord_outbox():
+    """Writes the outbox if it changed: copied under the lock, written outside it."""
+    global _outbox_dirty
+    with _outbox_save_lock:
+        with _outbox_lock:
+            if not _outbox_dirty:
+                return
+            items = [dict(m) for m in discord_outbox]
+            _outbox_dirty = False
+        _safe_write_json(DISCORD_OUTBOX_FILE, {"items": items})
+
+def queue_discord(content: str):
+    """
+    Queues a webhook message; returns immediately (no network, no disk). Called with
+    _blocks_lock held, so the dispatcher thread does the write to discord_outbox.json.
+    """
+    global _outbox_dirty
+    if not DISCORD_WEBHOOK_URL or not str(DISCORD_WEBHOOK_URL).strip() or not content:
+        return
+    now = time.time()
+    with _outbox_cv:
+        discord_outbox.append({
+            "id": f"{int(now * 1000)}-{len(discord_outbox)}",
+            "content": content[:DISCORD_MAX_CHARS],
+            "created_unix": round(now, 3),
+            "attempts": 0,
+        })
+        _outbox_dirty = True
+        _outbox_cv.notify()
+
 def send_discord_block_found(miner_name: str, when_hms: str, is_test: bool = False,
                             share_diff=None, network_diff=None):
     if not DISCORD_WEBHOOK_URL or not str(DISCORD_WEBHOOK_URL).strip():
@@ -697,11 +1360,130 @@ def send_discord_block_found(miner_name: str, when_hms: str, is_test: bool = Fal
     elif net_str:
         lines.append(f"🎯 Network diff: {net_str}")
 
-    payload = {"content": "\n".join(lines)}
+    queue_discord("\n".join(lines))
+
+def _discord_rate_limit_wait(r):
+    """Seconds to hold off after a response, from Discord's 429 body or rate limit headers."""
+    if r.status_code == 429:
+        try:
+            js = r.json()
+            if isinstance(js, dict) and js.get("retry_after") is not None:
+                return max(0.5, float(js["retry_after"]))
+        except Exception:
+            pass
+        ra = _parse_retry_after(r.headers.get("Retry-After"))
+        return ra if ra is not None else 5.0
     try:
-        requests.post(DISCORD_WEBHOOK_URL, json=payload, timeout=4)
+        if r.headers.get("X-RateLimit-Remaining") == "0":
+            return max(0.0, float(r.headers.get("X-RateLimit-Reset-After") or 0))
     except Exception:
         pass
+    return 0.0
+
+def _take_discord_batch():
+    """Oldest queued messages whose joined content fits one Discord message."""
+    batch = []
+    size = 0
+    for m in discord_outbox:
+        add = len(m["content"]) + (2 if batch else 0)
+        if batch and size + add > DISCORD_MAX_CHARS:
+            break
+        batch.append(m)
+        size += add
+    return batch
+
+def discord_dispatcher_loop():
+    global _discord_next_unix, _discord_fail_streak, _outbox_dirty
+    while True:
+        _flush_discord_outbox()
+        with _outbox_cv:
+            batch = None
+            while True:
+                if _outbox_dirty:
+                    break   # persist outside the lock first
+                now = time.time()
+                cutoff = now - DISCORD_MAX_AGE_SECONDS
+                expired = [m for m in discord_outbox if float(m.get("created_unix") or 0) < cutoff]
+                if expired:
+                    discord_outbox[:] = [m for m in discord_outbox if float(m.get("created_unix") or 0) >= cutoff]
+                    discord_stats["dropped"] += len(expired)
+                    _outbox_dirty = True
+                    continue
+                if not discord_outbox:
+                    _outbox_cv.wait()
+                    continue
+                if now < _discord_next_unix:
+                    _outbox_cv.wait(_discord_next_unix - now)
+                    continue
+                # let alerts from the same poll (several blocks, several miners) arrive and
+                # merge; bounded so a steady trickle can't hold the oldest one back forever
+                created = [float(m.get("created_unix") or 0) for m in discord_outbox]
+                hold = min(max(created) + DISCORD_BATCH_LINGER_SECONDS,
+                           min(created) + 3 * DISCORD_BATCH_LINGER_SECONDS) - now
+                if hold > 0:
+                    _outbox_cv.wait(hold)
+                    continue
+                batch = _take_discord_batch()
+                url = str(DISCORD_WEBHOOK_URL or "").strip()
+                break
+
+        if batch is None:
+            continue
+        if not url:
+            # webhook removed from config while messages were queued
+            with _outbox_cv:
+                discord_stats["dropped"] += len(discord_outbox)
+                discord_outbox.clear()
+                _outbox_dirty = True
+            continue
+
+        payload = {"content": "\n\n".join(m["content"] for m in batch)}
+        status = None
+        err = None
+        wait = 0.0
+        try:
+            r = requests.post(url, json=payload, timeout=10)
+            status = r.status_code
+            wait = _discord_rate_limit_wait(r)
+        except Exception as e:
+            err = str(e)[:200]
+
+        ids = {m["id"] for m in batch}
+        with _outbox_cv:
+            now = time.time()
+            if status is not None and 200 <= status < 300:
+                discord_outbox[:] = [m for m in discord_outbox if m["id"] not in ids]
+                discord_stats["sent"] += len(batch)
+                discord_stats["batches"] += 1
+                discord_stats["last_ok_unix"] = int(now)
+                _discord_fail_streak = 0
+                _discord_next_unix = now + wait
+            elif status == 429:
+                discord_stats["rate_limited"] += 1
+                discord_stats["last_err"] = "429 rate limited"
+                _discord_next_unix = now + wait
+            elif status is not None and 400 <= status < 500:
+                # bad payload / deleted webhook: retrying cannot succeed
+                discord_outbox[:] = [m for m in discord_outbox if m["id"] not in ids]
+                discord_stats["dropped"] += len(batch)
+                discord_stats["last_err"] = f"HTTP {status}"
+                _discord_next_unix = now + wait
+            else:
+                for m in batch:
+                    m["attempts"] = int(m.get("attempts") or 0) + 1
+                discord_stats["retries"] += 1
+                discord_stats["last_err"] = err or f"HTTP {status}"
+                _discord_fail_streak += 1
+                backoff = min(DISCORD_BACKOFF_MAX_SECONDS, DISCORD_BACKOFF_BASE_SECONDS * (2 ** (_discord_fail_streak - 1)))
+                _discord_next_unix = now + max(wait, backoff * random.uniform(0.8, 1.2))
+            _outbox_dirty = True
+
+def discord_snapshot():
+    with _outbox_lock:
+        out = dict(discord_stats)
+        out["queued"] = len(discord_outbox)
+        out["next_send_unix"] = int(_discord_next_unix) if _discord_next_unix > time.time() else None
+        return out
 
 
 # =========================
@@ -784,121 +1566,408 @@ def poll_miner_api(ip: str):
     except Exception:
         return {"online": False}
 
-def miner_loop():
+def poll_miners_once():
     global miners_state, last_any_block_ts, last_block_popup
-    while True:
-        new_state = {}
-        now_unix = int(time.time())
+    new_state = {}
+    now_unix = int(time.time())
 
-        for name, cfg in MINERS.items():
-            ip = cfg.get("ip")
-            if not ip:
-                continue
+    for name, cfg in MINERS.items():
+        ip = cfg.get("ip")
+        if not ip:
+            continue
 
-            fallback_label = cfg.get("label", name)
-            data = poll_miner_api(ip)
+        fallback_label = cfg.get("label", name)
+        data = poll_miner_api(ip)
 
-            hostname = data.get("hostname")
-            display_name = hostname or fallback_label
-            model = cfg.get("model")
-            key_ip = ip
+        hostname = data.get("hostname")
+        display_name = hostname or fallback_label
+        model = cfg.get("model")
+        key_ip = ip
 
-            if data.get("online"):
-                with _last_seen_lock:
-                    last_seen_ts[display_name] = now_unix
+        if data.get("online"):
+            with _last_seen_lock:
+                last_seen_ts[display_name] = now_unix
 
-            up_raw = data.get("uptime_seconds")
+        up_raw = data.get("uptime_seconds")
+        up_now = None
+        try:
+            up_now = int(float(up_raw)) if up_raw is not None else None
+        except Exception:
             up_now = None
-            try:
-                up_now = int(float(up_raw)) if up_raw is not None else None
-            except Exception:
-                up_now = None
 
-            if data.get("online") and up_now is not None:
-                with _uptime_lock:
-                    last_uptime_seen[key_ip] = up_now
+        if data.get("online") and up_now is not None:
+            with _uptime_lock:
+                last_uptime_seen[key_ip] = up_now
 
-            with _blocks_lock:
-                blocks = int(block_counts.get(key_ip, 0))
+        with _blocks_lock:
+            blocks = int(block_counts.get(key_ip, 0))
 
-                reported = data.get("blocks_found")
-                try:
-                    reported_int = int(reported) if reported is not None else None
-                except Exception:
-                    reported_int = None
+            reported = data.get("blocks_found")
+            try:
+                reported_int = int(reported) if reported is not None else None
+            except Exception:
+                reported_int = None
 
-                if reported_int is not None:
-                    prev_rep = reported_last.get(key_ip)
+            if reported_int is not None:
+                prev_rep = reported_last.get(key_ip)
 
-                    if prev_rep is None:
+                if prev_rep is None:
+                    reported_last[key_ip] = reported_int
+                    _save_blocks()
+                else:
+                    if reported_int < prev_rep:
                         reported_last[key_ip] = reported_int
                         _save_blocks()
-                    else:
-                        if reported_int < prev_rep:
-                            reported_last[key_ip] = reported_int
-                            _save_blocks()
-                        elif reported_int > prev_rep:
-                            delta = reported_int - prev_rep
-                            reported_last[key_ip] = reported_int
-
-                            blocks += delta
-                            block_counts[key_ip] = blocks
-                            last_block_ts[key_ip] = now_unix
-                            last_any_block_ts = now_unix
-                            _save_blocks()
-
-                            ts_hms = now_hms()
-                            for _ in range(delta):
-                                send_discord_block_found(display_name, ts_hms, is_test=False)
-                                enqueue_notification("block", {"miner": display_name}, ts_unix=now_unix)
-
-                            last_block_popup = {"miner": display_name, "ts_unix": now_unix, "is_test": False}
+                    elif reported_int > prev_rep:
+                        delta = reported_int - prev_rep
+                        reported_last[key_ip] = reported_int
 
-            with _last_seen_lock:
-                last_seen = last_seen_ts.get(display_name)
-
-            sb_raw = diff_to_number(data.get("session_best"))
-            with _weekly_lock:
-                wk_key = key_ip
-                current_val = weekly_current.get(wk_key)
-                if sb_raw is not None:
-                    if current_val is None or sb_raw > current_val:
-                        weekly_current[wk_key] = sb_raw
-                        _save_weekly_current()
-                week_val = weekly_current.get(wk_key, sb_raw)
-
-            new_state[name] = {
-                "name": display_name,
-                "ip": ip,
-                "model": model,
-                "online": data.get("online", False),
-                "hashrate_ths": data.get("hashrate_ths", None),
-                "asic_temp": data.get("asic_temp", None),
-                "vr_temp": data.get("vr_temp", None),
-                "shares_accepted": data.get("shares_accepted", None),
-                "shares_rejected": data.get("shares_rejected", None),
-                "session_best": data.get("session_best", None),
-                "weekly_best": week_val,
-                "best_overall": data.get("best_overall", None),
-                "uptime_seconds": data.get("uptime_seconds", None),
-                "blocks_found": data.get("blocks_found", None),
-                "blocks": int(block_counts.get(key_ip, 0)),
-                "last_seen_unix": last_seen,
-                "fan_speed": data.get("fan_speed", None),
-                "power_raw": data.get("power_raw"),
-                "voltage": data.get("voltage"),
-                "currentA": data.get("currentA"),
-                "stratum_url": data.get("stratum_url"),
-                "stratum_port": data.get("stratum_port"),
-                "stratum_user": data.get("stratum_user"),
-                "using_fallback": data.get("using_fallback"),
-                "fallback_stratum_url": data.get("fallback_stratum_url"),
-                "fallback_stratum_port": data.get("fallback_stratum_port"),
-                "is_using_fallback_stratum": data.get("is_using_fallback_stratum"),
-            }
+                        blocks += delta
+                        block_counts[key_ip] = blocks
+                        last_block_ts[key_ip] = now_unix
+                        last_any_block_ts = now_unix
+                        _save_blocks()
+
+                        ts_hms = now_hms()
+                        for _ in range(delta):
+                            send_discord_block_found(display_name, ts_hms, is_test=False)
+                            enqueue_notification("block", {"miner": display_name}, ts_unix=now_unix)
+
+                        last_block_popup = {"miner": display_name, "ts_unix": now_unix, "is_test": False}
+
+        with _last_seen_lock:
+            last_seen = last_seen_ts.get(display_name)
+
+        with _weekly_lock:
+            wk_key = key_ip
+            sb_raw = _week_session_best(wk_key, diff_to_number(data.get("session_best")),
+                                        up_now if data.get("online") else None, now_unix)
+            current_val = weekly_current.get(wk_key)
+            if sb_raw is not None:
+                if current_val is None or sb_raw > current_val:
+                    weekly_current[wk_key] = sb_raw
+                    _save_weekly_current()
+            week_val = weekly_current.get(wk_key, sb_raw)
+            _update_weekly_agg(
+                wk_key, now_unix, bool(data.get("online")), data.get("hashrate_ths"),
+                data.get("shares_accepted"), data.get("shares_rejected"), sb_raw,
+            )
+        update_share_rates(key_ip, now_unix, bool(data.get("online")),
+                           data.get("shares_accepted"), data.get("shares_rejected"))
+
+        new_state[name] = {
+            "name": display_name,
+            "ip": ip,
+            "model": model,
+            "online": data.get("online", False),
+            "hashrate_ths": data.get("hashrate_ths", None),
+            "asic_temp": data.get("asic_temp", None),
+            "vr_temp": data.get("vr_temp", None),
+            "shares_accepted": data.get("shares_accepted", None),
+            "shares_rejected": data.get("shares_rejected", None),
+            "session_best": data.get("session_best", None),
+            "weekly_best": week_val,
+            "best_overall": data.get("best_overall", None),
+            "uptime_seconds": data.get("uptime_seconds", None),
+            "blocks_found": data.get("blocks_found", None),
+            "blocks": int(block_counts.get(key_ip, 0)),
+            "last_seen_unix": last_seen,
+            "fan_speed": data.get("fan_speed", None),
+            "power_raw": data.get("power_raw"),
+            "voltage": data.get("voltage"),
+            "currentA": data.get("currentA"),
+            "stratum_url": data.get("stratum_url"),
+            "stratum_port": data.get("stratum_port"),
+            "stratum_user": data.get("stratum_user"),
+            "using_fallback": data.get("using_fallback"),
+            "fallback_stratum_url": data.get("fallback_stratum_url"),
+            "fallback_stratum_port": data.get("fallback_stratum_port"),
+            "is_using_fallback_stratum": data.get("is_using_fallback_stratum"),
+        }
+        update_farm_sample(key_ip, new_state[name])
+        update_rank(key_ip, new_state[name])
+        record_spark(key_ip, now_unix, bool(data.get("online")), data.get("hashrate_ths"), data.get("asic_temp"))
+
+    for gone in set(_farm_samples) - {m["ip"] for m in new_state.values()}:
+        remove_farm_sample(gone)
+    for gone in set(_rank_entries) - {m["ip"] for m in new_state.values()}:
+        remove_rank(gone)
+
+    miners_state = new_state
+    first_poll_done.set()
+
+    # accumulators change every poll; persist them about once a minute
+    with _weekly_lock:
+        if now_unix - _weekly_agg_saved_unix >= 60:
+            _save_weekly_current()
+
+    publish_snapshot()
+
+
+def _week_session_best(ip: str, sb, uptime_s, now_unix: int):
+    """
+    A miner's session best only resets when it reboots, and the rollover's rolling
+    restart takes minutes. Until the miner has booted after the rollover, its session
+    best only counts for the new week if it beats the value carried over.
+    Call with _weekly_lock held.
+    """
+    carried = carried_best.get(ip)
+    if carried is None:
+        return sb
+    val, since = carried
+    if uptime_s is not None and now_unix - uptime_s >= since:
+        carried_best.pop(ip, None)
+        return sb
+    if sb is not None and sb > val:
+        return sb
+    return None
+
+# =========================
+# MINER RESTARTS (ROLLING)
+# =========================
+
+RESTART_POLL_SECONDS = 5
+
+_restart_run_lock = threading.Lock()
+_restart_lock = threading.Lock()
+restart_run = None     # last/ongoing run: {"id", "reason", "started_unix", "finished_unix", "state", "batches", ...}
+restart_latency = {}   # ip -> {"name", "last_restart_unix", "ok", "latency_s", "err"}
+
+def _miner_online_uptime(ip: str):
+    d = poll_miner_api(ip)
+    if not d.get("online"):
+        return False, None
+    try:
+        up = int(float(d.get("uptime_seconds"))) if d.get("uptime_seconds") is not None else None
+    except Exception:
+        up = None
+    return True, up
+
+def restart_miner_and_wait(ip: str, timeout_seconds: float = None):
+    """
+    Restarts one miner and polls /api/system/info until it is back.
+    "Back" means online after having been seen offline, or reporting an uptime
+    that proves it rebooted. Returns {"ok", "latency_s", "err"}.
+    """
+    if timeout_seconds is None:
+        timeout_seconds = RESTART_ONLINE_TIMEOUT_SECONDS
+
+    online, up_before = _miner_online_uptime(ip)
+    if not online:
+        return {"ok": False, "latency_s": None, "err": "offline before restart, skipped", "skipped": True}
+
+    t0 = time.time()
+    try:
+        requests.post(f"http://{ip}/api/system/restart", timeout=2)
+    except Exception:
+        # some firmwares drop the connection while rebooting; verification decides
+        pass
+
+    saw_down = False
+    while time.time() - t0 < timeout_seconds:
+        time.sleep(RESTART_POLL_SECONDS)
+        online, up = _miner_online_uptime(ip)
+        if not online:
+            saw_down = True
+            continue
+        elapsed = time.time() - t0
+        rebooted = saw_down or (up is not None and (
+            (up_before is not None and up < up_before) or up <= elapsed + RESTART_POLL_SECONDS
+        ))
+        if rebooted:
+            return {"ok": True, "latency_s": round(elapsed, 1), "err": None}
+
+    return {"ok": False, "latency_s": None, "err": f"not back online after {int(timeout_seconds)}s"}
+
+def restart_miners_rolling(targets=None, batch_size: int = None, concurrency: int = None, reason: str = "manual"):
+    """
+    Restarts miners in batches, waiting for each batch to come back before the next.
+    targets: list of MINERS keys, labels or IPs (default: all). A batch with a
+    miner that does not come back stops the run so no more hashrate is taken down.
+    Returns the run record, or None if another run is in progress.
+    """
+    if not _restart_run_lock.acquire(blocking=False):
+        return None
+    return _restart_rolling_owned(targets, batch_size, concurrency, reason)
+
+def _restart_rolling_owned(targets, batch_size, concurrency, reason):
+    """restart_miners_rolling() for a caller that already holds _restart_run_lock; releases it."""
+    global restart_run
+    try:
+        wanted = {str(t) for t in targets} if targets else None
+        miners = []
+        for name, cfg in MINERS.items():
+            ip = cfg.get("ip")
+            if not ip:
+                continue
+            if wanted is None or name in wanted or ip in wanted or cfg.get("label", name) in wanted:
+                miners.append((cfg.get("label", name), ip))
+
+        try:
+            bs = max(1, int(batch_size or RESTART_BATCH_SIZE))
+        except Exception:
+            bs = max(1, int(RESTART_BATCH_SIZE))
+        try:
+            conc = max(1, int(concurrency or RESTART_CONCURRENCY))
+        except Exception:
+            conc = max(1, int(RESTART_CONCURRENCY))
+        batches = [miners[i:i + bs] for i in range(0, len(miners), bs)]
+
+        run = {
+            "id": f"{int(time.time())}-{reason}",
+            "reason": reason,
+            "started_unix": int(time.time()),
+            "finished_unix": None,
+            "state": "running",
+            "batch_size": bs,
+            "concurrency": conc,
+            "batches_total": len(batches),
+            "batches_done": 0,
+            "results": {},
+        }
+        with _restart_lock:
+            restart_run = run
+
+        with ThreadPoolExecutor(max_workers=conc, thread_name_prefix="restart") as pool:
+            for batch in batches:
+                futures = {pool.submit(restart_miner_and_wait, ip): (label, ip) for label, ip in batch}
+                failed = False
+                for fut, (label, ip) in futures.items():
+                    try:
+                        res = fut.result()
+                    except Exception as e:
+                        res = {"ok": False, "latency_s": None, "err": str(e)[:200]}
+                    if not res.get("ok") and not res.get("skipped"):
+                        failed = True
+                    with _restart_lock:
+                        run["results"][ip] = dict(res, name=label)
+                        restart_latency[ip] = {
+                            "name": label,
+                            "last_restart_unix": int(time.time()),
+                            "ok": bool(res.get("ok")),
+                            "latency_s": res.get("latency_s"),
+                            "err": res.get("err"),
+                        }
+                with _restart_lock:
+                    run["batches_done"] += 1
+                if failed:
+                    with _restart_lock:
+                        run["state"] = "aborted"
+                    break
+
+        with _restart_lock:
+            if run["state"] == "running":
+                run["state"] = "done"
+            run["finished_unix"] = int(time.time())
+        return run
+    finally:
+        _restart_run_lock.release()
+
+def restart_snapshot():
+    with _restart_lock:
+        return {
+            "run": json.loads(json.dumps(restart_run)) if restart_run else None,
+            "latency": {ip: dict(v) for ip, v in restart_latency.items()},
+        }
+
+
+# =========================
+# SCORING ENGINE
+# =========================
+
+# Miner of the Week scores the whole fleet column-wise: one array per input,
+# one pass per component. Uses NumPy when installed, plain lists otherwise.
+MOTW_WEIGHTS = {"blocks": 0.40, "diff": 0.25, "hr": 0.15, "sph": 0.10, "up": 0.10}
+SCORE_INPUTS = ("blocks_week", "weekly_best", "hr_pct", "sph_pct", "uptime_frac")
+SCORE_COMPONENTS = ("s_blocks", "s_diff", "s_hr", "s_sph", "s_up")
+
+def scoring_engine_name():
+    return "numpy" if np is not None else "python"
+
+def parse_score_weights(src):
+    """
+    Weights from a dict/query (blocks, diff, hr, sph, up). Missing keys keep the
+    default; the result is normalised to sum to 1 so scores stay in 0..1.
+    Raises ValueError on negative, non-numeric or all-zero weights.
+    """
+    w = dict(MOTW_WEIGHTS)
+    for k in MOTW_WEIGHTS:
+        v = src.get(k) if src else None
+        if v is None or v == "":
+            continue
+        try:
+            f = float(v)
+        except Exception:
+            raise ValueError(f"weight '{k}' is not a number")
+        if not math.isfinite(f) or f < 0:
+            raise ValueError(f"weight '{k}' must be >= 0")
+        w[k] = f
+    total = sum(w.values())
+    if total <= 0:
+        raise ValueError("weights must not all be zero")
+    return {k: v / total for k, v in w.items()}
+
+def _score_columns_numpy(cols, w):
+    # None -> nan; counts as 0 like the Python path (a nan max would zero the column)
+    b = np.nan_to_num(np.asarray(cols["blocks_week"], dtype=float), nan=0.0)
+    d = np.nan_to_num(np.asarray(cols["weekly_best"], dtype=float), nan=0.0)
+    hr = np.asarray(cols["hr_pct"], dtype=float)
+    sph = np.asarray(cols["sph_pct"], dtype=float)
+    up = np.nan_to_num(np.asarray(cols["uptime_frac"], dtype=float), nan=0.0)
+
+    mb = float(b.max()) if b.size else 0.0
+    md = float(d.max()) if d.size else 0.0
+    out = {
+        "s_blocks": b / mb if mb > 0 else np.zeros_like(b),
+        "s_diff": d / md if md > 0 else np.zeros_like(d),
+        "s_hr": np.nan_to_num(np.clip(hr / 100.0, 0.0, 1.50) / 1.50, nan=0.0),
+        "s_sph": np.nan_to_num(np.clip(sph / 100.0, 0.0, 1.50) / 1.50, nan=0.0),
+        "s_up": up,
+    }
+    out["score"] = (
+        w["blocks"] * out["s_blocks"] +
+        w["diff"]   * out["s_diff"] +
+        w["hr"]     * out["s_hr"] +
+        w["sph"]    * out["s_sph"] +
+        w["up"]     * out["s_up"]
+    )
+    out["order"] = np.argsort(-out["score"], kind="stable")
+    return {k: v.tolist() for k, v in out.items()}
+
+def _score_columns_python(cols, w):
+    b = [float(x or 0) for x in cols["blocks_week"]]
+    d = [float(x or 0) for x in cols["weekly_best"]]
+    mb = max(b) if b else 0.0
+    md = max(d) if d else 0.0
+
+    def pct_score(col):
+        return [_clamp(x / 100.0, 0.0, 1.50) / 1.50 if x is not None else 0.0 for x in col]
 
-        miners_state = new_state
-        time.sleep(max(1, int(REFRESH_SECONDS)))
+    out = {
+        "s_blocks": [x / mb for x in b] if mb > 0 else [0.0] * len(b),
+        "s_diff": [x / md for x in d] if md > 0 else [0.0] * len(d),
+        "s_hr": pct_score(cols["hr_pct"]),
+        "s_sph": pct_score(cols["sph_pct"]),
+        "s_up": [float(x or 0) for x in cols["uptime_frac"]],
+    }
+    out["score"] = [
+        w["blocks"] * sb + w["diff"] * sd + w["hr"] * sh + w["sph"] * ss + w["up"] * su
+        for sb, sd, sh, ss, su in zip(out["s_blocks"], out["s_diff"], out["s_hr"], out["s_sph"], out["s_up"])
+    ]
+    sc = out["score"]
+    out["order"] = sorted(range(len(sc)), key=lambda i: -sc[i])
+    return out
+
+def score_columns(cols, weights=None):
+    """
+    cols: {input: list} for every name in SCORE_INPUTS (same length; None allowed,
+    scored as 0). Returns {component: list, "score": list, "order": list of
+    row indexes best first}. weights default to MOTW_WEIGHTS.
+    """
+    w = weights or MOTW_WEIGHTS
+    if np is not None:
+        return _score_columns_numpy(cols, w)
+    return _score_columns_python(cols, w)
 
 
 # =========================
@@ -932,106 +2001,84 @@ def _shares_per_hour(shares, uptime_seconds):
     except Exception:
         return None
 
-def compute_motw_for_last_week(snapshot_miners):
+def week_inputs(snapshot_miners, aggregates=None):
+    """
+    Raw per-miner scoring inputs for a week as rows (name, ip, model + SCORE_INPUTS).
+    Hashrate, shares/hour, uptime and best diff come from the streaming weekly
+    aggregates (keyed by IP); the snapshot only supplies names, models and block totals.
+    """
     if not snapshot_miners:
-        return None, None, None
+        return []
 
     with _blocks_lock:
         wsc = dict(week_start_counts)
-
-    week_seconds = 7 * 24 * 3600
+    if aggregates is None:
+        with _weekly_lock:
+            aggregates = {k: dict(v) for k, v in weekly_agg.items()}
 
     rows = []
-    max_blocks_week = 0
-    max_weekly_diff = 0.0
-
     for m in snapshot_miners:
         name = m.get("name")
         ip = m.get("ip")
         model = m.get("model") or ""
         model_cfg = MODEL_BASELINES.get(model, {})
+        agg = aggregates.get(ip) or _new_weekly_agg()
 
         blocks_total = int(m.get("blocks", 0) or 0)
         start_blocks = int(wsc.get(ip, 0) or 0) if ip else 0
         blocks_week = max(0, blocks_total - start_blocks)
 
         weekly_best_raw = diff_to_number(m.get("weekly_best"))
-        weekly_best_raw = float(weekly_best_raw) if weekly_best_raw is not None else 0.0
-
-        hr = m.get("hashrate_ths")
-        hr = float(hr) if hr is not None else None
+        weekly_best_raw = max(float(weekly_best_raw or 0.0), float(agg["max_diff"] or 0.0))
 
-        shares = m.get("shares_accepted")
-        try:
-            shares = float(shares) if shares is not None else None
-        except Exception:
-            shares = None
-
-        uptime = m.get("uptime_seconds")
-        try:
-            uptime = float(uptime) if uptime is not None else 0.0
-        except Exception:
-            uptime = 0.0
+        hr = (agg["hr_ths_seconds"] / agg["hr_seconds"]) if agg["hr_seconds"] > 0 else None
+        online = agg["online_seconds"]
 
         hr_pct = _ratio_pct(hr, model_cfg.get("baseline_ths")) if hr is not None else None
-        sph = _shares_per_hour(shares, uptime) if shares is not None and uptime else None
+        sph = _shares_per_hour(agg["shares_accepted"], online) if online > 0 else None
         sph_pct = _ratio_pct(sph, model_cfg.get("baseline_shares_per_hour")) if sph is not None else None
 
-        uptime_frac = _clamp(uptime / float(week_seconds), 0.0, 1.0)
-
-        max_blocks_week = max(max_blocks_week, blocks_week)
-        max_weekly_diff = max(max_weekly_diff, weekly_best_raw)
+        uptime_frac = _clamp(online / agg["observed_seconds"], 0.0, 1.0) if agg["observed_seconds"] > 0 else 0.0
 
         rows.append({
             "name": name,
+            "ip": ip,
+            "model": model,
             "blocks_week": blocks_week,
             "weekly_best": weekly_best_raw,
             "hr_pct": hr_pct,
             "sph_pct": sph_pct,
             "uptime_frac": uptime_frac,
         })
+    return rows
+
+def score_rows(rows, weights=None):
+    """Scores week_inputs() rows in one columnar pass; returns new rows, best first."""
+    if not rows:
+        return []
+    cols = {k: [r[k] for r in rows] for k in SCORE_INPUTS}
+    res = score_columns(cols, weights)
+    out = []
+    for i in res["order"]:
+        r = dict(rows[i])
+        for k in SCORE_COMPONENTS:
+            r[k] = res[k][i]
+        r["score"] = res["score"][i]
+        out.append(r)
+    return out
 
-    W_BLOCKS = 0.40
-    W_DIFF   = 0.25
-    W_HR     = 0.15
-    W_SPH    = 0.10
-    W_UP     = 0.10
-
-    best_name = None
-    best_score = -1.0
-    best_row = None
-
-    for r in rows:
-        blocks_score = (r["blocks_week"] / max_blocks_week) if max_blocks_week > 0 else 0.0
-        diff_score = (r["weekly_best"] / max_weekly_diff) if max_weekly_diff > 0 else 0.0
-
-        hr_score = 0.0
-        if r["hr_pct"] is not None:
-            hr_score = _clamp(r["hr_pct"] / 100.0, 0.0, 1.50) / 1.50
-
-        sph_score = 0.0
-        if r["sph_pct"] is not None:
-            sph_score = _clamp(r["sph_pct"] / 100.0, 0.0, 1.50) / 1.50
-
-        up_score = r["uptime_frac"]
-
-        score = (
-            W_BLOCKS * blocks_score +
-            W_DIFF   * diff_score +
-            W_HR     * hr_score +
-            W_SPH    * sph_score +
-            W_UP     * up_score
-        )
-
-        if score > best_score:
-            best_score = score
-            best_name = r["name"]
-            best_row = r
+def score_week(snapshot_miners, aggregates=None, weights=None):
+    """Full scoring table for a week: inputs, every component (0..1) and the weighted total, best first."""
+    return score_rows(week_inputs(snapshot_miners, aggregates), weights)
 
-    if best_name is None or best_row is None:
+def motw_from_table(rows):
+    """Returns (name, score_int, summary_html) for the top row of a score_week() table."""
+    if not rows or rows[0].get("name") is None:
         return None, None, None
 
-    score_int = int(round(_clamp(best_score, 0.0, 1.0) * 100.0))
+    best_row = rows[0]
+    best_name = best_row["name"]
+    score_int = int(round(_clamp(best_row["score"], 0.0, 1.0) * 100.0))
 
     hrpct = best_row["hr_pct"]
     shpct = best_row["sph_pct"]
@@ -1049,69 +2096,86 @@ def compute_motw_for_last_week(snapshot_miners):
 
     return best_name, score_int, summary
 
-def weekly_rollover_loop():
-    global weekly_best, motw, week_start_counts, week_start_unix, weekly_current
-
-    last_run_week = None
-    while True:
-        now = datetime.now()
-        iso_year, iso_week, _ = now.isocalendar()
-        weekday = now.weekday()  # Monday=0, Sunday=6
-
-        if weekday == 6 and now.hour == 23 and now.minute >= 59:
-            if last_run_week != (iso_year, iso_week):
-                snapshot = list(miners_state.values())
-
-                best_val = None
-                best_name = None
-                for m in snapshot:
-                    val = diff_to_number(m.get("weekly_best"))
-                    if val is None:
-                        continue
-                    if best_val is None or val > best_val:
-                        best_val = val
-                        best_name = m.get("name")
-
-                if best_val is not None and best_name:
-                    with _weekly_lock:
-                        weekly_best = {
-                            "prev_name": best_name,
-                            "prev_value": float(best_val),
-                            "prev_str": fmt_diff_si_adaptive(best_val),
-                        }
-                        _save_weekly_best()
-
-                winner, score_int, summary = compute_motw_for_last_week(snapshot)
-                if winner and summary:
-                    with _motw_lock:
-                        motw = {
-                            "prev_name": winner,
-                            "prev_score": score_int,
-                            "prev_str": summary,
-                            "prev_week_iso": f"{iso_year}-W{iso_week:02d}",
-                        }
-                        _save_motw()
-
-                with _blocks_lock:
-                    week_start_unix = int(time.time())
-                    week_start_counts = dict(block_counts)
-                    _save_blocks()
-                with _weekly_lock:
-                    weekly_current = {}
-                    _save_weekly_current()
+def compute_motw_for_last_week(snapshot_miners, aggregates=None):
+    return motw_from_table(score_week(snapshot_miners, aggregates))
 
-                for _, cfg in MINERS.items():
-                    ip = cfg.get("ip")
-                    if not ip:
-                        continue
-                    try:
-                        requests.post(f"http://{ip}/api/system/restart", timeout=2)
-                    except Exception:
-                        pass
+def weekly_rollover(scheduled_unix=None):
+    """
+    Sunday 23:59 job: saves last week's best + MOTW, resets weekly baselines and
+    restarts miners. scheduled_unix labels the week, so a run caught up after
+    downtime still files results under the week that actually ended.
+    """
+    global weekly_best, motw, week_start_counts, week_start_unix, weekly_current, weekly_agg, carried_best
 
-                last_run_week = (iso_year, iso_week)
+    ended = datetime.fromtimestamp(scheduled_unix) if scheduled_unix is not None else datetime.now()
+    iso_year, iso_week, _ = ended.isocalendar()
 
-        time.sleep(30)
+    snapshot = list(miners_state.values())
+
+    best_val = None
+    best_name = None
+    for m in snapshot:
+        val = diff_to_number(m.get("weekly_best"))
+        if val is None:
+            continue
+        if best_val is None or val > best_val:
+            best_val = val
+            best_name = m.get("name")
+
+    if best_val is not None and best_name:
+        with _weekly_lock:
+            weekly_best = {
+                "prev_name": best_name,
+                "prev_value": float(best_val),
+                "prev_str": fmt_diff_si_adaptive(best_val),
+            }
+            _save_weekly_best()
+
+    with _weekly_lock:
+        finished_aggs = {k: dict(v) for k, v in weekly_agg.items()}
+    table = score_week(snapshot, finished_aggs)
+    winner, score_int, summary = motw_from_table(table)
+    try:
+        archive_week(
+            f"{iso_year}-W{iso_week:02d}",
+            int(scheduled_unix if scheduled_unix is not None else time.time()),
+            table,
+            best_name if best_val is not None else None,
+            best_val,
+        )
+    except Exception:
+        pass
+    if winner and summary:
+        with _motw_lock:
+            motw = {
+                "prev_name": winner,
+                "prev_score": score_int,
+                "prev_str": summary,
+                "prev_week_iso": f"{iso_year}-W{iso_week:02d}",
+            }
+            _save_motw()
+
+    with _blocks_lock:
+        week_start_unix = int(time.time())
+        week_start_counts = dict(block_counts)
+        _save_blocks()
+    with _weekly_lock:
+        weekly_current = {}
+        weekly_agg = {}
+        # polls before each miner's restart still report last week's session best
+        carried_best = {}
+        for m in snapshot:
+            sb = diff_to_number(m.get("session_best"))
+            if sb is not None and m.get("ip"):
+                carried_best[m["ip"]] = [sb, week_start_unix]
+        _save_weekly_current()
+
+    publish_snapshot()
+
+    # batches wait minutes for miners to come back; keep that off the scheduler's workers
+    if RESTART_MINERS_ON_ROLLOVER:
+        threading.Thread(target=restart_miners_rolling, kwargs={"reason": "weekly"},
+                         name="restart-weekly", daemon=True).start()
 
 def normalize_motw_string(name, raw_str):
     if not raw_str and not name:
@@ -1139,190 +2203,1050 @@ def normalize_motw_string(name, raw_str):
 
 
 # =========================
-# COINS
+# WEEK ARCHIVE
 # =========================
 
-def refresh_coin_logos():
-    global logos_last_ok_unix, logos_last_err
+# Every rollover's full scoring table, stored column-wise (one list per row,
+# column names once) so years of weeks stay small. In-memory indexes answer
+# /weeks queries without rescanning the records.
+WEEK_ARCHIVE_COLS = [
+    "name", "ip", "model", "blocks_week", "weekly_best", "hr_pct", "sph_pct", "uptime_frac",
+    "s_blocks", "s_diff", "s_hr", "s_sph", "s_up", "score",
+]
+
+_week_archive_lock = threading.Lock()
+week_archive = []        # [{"week", "end_unix", "motw", "motw_score", "best_name", "best_value", "rows": [[...], ...]}], oldest first
+_week_pos = {}           # "2026-W41" -> index into week_archive
+_week_miner_idx = {}     # miner name -> [(week_pos, row_pos), ...] in week order
+_week_alltime = {}       # miner name -> running totals for the leaderboard
+
+def _round_or_none(v, nd):
+    try:
+        return round(float(v), nd) if v is not None else None
+    except Exception:
+        return None
 
-    mapping = {
-        "BTC": "bitcoin",
-        "BCH": "bitcoin-cash",
-        "FB":  "fractal-bitcoin",
-        "DGB": "digibyte",
-        "CAS": "cashaa",          # price only; logo overridden below
-        "XMR": "monero",
-        "QUAI": "quai-network",   # logo overridden below
-        "XEC": "ecash",
+def _archive_row(r):
+    return [
+        r.get("name"), r.get("ip"), r.get("model") or "",
+        int(r.get("blocks_week") or 0),
+        _round_or_none(r.get("weekly_best"), 1),
+        _round_or_none(r.get("hr_pct"), 1),
+        _round_or_none(r.get("sph_pct"), 1),
+        _round_or_none(r.get("uptime_frac"), 4),
+        _round_or_none(r.get("s_blocks"), 4),
+        _round_or_none(r.get("s_diff"), 4),
+        _round_or_none(r.get("s_hr"), 4),
+        _round_or_none(r.get("s_sph"), 4),
+        _round_or_none(r.get("s_up"), 4),
+        _round_or_none(r.get("score"), 4),
+    ]
+
+def _row_dict(row):
+    return dict(zip(WEEK_ARCHIVE_COLS, row))
+
+def _index_week(wpos):
+    rec = week_archive[wpos]
+    rows = rec.get("rows") or []
+    for rpos, row in enumerate(rows):
+        name = row[0]
+        if not name:
+            continue
+        _week_miner_idx.setdefault(name, []).append((wpos, rpos))
+        t = _week_alltime.setdefault(name, {
+            "name": name, "weeks": 0, "wins": 0, "blocks": 0,
+            "score_sum": 0.0, "best_score": 0.0, "best_diff": 0.0, "last_week": None,
+        })
+        score = float(row[13] or 0.0)
+        t["weeks"] += 1
+        t["wins"] += 1 if (rpos == 0 and rec.get("motw") == name) else 0
+        t["blocks"] += int(row[3] or 0)
+        t["score_sum"] += score
+        t["best_score"] = max(t["best_score"], score)
+        t["best_diff"] = max(t["best_diff"], float(row[4] or 0.0))
+        t["last_week"] = rec.get("week")
+
+def _rebuild_week_indexes():
+    _week_pos.clear()
+    _week_miner_idx.clear()
+    _week_alltime.clear()
+    for i, rec in enumerate(week_archive):
+        _week_pos[rec.get("week")] = i
+        _index_week(i)
+
+def _load_week_archive():
+    global week_archive
+    data = _safe_read_json(WEEK_ARCHIVE_FILE) or _safe_read_json(WEEK_ARCHIVE_FILE + ".bak")
+    weeks = []
+    if isinstance(data, dict) and data.get("cols") == WEEK_ARCHIVE_COLS and isinstance(data.get("weeks"), list):
+        weeks = [w for w in data["weeks"] if isinstance(w, dict) and w.get("week")]
+    weeks.sort(key=lambda w: w.get("week"))
+    with _week_archive_lock:
+        week_archive = weeks
+        _rebuild_week_indexes()
+
+def _save_week_archive():
+    _safe_write_json(WEEK_ARCHIVE_FILE, {"cols": WEEK_ARCHIVE_COLS, "weeks": week_archive}, indent=None)
+
+def archive_week(week_iso, end_unix, table, best_name=None, best_value=None):
+    """
+    Files a finished week's scoring table (from score_week()). Re-running the same
+    week (e.g. a caught-up rollover) replaces that week instead of duplicating it.
+    """
+    rows = [_archive_row(r) for r in (table or [])]
+    motw_name, motw_score, _ = motw_from_table(table) if table else (None, None, None)
+    rec = {
+        "week": week_iso,
+        "end_unix": int(end_unix),
+        "motw": motw_name,
+        "motw_score": motw_score,
+        "best_name": best_name,
+        "best_value": _round_or_none(best_value, 1),
+        "rows": rows,
+    }
+    with _week_archive_lock:
+        pos = _week_pos.get(week_iso)
+        if pos is not None:
+            week_archive[pos] = rec
+            _rebuild_week_indexes()
+        elif not week_archive or week_archive[-1]["week"] < week_iso:
+            week_archive.append(rec)
+            _week_pos[week_iso] = len(week_archive) - 1
+            _index_week(len(week_archive) - 1)
+        else:
+            week_archive.append(rec)
+            week_archive.sort(key=lambda w: w.get("week"))
+            _rebuild_week_indexes()
+        _save_week_archive()
+
+def _week_summary(rec):
+    return {
+        "week": rec.get("week"),
+        "end_unix": rec.get("end_unix"),
+        "motw": rec.get("motw"),
+        "motw_score": rec.get("motw_score"),
+        "best_name": rec.get("best_name"),
+        "best_value": rec.get("best_value"),
+        "best_str": fmt_diff_si_adaptive(rec["best_value"]) if rec.get("best_value") else None,
+        "miners": len(rec.get("rows") or []),
     }
 
-    ids = ",".join(mapping.get(sym) for sym in COIN_ORDER if sym in mapping)
+def weeks_last(n, full=False):
+    with _week_archive_lock:
+        recs = week_archive[-n:] if n > 0 else []
+        out = []
+        for rec in reversed(recs):
+            item = _week_summary(rec)
+            if full:
+                item["table"] = [_row_dict(r) for r in rec.get("rows") or []]
+            out.append(item)
+        return out
+
+def weeks_get(week_iso):
+    with _week_archive_lock:
+        pos = _week_pos.get(week_iso)
+        if pos is None:
+            return None
+        rec = week_archive[pos]
+        item = _week_summary(rec)
+        item["table"] = [_row_dict(r) for r in rec.get("rows") or []]
+        return item
+
+def weeks_for_miner(name, n=None):
+    with _week_archive_lock:
+        refs = _week_miner_idx.get(name) or []
+        if n:
+            refs = refs[-n:]
+        out = []
+        for wpos, rpos in reversed(refs):
+            rec = week_archive[wpos]
+            row = _row_dict(rec["rows"][rpos])
+            row["week"] = rec.get("week")
+            row["rank"] = rpos + 1
+            row["motw"] = (rpos == 0 and rec.get("motw") == name)
+            out.append(row)
+        return out
+
+def weeks_leaderboard(by="wins", limit=20):
+    keys = {
+        "wins": lambda t: (t["wins"], t["avg_score"]),
+        "score": lambda t: (t["avg_score"], t["wins"]),
+        "blocks": lambda t: (t["blocks"], t["wins"]),
+        "diff": lambda t: (t["best_diff"], t["wins"]),
+    }
+    keyf = keys.get(by, keys["wins"])
+    with _week_archive_lock:
+        totals = []
+        for t in _week_alltime.values():
+            row = dict(t)
+            row["avg_score"] = round(t["score_sum"] / t["weeks"], 4) if t["weeks"] else 0.0
+            row.pop("score_sum", None)
+            totals.append(row)
+    totals.sort(key=keyf, reverse=True)
+    return totals[:max(1, int(limit))]
+
+def _archived_week_columns(pos):
+    # archived rows keep raw inputs next to the scores, so any week can be re-scored
+    rows = week_archive[pos].get("rows") or []
+    idx = {k: WEEK_ARCHIVE_COLS.index(k) for k in ("name",) + SCORE_INPUTS}
+    return {k: [r[i] for r in rows] for k, i in idx.items()}
+
+def rescore_archived_weeks(weights, n=None):
+    """
+    Re-scores the last n archived weeks (all if None) under `weights`.
+    Returns newest-first [{"week", "motw", "motw_score", "actual_motw", "changed"}].
+    """
+    with _week_archive_lock:
+        start = max(0, len(week_archive) - n) if n else 0
+        weeks = [(week_archive[p].get("week"), week_archive[p].get("motw"), _archived_week_columns(p))
+                 for p in range(start, len(week_archive))]
+    out = []
+    for week_iso, actual, cols in reversed(weeks):
+        if not cols["name"]:
+            continue
+        res = score_columns(cols, weights)
+        top = res["order"][0]
+        name = cols["name"][top]
+        out.append({
+            "week": week_iso,
+            "motw": name,
+            "motw_score": int(round(_clamp(res["score"][top], 0.0, 1.0) * 100.0)),
+            "actual_motw": actual,
+            "changed": name != actual,
+        })
+    return out
 
-    try:
-        r = requests.get(
-            "https://api.coingecko.com/api/v3/coins/markets",
-            params={"vs_currency": (FIAT_CURRENCY or "GBP").lower(), "ids": ids, "sparkline": "false"},
-            timeout=10,
-        )
-        r.raise_for_status()
-        arr = r.json()
-
-        id_to_image = {}
-        if isinstance(arr, list):
-            for item in arr:
-                if isinstance(item, dict):
-                    cid = item.get("id")
-                    img = item.get("image")
-                    if cid and img:
-                        id_to_image[str(cid)] = str(img)
-
-        with _logo_lock:
-            for sym in COIN_ORDER:
-                cid = mapping.get(sym)
-                if cid and id_to_image.get(cid):
-                    coin_logos[sym] = id_to_image[cid]
-
-            # prefer known-stable logos where community ones can change
-            coin_logos["CAS"] = "https://cascoin.net/assets/logo.CIwpWNZk_Z1m8T3m.webp"
-            coin_logos["QUAI"] = "https://s2.coinmarketcap.com/static/img/coins/64x64/22354.png"
 
-            logos_last_ok_unix = int(time.time())
-            logos_last_err = None
-    except Exception as e:
-        with _logo_lock:
-            logos_last_err = str(e)[:200]
+# =========================
+# UPSTREAM CIRCUIT BREAKERS
+# =========================
 
-def _wtm_coin_json(coin_id: int):
-    r = requests.get(f"https://whattomine.com/coins/{coin_id}.json", timeout=8)
-    r.raise_for_status()
-    return r.json()
+# Per external host:
+# - closed:    requests flow normally
+# - open:      requests fail fast until the backoff (or Retry-After) expires
+# - half_open: a single probe request is let through; success closes the breaker,
+#              failure re-opens it with a doubled backoff
+BREAKER_FAIL_THRESHOLD = 3
+BREAKER_BASE_SECONDS = 30
+BREAKER_MAX_SECONDS = 30 * 60
 
-def fetch_quai_sha256_difficulty():
-    try:
-        r = requests.get("https://pool.kryptex.com/quai-sha256/about-coin", timeout=8)
-        r.raise_for_status()
-        txt = r.text
-        m = re.search(r"mining\s+difficulty\s+of\s+([0-9]+(?:\.[0-9]+)?)\s*MH", txt, re.IGNORECASE)
-        if not m:
-            m = re.search(r"difficulty\s+of\s+([0-9]+(?:\.[0-9]+)?)\s*MH", txt, re.IGNORECASE)
-        if not m:
-            return None
-        mh_val = float(m.group(1))
-        return mh_val * 1_000_000.0
-    except Exception:
-        return None
+_breaker_lock = threading.Lock()
+_breakers = {}  # host -> {"state", "failures", "trips", "open_until", "probe_inflight", "last_err", ...}
 
-def fetch_coin_stats_gbp():
-    out = {sym: {"price_gbp": None, "diff": None} for sym in COIN_ORDER}
-    vs_code = (FIAT_CURRENCY or "GBP").lower()
+class UpstreamUnavailable(RuntimeError):
+    pass
 
+def _parse_retry_after(val):
+    if val is None:
+        return None
+    s = str(val).strip()
+    if not s:
+        return None
     try:
-        cg_ids = []
-        if "BTC" in COIN_ORDER:  cg_ids.append("bitcoin")
-        if "BCH" in COIN_ORDER:  cg_ids.append("bitcoin-cash")
-        if "FB" in COIN_ORDER:   cg_ids.append("fractal-bitcoin")
-        if "DGB" in COIN_ORDER:  cg_ids.append("digibyte")
-        if "CAS" in COIN_ORDER:  cg_ids.append("cashaa")
-        if "XMR" in COIN_ORDER:  cg_ids.append("monero")
-        if "QUAI" in COIN_ORDER: cg_ids.append("quai-network")
-        if "XEC" in COIN_ORDER:  cg_ids.append("ecash")
-
-        cg = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": ",".join(cg_ids), "vs_currencies": vs_code},
-            timeout=8,
-        ).json()
-
-        def _p(obj):
-            if not isinstance(obj, dict):
-                return None
-            return pick_first(obj, [vs_code], None)
-
-        if "BTC" in COIN_ORDER:  out["BTC"]["price_gbp"]  = _p(cg.get("bitcoin", {}))
-        if "BCH" in COIN_ORDER:  out["BCH"]["price_gbp"]  = _p(cg.get("bitcoin-cash", {}))
-        if "FB"  in COIN_ORDER:  out["FB"]["price_gbp"]   = _p(cg.get("fractal-bitcoin", {}))
-        if "DGB" in COIN_ORDER:  out["DGB"]["price_gbp"]  = _p(cg.get("digibyte", {}))
-        if "CAS" in COIN_ORDER:  out["CAS"]["price_gbp"]  = _p(cg.get("cashaa", {}))
-        if "XMR" in COIN_ORDER:  out["XMR"]["price_gbp"]  = _p(cg.get("monero", {}))
-        if "QUAI" in COIN_ORDER: out["QUAI"]["price_gbp"] = _p(cg.get("quai-network", {}))
-        if "XEC" in COIN_ORDER:  out["XEC"]["price_gbp"]  = _p(cg.get("ecash", {}))
+        return max(0.0, float(s))
     except Exception:
         pass
-
     try:
-        if "BTC" in COIN_ORDER: out["BTC"]["diff"] = pick_first(_wtm_coin_json(1), ["difficulty"], None)
+        when = parsedate_to_datetime(s)
+        return max(0.0, when.timestamp() - time.time())
     except Exception:
-        pass
+        return None
+
+def _breaker_allow(host: str):
+    now = time.time()
+    with _breaker_lock:
+        b = _breakers.setdefault(host, {
+            "state": "closed", "failures": 0, "trips": 0, "open_until": None,
+            "probe_inflight": False, "last_err": None, "last_ok_unix": None,
+        })
+        if b["state"] == "open":
+            if b["open_until"] is not None and now < b["open_until"]:
+                wait = int(b["open_until"] - now)
+                raise UpstreamUnavailable(f"{host} circuit open ({wait}s left)")
+            b["state"] = "half_open"
+            b["probe_inflight"] = False
+
+        if b["state"] == "half_open":
+            if b["probe_inflight"]:
+                raise UpstreamUnavailable(f"{host} circuit half-open, probe in flight")
+            b["probe_inflight"] = True
+
+def _breaker_record(host: str, ok: bool, err=None, retry_after=None, rate_limited=False):
+    now = time.time()
+    with _breaker_lock:
+        b = _breakers.get(host)
+        if b is None:
+            return
+        b["probe_inflight"] = False
+
+        if ok:
+            b.update({"state": "closed", "failures": 0, "trips": 0, "open_until": None, "last_ok_unix": int(now)})
+            return
+
+        b["failures"] += 1
+        b["last_err"] = str(err)[:200] if err is not None else None
+        if rate_limited or b["state"] == "half_open" or b["failures"] >= BREAKER_FAIL_THRESHOLD:
+            b["trips"] += 1
+            if retry_after is not None:
+                wait = retry_after
+            else:
+                wait = BREAKER_BASE_SECONDS * (2 ** (b["trips"] - 1))
+            b["state"] = "open"
+            b["open_until"] = now + _clamp(wait, 1, BREAKER_MAX_SECONDS)
+
+def external_get(url: str, **kwargs):
+    """
+    requests.get() for internet APIs, guarded by a per-host circuit breaker.
+    Raises UpstreamUnavailable without touching the network while the host is open.
+    """
+    host = (urlparse(url).netloc or url).lower()
+    _breaker_allow(host)
     try:
-        if "BCH" in COIN_ORDER: out["BCH"]["diff"] = pick_first(_wtm_coin_json(193), ["difficulty"], None)
-    except Exception:
-        pass
+        r = requests.get(url, **kwargs)
+    except Exception as e:
+        _breaker_record(host, ok=False, err=e)
+        raise
+
+    if r.status_code == 429 or r.status_code >= 500:
+        _breaker_record(
+            host,
+            ok=False,
+            err=f"HTTP {r.status_code}",
+            retry_after=_parse_retry_after(r.headers.get("Retry-After")),
+            rate_limited=(r.status_code == 429),
+        )
+    else:
+        _breaker_record(host, ok=True)
+    return r
+
+def breaker_snapshot():
+    now = time.time()
+    out = {}
+    with _breaker_lock:
+        for host, b in _breakers.items():
+            open_for = None
+            if b["state"] == "open" and b["open_until"] is not None:
+                open_for = max(0, int(b["open_until"] - now))
+            out[host] = {
+                "state": b["state"],
+                "failures": b["failures"],
+                "trips": b["trips"],
+                "open_for_s": open_for,
+                "last_err": b["last_err"],
+                "last_ok_unix": b["last_ok_unix"],
+            }
+    return out
+
+
+# =========================
+# SOURCE CACHE (TTL + STALE-WHILE-REVALIDATE)
+# =========================
+
+# Per-kind lifetimes (seconds):
+# - ttl:   served straight from cache, no network
+# - stale: after ttl, still served while one background refresh runs
+# - neg:   how long a failure is remembered before the source is tried again
+# price ttl is 1.5 coin loops: every other loop is a cache hit whatever the fetch
+# jitter, and the loop after that refreshes in the background
+SOURCE_CACHE_TTLS = {
+    "price": {"ttl": max(5, int(COIN_REFRESH_SECONDS * 1.5)), "stale": 10 * 60, "neg": 60},
+    "diff":  {"ttl": 30 * 60, "stale": 12 * 3600, "neg": 5 * 60},
+    "logo":  {"ttl": 6 * 3600, "stale": 7 * 24 * 3600, "neg": 10 * 60},
+}
+
+_src_cache_lock = threading.Lock()
+_src_cache = {}  # key -> {"value", "fetched_unix", "err", "neg_until", "refreshing"}
+
+def _src_cache_load(key: str, kind: str, loader):
+    ttls = SOURCE_CACHE_TTLS.get(kind, SOURCE_CACHE_TTLS["price"])
     try:
-        if "FB" in COIN_ORDER: out["FB"]["diff"] = pick_first(_wtm_coin_json(431), ["difficulty"], None)
-    except Exception:
-        pass
+        value = loader()
+    except Exception as e:
+        now = time.time()
+        with _src_cache_lock:
+            ent = _src_cache.setdefault(key, {"value": None, "fetched_unix": None})
+            ent["err"] = str(e)[:200]
+            ent["neg_until"] = now + ttls["neg"]
+            ent["refreshing"] = False
+        raise
+
+    with _src_cache_lock:
+        _src_cache[key] = {
+            "value": value,
+            "fetched_unix": time.time(),
+            "err": None,
+            "neg_until": None,
+            "refreshing": False,
+        }
+    return value
+
+def _src_cache_revalidate(key: str, kind: str, loader, on_refresh):
     try:
-        if "DGB" in COIN_ORDER: out["DGB"]["diff"] = pick_first(_wtm_coin_json(113), ["difficulty"], None)
+        value = _src_cache_load(key, kind, loader)
     except Exception:
-        pass
+        return
+    if on_refresh is not None:
+        try:
+            on_refresh(value)
+        except Exception:
+            pass
+
+def cached_source(key: str, kind: str, loader, on_refresh=None):
+    """
+    Returns (value, state) for a cached upstream source. state is one of:
+    - "hit":   fresh cache entry, no network
+    - "stale": expired entry served while a background refresh runs
+               (on_refresh(value) is called when it lands); after a failed
+               refresh it is served as-is until the negative cache runs out
+    - "miss":  fetched synchronously
+    Raises the remembered error only while a failure is negatively cached and
+    nothing usable is left.
+    """
+    ttls = SOURCE_CACHE_TTLS.get(kind, SOURCE_CACHE_TTLS["price"])
+    now = time.time()
+
+    with _src_cache_lock:
+        ent = _src_cache.get(key)
+        if ent is not None:
+            fetched = ent.get("fetched_unix")
+            age = (now - fetched) if fetched is not None else None
+
+            failing = bool(ent.get("neg_until")) and now < ent["neg_until"]
+            if age is not None and age < ttls["ttl"]:
+                return ent["value"], "hit"
+            if age is not None and age < ttls["ttl"] + ttls["stale"]:
+                if not failing and not ent.get("refreshing"):
+                    ent["refreshing"] = True
+                    _coin_pool.submit(_src_cache_revalidate, key, kind, loader, on_refresh)
+                return ent["value"], "stale"
+            if failing:
+                raise RuntimeError(f"cached failure: {ent.get('err')}")
+
+    return _src_cache_load(key, kind, loader), "miss"
+
+def source_cache_age(key: str):
+    with _src_cache_lock:
+        ent = _src_cache.get(key)
+        fetched = ent.get("fetched_unix") if ent else None
+    return int(time.time() - fetched) if fetched is not None else None
+
+
+# =========================
+# LOCAL LOGO PROXY
+# =========================
+
+LOGO_MAX_BYTES = 512 * 1024
+_logo_prewarm_lock = threading.Lock()
+
+_LOGO_MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+    (b"<svg", "image/svg+xml"),
+    (b"<?xml", "image/svg+xml"),
+]
+
+def _load_logo_index():
+    global logo_files
+    data = _safe_read_json(LOGO_INDEX_FILE) or _safe_read_json(LOGO_INDEX_FILE + ".bak")
+    if not isinstance(data, dict):
+        return
+    cleaned = {}
+    for sym, meta in data.items():
+        if not isinstance(meta, dict):
+            continue
+        fname = meta.get("file")
+        if not fname or not os.path.exists(os.path.join(LOGO_CACHE_DIR, str(fname))):
+            continue
+        cleaned[str(sym).upper()] = {
+            "file": str(fname),
+            "content_type": str(meta.get("content_type") or "application/octet-stream"),
+            "etag": str(meta.get("etag") or ""),
+            "url": meta.get("url"),
+            "fetched_unix": meta.get("fetched_unix"),
+        }
+    with _logo_file_lock:
+        logo_files = cleaned
+
+def _save_logo_index():
+    with _logo_file_lock:
+        obj = {sym: dict(meta) for sym, meta in logo_files.items()}
+    _safe_write_json(LOGO_INDEX_FILE, obj)
+
+def _logo_candidate_urls(sym: str):
+    with _logo_lock:
+        live = coin_logos.get(sym)
+    urls = [live] if live else []
+    for u in fallback_logo_urls(sym):
+        if u and u not in urls:
+            urls.append(u)
+    return urls
+
+def _sniff_logo_type(body: bytes, header_ct):
+    ct = str(header_ct or "").split(";", 1)[0].strip().lower()
+    if ct.startswith("image/"):
+        return ct
+    head = body[:64].lstrip()
+    for magic, mime in _LOGO_MAGIC:
+        if head.startswith(magic):
+            return mime
+    return None
+
+def ensure_logo_cached(sym: str):
+    """Downloads a coin logo once and keeps it on disk. Returns its metadata or None."""
+    sym = str(sym).upper()
+    with _logo_file_lock:
+        meta = logo_files.get(sym)
+    if meta:
+        return meta
+
+    for url in _logo_candidate_urls(sym):
+        try:
+            r = external_get(url, timeout=10)
+            r.raise_for_status()
+            body = r.content or b""
+            if not body or len(body) > LOGO_MAX_BYTES:
+                continue
+            ct = _sniff_logo_type(body, r.headers.get("Content-Type"))
+            if not ct:
+                continue
+
+            os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+            fname = f"{sym.lower()}.img"
+            path = os.path.join(LOGO_CACHE_DIR, fname)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+
+            meta = {
+                "file": fname,
+                "content_type": ct,
+                "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+                "url": url,
+                "fetched_unix": int(time.time()),
+            }
+            with _logo_file_lock:
+                logo_files[sym] = meta
+            _save_logo_index()
+            return meta
+        except Exception:
+            continue
+    return None
+
+def prewarm_logo_cache():
+    """Makes sure every COIN_ORDER logo is on disk so the UI renders with no WAN."""
+    if not _logo_prewarm_lock.acquire(blocking=False):
+        return
     try:
-        if "QUAI" in COIN_ORDER:
-            qd = fetch_quai_sha256_difficulty()
-            if qd is not None:
-                out["QUAI"]["diff"] = qd
-    except Exception:
-        pass
+        for sym in COIN_ORDER:
+            try:
+                ensure_logo_cached(sym)
+            except Exception:
+                pass
+    finally:
+        _logo_prewarm_lock.release()
+
+
+# =========================
+# COINS
+# =========================
+
+# ------------------------------------------------------------
+# Coin provider registry
+# ------------------------------------------------------------
+# symbol -> {"price" | "diff" | "logo": (provider, provider-specific key)}
+# Adding a coin to COIN_ORDER only needs an entry here; every provider is
+# called once per refresh with all the symbols it serves.
+COIN_REGISTRY = {
+    "BTC":  {"price": ("coingecko", "bitcoin"),         "diff": ("whattomine", 1),   "logo": ("coingecko", "bitcoin")},
+    "BCH":  {"price": ("coingecko", "bitcoin-cash"),    "diff": ("whattomine", 193), "logo": ("coingecko", "bitcoin-cash")},
+    "FB":   {"price": ("coingecko", "fractal-bitcoin"), "diff": ("whattomine", 431), "logo": ("coingecko", "fractal-bitcoin")},
+    "DGB":  {"price": ("coingecko", "digibyte"),        "diff": ("whattomine", 113), "logo": ("coingecko", "digibyte")},
+    "XEC":  {"price": ("coingecko", "ecash"),           "diff": ("whattomine", 370), "logo": ("coingecko", "ecash")},
+    "XMR":  {"price": ("coingecko", "monero"),                                       "logo": ("coingecko", "monero")},
+    # prefer known-stable logos where community ones can change
+    "QUAI": {"price": ("coingecko", "quai-network"),    "diff": ("kryptex", "quai-sha256"),
+             "logo": ("static", ("coinmarketcap", "static/img/coins/64x64/22354.png"))},
+    "CAS":  {"price": ("coingecko", "cashaa"),          "diff": ("casplorer", "getdifficulty"),
+             "logo": ("static", ("cascoin", "assets/logo.CIwpWNZk_Z1m8T3m.webp"))},
+}
+
+def _api_url(base: str, path: str):
+    return str(base or "").rstrip("/") + "/" + path.lstrip("/")
+
+def _batch_result(out: dict, errors: list):
+    """Partial batch results are fine; a batch that produced nothing raises its first error."""
+    if not out and errors:
+        raise errors[0]
+    return out
+
+def _cg_prices_batch(items: dict):
+    vs_code = (FIAT_CURRENCY or "GBP").lower()
+    r = external_get(
+        _api_url(COINGECKO_BASE_URL, "simple/price"),
+        params={"ids": ",".join(sorted(set(items.values()))), "vs_currencies": vs_code},
+        timeout=8,
+    )
+    r.raise_for_status()
+    cg = r.json()
+    if not isinstance(cg, dict):
+        raise ValueError("unexpected CoinGecko payload")
+
+    out = {}
+    for sym, cid in items.items():
+        obj = cg.get(cid)
+        out[sym] = {"price_gbp": pick_first(obj, [vs_code], None) if isinstance(obj, dict) else None}
+    return out
+
+def _cg_logos_batch(items: dict):
+    r = external_get(
+        _api_url(COINGECKO_BASE_URL, "coins/markets"),
+        params={
+            "vs_currency": (FIAT_CURRENCY or "GBP").lower(),
+            "ids": ",".join(sorted(set(items.values()))),
+            "sparkline": "false",
+        },
+        timeout=10,
+    )
+    r.raise_for_status()
+    arr = r.json()
+
+    id_to_image = {}
+    if isinstance(arr, list):
+        for item in arr:
+            if isinstance(item, dict):
+                cid = item.get("id")
+                img = item.get("image")
+                if cid and img:
+                    id_to_image[str(cid)] = str(img)
+    return {sym: {"logo": id_to_image[cid]} for sym, cid in items.items() if id_to_image.get(cid)}
+
+def _static_logos_batch(items: dict):
+    return {sym: {"logo": logo_url(*ref)} for sym, ref in items.items() if ref}
+
+def _wtm_coin_json(coin_id: int):
+    r = external_get(_api_url(WHATTOMINE_BASE_URL, f"coins/{coin_id}.json"), timeout=8)
+    r.raise_for_status()
+    return r.json()
+
+def _wtm_diff_batch(items: dict):
+    """
+    One request to the WhatToMine ASIC list covers every SHA-256 coin; anything
+    it does not list falls back to the per-coin endpoint.
+    """
+    wanted = {}
+    for sym, cid in items.items():
+        try:
+            wanted[int(cid)] = sym
+        except Exception:
+            continue
+
+    out = {}
+    errors = []
     try:
-        if "XEC" in COIN_ORDER: out["XEC"]["diff"] = pick_first(_wtm_coin_json(370), ["difficulty"], None)
-    except Exception:
-        pass
+        r = external_get(_api_url(WHATTOMINE_BASE_URL, "asic.json"), timeout=8)
+        r.raise_for_status()
+        js = r.json()
+        coins = js.get("coins") if isinstance(js, dict) else None
+        if isinstance(coins, dict):
+            for c in coins.values():
+                if not isinstance(c, dict):
+                    continue
+                try:
+                    sym = wanted.get(int(c.get("id")))
+                except Exception:
+                    continue
+                diff = pick_first(c, ["difficulty"], None)
+                if sym and diff is not None:
+                    out[sym] = {"diff": diff}
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        errors.append(e)
 
+    for cid, sym in wanted.items():
+        if sym in out:
+            continue
+        try:
+            out[sym] = {"diff": pick_first(_wtm_coin_json(cid), ["difficulty"], None)}
+        except Exception as e:
+            errors.append(e)
+    return _batch_result(out, errors)
+
+def fetch_kryptex_difficulty(pool_slug: str):
+    """Difficulty scraped from a Kryptex about-coin page; raises with the reason on failure."""
+    r = external_get(_api_url(KRYPTEX_BASE_URL, f"{pool_slug}/about-coin"), timeout=8)
+    r.raise_for_status()
+    txt = r.text
+    m = re.search(r"mining\s+difficulty\s+of\s+([0-9]+(?:\.[0-9]+)?)\s*MH", txt, re.IGNORECASE)
+    if not m:
+        m = re.search(r"difficulty\s+of\s+([0-9]+(?:\.[0-9]+)?)\s*MH", txt, re.IGNORECASE)
+    if not m:
+        raise ValueError(f"kryptex {pool_slug}: difficulty not found on page")
+    mh_val = float(m.group(1))
+    return mh_val * 1_000_000.0
+
+def _kryptex_diff_batch(items: dict):
+    out = {}
+    errors = []
+    for sym, slug in items.items():
+        try:
+            out[sym] = {"diff": fetch_kryptex_difficulty(slug)}
+        except Exception as e:
+            errors.append(e)
+    return _batch_result(out, errors)
+
+def _casplorer_diff_batch(items: dict):
     # CAS difficulty endpoint varies by explorer; if it fails, we just show "-" safely.
-    try:
-        if "CAS" in COIN_ORDER:
-            r = requests.get("https://casplorer.com/api/getdifficulty", timeout=8)
+    out = {}
+    errors = []
+    for sym, method in items.items():
+        try:
+            r = external_get(_api_url(CASPLORER_BASE_URL, method), timeout=8)
             r.raise_for_status()
             txt = (r.text or "").strip()
-            out["CAS"]["diff"] = float(txt)
-    except Exception:
+            out[sym] = {"diff": float(txt)}
+        except Exception as e:
+            errors.append(e)
+    return _batch_result(out, errors)
+
+COIN_PROVIDERS = {
+    "price": {"coingecko": _cg_prices_batch},
+    "diff": {
+        "whattomine": _wtm_diff_batch,
+        "kryptex": _kryptex_diff_batch,
+        "casplorer": _casplorer_diff_batch,
+    },
+    "logo": {"coingecko": _cg_logos_batch, "static": _static_logos_batch},
+}
+
+def _provider_batches(kind: str):
+    """Groups COIN_ORDER by provider: {provider: {sym: key}} for one data kind."""
+    batches = {}
+    for sym in COIN_ORDER:
+        entry = COIN_REGISTRY.get(sym, {}).get(kind)
+        if not entry or entry[0] not in COIN_PROVIDERS.get(kind, {}):
+            continue
+        provider, key = entry
+        batches.setdefault(provider, {})[sym] = key
+    return batches
+
+def refresh_coin_logos():
+    global logos_last_ok_unix, logos_last_err
+
+    found = {}
+    errors = []
+    for provider, items in _provider_batches("logo").items():
+        fn = COIN_PROVIDERS["logo"][provider]
+        try:
+            res, _ = cached_source(f"{provider}:logo", "logo", lambda fn=fn, items=items: fn(items))
+            found.update(res or {})
+        except Exception as e:
+            errors.append(f"{provider}: {e}")
+
+    with _logo_lock:
+        for sym, fields in found.items():
+            if fields.get("logo"):
+                coin_logos[sym] = fields["logo"]
+        if errors:
+            logos_last_err = "; ".join(errors)[:200]
+        else:
+            logos_last_ok_unix = int(time.time())
+            logos_last_err = None
+
+# All sources of one refresh run in parallel; whatever has not answered by the
+# deadline is reported as timed out and picked up again on the next loop.
+COIN_FETCH_DEADLINE_SECONDS = 12
+_coin_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="coin-fetch")
+
+def _coin_sources():
+    """
+    Returns {source_name: (cache_kind, callable, symbols)} with one batched job
+    per provider for the price and difficulty kinds.
+    Each callable returns {sym: {field: value}} or raises.
+    """
+    jobs = {}
+    for kind in ("price", "diff"):
+        for provider, items in _provider_batches(kind).items():
+            fn = COIN_PROVIDERS[kind][provider]
+            jobs[f"{provider}:{kind}"] = (kind, lambda fn=fn, items=items: fn(items), sorted(items))
+    return jobs
+
+def fetch_coin_stats_gbp(on_partial=None, deadline_seconds=None):
+    """
+    Fetches every coin source concurrently (through the source cache) and waits at
+    most deadline_seconds overall. on_partial(source, result) is called as each
+    source answers, and again when a stale entry finishes revalidating in the
+    background. Returns (coin stats, per-source status).
+    """
+    out = {sym: {"price_gbp": None, "diff": None} for sym in COIN_ORDER}
+    status = {}
+    if deadline_seconds is None:
+        deadline_seconds = COIN_FETCH_DEADLINE_SECONDS
+
+    t0 = time.monotonic()
+
+    def job(name, kind, fn):
+        def on_refresh(res):
+            if on_partial is not None:
+                on_partial(name, res or {})
+        return cached_source(name, kind, fn, on_refresh=on_refresh)
+
+    sources = _coin_sources()
+    futures = {
+        _coin_pool.submit(job, name, kind, fn): name
+        for name, (kind, fn, _) in sources.items()
+    }
+
+    def elapsed_ms():
+        return int((time.monotonic() - t0) * 1000)
+
+    try:
+        for fut in as_completed(futures, timeout=max(1, deadline_seconds)):
+            name = futures[fut]
+            try:
+                res, cache_state = fut.result()
+            except Exception as e:
+                status[name] = {"ok": False, "err": str(e)[:200], "ms": elapsed_ms(), "cache": None}
+                continue
+
+            for sym, fields in (res or {}).items():
+                if sym in out and isinstance(fields, dict):
+                    out[sym].update(fields)
+            status[name] = {
+                "ok": True,
+                "err": None,
+                "ms": elapsed_ms(),
+                "cache": cache_state,
+                "age_s": source_cache_age(name),
+                "missing": [sym for sym in sources[name][2] if sym not in (res or {})],
+            }
+
+            if on_partial is not None:
+                try:
+                    on_partial(name, res or {})
+                except Exception:
+                    pass
+    except FuturesTimeout:
         pass
 
-    return out
+    for name in futures.values():
+        if name not in status:
+            status[name] = {"ok": False, "err": "deadline exceeded", "ms": elapsed_ms(), "cache": None}
+
+    return out, status
+
+COIN_FIELD_BY_KIND = {"price": "price_gbp", "diff": "diff"}
+
+def _expired_coin_fields(status):
+    """
+    [(sym, field)] that no source can vouch for any more: the source answered without
+    that coin, or failed with its cache entry past the stale window. Left alone these
+    would show the last value forever.
+    """
+    gone = []
+    for name, (kind, _, syms) in _coin_sources().items():
+        st = status.get(name)
+        if st is None:
+            continue
+        if st["ok"]:
+            missing = st.get("missing") or []
+        else:
+            ttls = SOURCE_CACHE_TTLS.get(kind, SOURCE_CACHE_TTLS["price"])
+            age = source_cache_age(name)
+            missing = syms if age is None or age >= ttls["ttl"] + ttls["stale"] else []
+        gone.extend((sym, COIN_FIELD_BY_KIND[kind]) for sym in missing)
+    return gone
+
+def _publish_coin_partial(source, result):
+    with _coin_lock:
+        for sym, fields in result.items():
+            if sym in coin_state and isinstance(fields, dict):
+                coin_state[sym].update(fields)
+    publish_snapshot()
 
-def coin_loop():
-    global coin_state, coin_last_ok_unix, coin_last_err
+LOGO_REFRESH_SECONDS = 10 * 60
 
+def refresh_logos_once():
+    """Logo job; returns its next delay (sooner while any logo is still missing)."""
     try:
         refresh_coin_logos()
     except Exception:
         pass
+    prewarm_logo_cache()
 
-    last_logo_refresh = 0
-    LOGO_REFRESH_SECONDS = 10 * 60
+    with _logo_lock:
+        missing_any = any(not coin_logos.get(sym) for sym in COIN_ORDER)
+    publish_snapshot()
+    return max(5, int(COIN_REFRESH_SECONDS)) if missing_any else LOGO_REFRESH_SECONDS
 
-    while True:
-        now_unix = int(time.time())
-        with _logo_lock:
-            missing_any = any(not coin_logos.get(sym) for sym in COIN_ORDER)
+def refresh_coins_once():
+    global coin_sources, coin_last_ok_unix, coin_last_err
+
+    try:
+        _, status = fetch_coin_stats_gbp(on_partial=_publish_coin_partial)
+        done_unix = int(time.time())
+        expired = _expired_coin_fields(status)
+        with _coin_lock:
+            for sym, field in expired:
+                if sym in coin_state:
+                    coin_state[sym][field] = None
+            for name, st in status.items():
+                prev = coin_sources.get(name) or {}
+                st["last_ok_unix"] = done_unix if st["ok"] else prev.get("last_ok_unix")
+            coin_sources = status
+            if any(st["ok"] for st in status.values()):
+                coin_last_ok_unix = done_unix
+            failed = sorted(name for name, st in status.items() if not st["ok"])
+            coin_last_err = ("failed: " + ", ".join(failed))[:200] if failed else None
+    except Exception as e:
+        with _coin_lock:
+            coin_last_err = str(e)[:200]
+
+    try:
+        record_coin_history()
+    except Exception:
+        pass
+    publish_snapshot()
+
+
+# =========================
+# COIN HISTORY + TRENDS
+# =========================
+
+COIN_HISTORY_STEP_SECONDS = 5 * 60
+COIN_HISTORY_KEEP_SECONDS = 8 * 24 * 3600
+COIN_TREND_WINDOWS = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600}
 
-        if missing_any or (now_unix - last_logo_refresh >= LOGO_REFRESH_SECONDS):
+# ticker arrows: prices move minute to minute, difficulty only every few blocks/days
+COIN_TREND_ARROW_WINDOW = {"price": "1h", "diff": "24h"}
+
+def _load_coin_history():
+    global coin_history
+    data = _safe_read_json(COIN_HISTORY_FILE) or _safe_read_json(COIN_HISTORY_FILE + ".bak")
+    if not isinstance(data, dict) or not isinstance(data.get("coins"), dict):
+        return
+
+    cutoff = int(time.time()) - COIN_HISTORY_KEEP_SECONDS
+    loaded = {sym: [] for sym in COIN_ORDER}
+    for sym, pts in data["coins"].items():
+        if sym not in loaded or not isinstance(pts, list):
+            continue
+        cleaned = []
+        for p in pts:
             try:
-                refresh_coin_logos()
+                ts = int(p[0])
+                price = float(p[1]) if p[1] is not None else None
+                diff = float(p[2]) if p[2] is not None else None
             except Exception:
-                pass
-            last_logo_refresh = now_unix
+                continue
+            if ts >= cutoff:
+                cleaned.append([ts, price, diff])
+        cleaned.sort(key=lambda x: x[0])
+        loaded[sym] = cleaned
 
-        try:
-            cs = fetch_coin_stats_gbp()
-            with _coin_lock:
-                coin_state = cs
-                coin_last_ok_unix = int(time.time())
-                coin_last_err = None
-        except Exception as e:
-            with _coin_lock:
-                coin_last_err = str(e)[:200]
+    with _coin_hist_lock:
+        coin_history = loaded
+    _recompute_coin_trends()
 
-        time.sleep(max(5, int(COIN_REFRESH_SECONDS)))
+def _save_coin_history():
+    with _coin_hist_lock:
+        obj = {"step": COIN_HISTORY_STEP_SECONDS, "coins": {sym: [list(p) for p in pts] for sym, pts in coin_history.items()}}
+    _safe_write_json(COIN_HISTORY_FILE, obj, indent=None)
+
+def _pct_change(new, old):
+    try:
+        n = float(new)
+        o = float(old)
+    except Exception:
+        return None
+    if o == 0:
+        return None
+    return (n - o) / abs(o) * 100.0
+
+def _value_at_or_after(pts, ts_list, idx, target_ts):
+    """First non-null value (column idx) at or after target_ts."""
+    i = bisect.bisect_left(ts_list, target_ts)
+    while i < len(pts):
+        if pts[i][idx] is not None:
+            return pts[i][idx]
+        i += 1
+    return None
+
+def _trend_for(pct):
+    if pct is None:
+        return None
+    if pct > 0:
+        return "up"
+    if pct < 0:
+        return "down"
+    return "flat"
+
+def _recompute_coin_trends():
+    global coin_trends
+    now = int(time.time())
+    trends = {}
+    with _coin_hist_lock:
+        for sym in COIN_ORDER:
+            pts = coin_history.get(sym) or []
+            entry = {"deltas": {}, "price_trend": None, "diff_trend": None, "points": len(pts)}
+            if pts:
+                ts_list = [p[0] for p in pts]
+                cur_price = next((p[1] for p in reversed(pts) if p[1] is not None), None)
+                cur_diff = next((p[2] for p in reversed(pts) if p[2] is not None), None)
+                for label, secs in COIN_TREND_WINDOWS.items():
+                    # a window only counts once history actually reaches back that far
+                    if now - ts_list[0] < secs - COIN_HISTORY_STEP_SECONDS:
+                        continue
+                    entry["deltas"][label] = {
+                        "price_pct": _pct_change(cur_price, _value_at_or_after(pts, ts_list, 1, now - secs)),
+                        "diff_pct": _pct_change(cur_diff, _value_at_or_after(pts, ts_list, 2, now - secs)),
+                    }
+                for field, label in COIN_TREND_ARROW_WINDOW.items():
+                    d = entry["deltas"].get(label)
+                    if d is None:
+                        # not enough history yet: fall back to the longest window we have
+                        d = next((entry["deltas"][k] for k in reversed(list(entry["deltas"]))), None)
+                    if d is None and len(pts) >= 2:
+                        col = 1 if field == "price" else 2
+                        d = {f"{field}_pct": _pct_change(pts[-1][col], pts[0][col])}
+                    if d is not None:
+                        entry[f"{field}_trend"] = _trend_for(d.get(f"{field}_pct"))
+            trends[sym] = entry
+        coin_trends = trends
+
+def record_coin_history(now_unix: int = None):
+    """Adds the current coin_state to the history (one point per step bucket)."""
+    if now_unix is None:
+        now_unix = int(time.time())
+    bucket = now_unix // COIN_HISTORY_STEP_SECONDS
+    cutoff = now_unix - COIN_HISTORY_KEEP_SECONDS
+
+    with _coin_lock:
+        snap = {sym: (coin_state.get(sym, {}).get("price_gbp"), coin_state.get(sym, {}).get("diff")) for sym in COIN_ORDER}
+
+    appended = False
+    with _coin_hist_lock:
+        for sym, (price, diff) in snap.items():
+            price = diff_to_number(price)
+            diff = diff_to_number(diff)
+            if price is None and diff is None:
+                continue
+            pts = coin_history.setdefault(sym, [])
+            point = [now_unix, price, diff]
+            if pts and pts[-1][0] // COIN_HISTORY_STEP_SECONDS == bucket:
+                pts[-1] = point
+            else:
+                pts.append(point)
+                appended = True
+            while pts and pts[0][0] < cutoff:
+                pts.pop(0)
+
+    _recompute_coin_trends()
+    if appended:
+        _save_coin_history()
 
 
 # =========================
@@ -1484,30 +3408,199 @@ def derive_mining_info(miner):
 
 
 # =========================
-# API
+# SCHEDULER
 # =========================
+# One timer heap drives every background job. The scheduler thread sleeps until
+# the earliest due job (no fixed-period wakeups) and hands it to a small worker
+# pool, so a slow coin refresh never delays miner polling.
+#
+# - interval jobs: next run = end of last run + interval (+ random jitter);
+#   the job may return a number to override the next delay
+# - cron jobs: {"weekday": 0-6 (Monday=0) or None, "hour", "minute"} in local time;
+#   the last completed run is persisted so a run missed while the dashboard was
+#   down is caught up at startup
+
+SCHEDULER_STATE_FILE = os.path.join(BASE_DIR, "scheduler.json")
+
+_sched_cv = threading.Condition()
+_sched_heap = []   # (due_unix, seq, job name)
+_sched_seq = 0
+sched_jobs = {}    # name -> job dict (config + run stats)
+_sched_last_runs = {}  # cron job name -> scheduled unix of the last completed run
+_sched_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sched")
+
+def _next_cron_unix(cron: dict, after_unix: float):
+    """First local time strictly after after_unix that matches cron."""
+    base = datetime.fromtimestamp(after_unix).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    cand = base.replace(hour=int(cron.get("hour", 0)), minute=int(cron.get("minute", 0)))
+    if cand < base:
+        cand += timedelta(days=1)
+    if cron.get("weekday") is not None:
+        cand += timedelta(days=(int(cron["weekday"]) - cand.weekday()) % 7)
+    return cand.timestamp()
+
+def _prev_cron_unix(cron: dict, before_unix: float):
+    """Latest local time at or before before_unix that matches cron."""
+    prev = None
+    t = _next_cron_unix(cron, before_unix - 8 * 86400)
+    while t <= before_unix:
+        prev = t
+        t = _next_cron_unix(cron, t)
+    return prev
+
+def _load_scheduler_state():
+    global _sched_last_runs
+    data = _safe_read_json(SCHEDULER_STATE_FILE) or _safe_read_json(SCHEDULER_STATE_FILE + ".bak")
+    runs = data.get("last_runs") if isinstance(data, dict) else None
+    cleaned = {}
+    if isinstance(runs, dict):
+        for k, v in runs.items():
+            if isinstance(v, (int, float)):
+                cleaned[str(k)] = float(v)
+    _sched_last_runs = cleaned
+
+def _save_scheduler_state():
+    with _sched_cv:
+        obj = {"last_runs": dict(_sched_last_runs)}
+    _safe_write_json(SCHEDULER_STATE_FILE, obj)
+
+def _sched_push_locked(name: str, due_unix: float):
+    global _sched_seq
+    _sched_seq += 1
+    sched_jobs[name]["next_run_unix"] = due_unix
+    heapq.heappush(_sched_heap, (due_unix, _sched_seq, name))
+    _sched_cv.notify()
+
+def _new_job(name: str, fn, kind: str, **cfg):
+    job = {
+        "name": name, "fn": fn, "kind": kind,
+        "next_run_unix": None, "running": False,
+        "runs": 0, "errors": 0, "last_err": None,
+        "last_start_unix": None, "last_duration_ms": None, "max_duration_ms": 0,
+        "last_lateness_ms": None, "max_lateness_ms": 0,
+    }
+    job.update(cfg)
+    return job
+
+def schedule_interval(name: str, fn, interval_seconds: float, jitter_seconds: float = 0.0, first_delay: float = 0.0):
+    with _sched_cv:
+        sched_jobs[name] = _new_job(name, fn, "interval", interval=float(interval_seconds), jitter=float(jitter_seconds))
+        _sched_push_locked(name, time.time() + max(0.0, first_delay))
+
+def schedule_cron(name: str, fn, cron: dict, catch_up: bool = True):
+    """fn(scheduled_unix) runs at every cron match; see SCHEDULER notes above."""
+    now = time.time()
+    with _sched_cv:
+        sched_jobs[name] = _new_job(name, fn, "cron", cron=dict(cron))
+        last = _sched_last_runs.get(name)
+        if last is None:
+            # first start: nothing to catch up on
+            _sched_last_runs[name] = _prev_cron_unix(cron, now) or now
+            due = _next_cron_unix(cron, now)
+        else:
+            missed = _prev_cron_unix(cron, now)
+            due = missed if (catch_up and missed is not None and missed > last) else _next_cron_unix(cron, now)
+        _sched_push_locked(name, due)
+    _save_scheduler_state()
+
+def _sched_run(name: str, due_unix: float):
+    job = sched_jobs[name]
+    start = time.time()
+    override = None
+    err = None
+    try:
+        if job["kind"] == "cron":
+            job["fn"](due_unix)
+        else:
+            override = job["fn"]()
+    except Exception as e:
+        err = str(e)[:200]
+    end = time.time()
+
+    with _sched_cv:
+        dur_ms = int((end - start) * 1000)
+        late_ms = int(max(0.0, start - due_unix) * 1000)
+        job["running"] = False
+        job["runs"] += 1
+        job["last_start_unix"] = int(start)
+        job["last_duration_ms"] = dur_ms
+        job["max_duration_ms"] = max(job["max_duration_ms"], dur_ms)
+        job["last_lateness_ms"] = late_ms
+        job["max_lateness_ms"] = max(job["max_lateness_ms"], late_ms)
+        if err is not None:
+            job["errors"] += 1
+            job["last_err"] = err
+
+        if job["kind"] == "cron":
+            _sched_last_runs[name] = due_unix
+            nxt = _next_cron_unix(job["cron"], max(end, due_unix))
+        else:
+            delay = override if isinstance(override, (int, float)) and override > 0 else job["interval"]
+            nxt = end + delay + (random.uniform(0, job["jitter"]) if job["jitter"] > 0 else 0.0)
+        _sched_push_locked(name, nxt)
 
-@app.get("/health")
-def health():
-    return jsonify({"ok": True})
+    if job["kind"] == "cron":
+        _save_scheduler_state()
 
-@app.post("/ack_notification")
-def ack_notification():
-    try:
-        js = request.get_json(silent=True) or {}
-    except Exception:
-        js = {}
-    ids = []
-    if isinstance(js, dict):
-        if "id" in js and js.get("id") is not None:
-            ids = [js.get("id")]
-        elif "ids" in js and isinstance(js.get("ids"), list):
-            ids = js.get("ids")
-    changed = ack_notification_ids(ids)
-    return jsonify({"ok": True, "acked": changed})
+def scheduler_loop():
+    while True:
+        with _sched_cv:
+            while True:
+                now = time.time()
+                if _sched_heap and _sched_heap[0][0] <= now:
+                    break
+                _sched_cv.wait(timeout=(_sched_heap[0][0] - now) if _sched_heap else None)
+            due, _, name = heapq.heappop(_sched_heap)
+            job = sched_jobs.get(name)
+            if job is None:
+                continue
+            job["running"] = True
+        _sched_pool.submit(_sched_run, name, due)
 
-@app.get("/data")
-def data():
+def scheduler_snapshot():
+    with _sched_cv:
+        return {
+            name: {k: v for k, v in job.items() if k != "fn"}
+            for name, job in sched_jobs.items()
+        }
+
+def _arm_weekly_rollover():
+    # A rollover missed while the dashboard was down is caught up as soon as it's
+    # scheduled, and it scores the week from miners_state, so wait for one full poll.
+    first_poll_done.wait()
+    schedule_cron("weekly_rollover", weekly_rollover, {"weekday": 6, "hour": 23, "minute": 59})
+
+def start_background_jobs():
+    _load_scheduler_state()
+    schedule_interval("miners", poll_miners_once, max(1, int(REFRESH_SECONDS)))
+    schedule_interval("coin_logos", refresh_logos_once, LOGO_REFRESH_SECONDS)
+    schedule_interval("coins", refresh_coins_once, max(5, int(COIN_REFRESH_SECONDS)), jitter_seconds=2)
+    threading.Thread(target=scheduler_loop, name="scheduler", daemon=True).start()
+    threading.Thread(target=_arm_weekly_rollover, name="rollover-arm", daemon=True).start()
+    threading.Thread(target=discord_dispatcher_loop, name="discord", daemon=True).start()
+
+
+# =========================
+# PUBLISHED SNAPSHOT
+# =========================
+
+# Writers (miner poll, coin/logo refresh, rollover, notification acks) rebuild the
+# whole /data payload and publish it by swapping one reference. Readers take
+# `published` as-is: no locks, and every field comes from the same version.
+#
+# Each document is also kept pre-encoded in pieces (EncodedDoc): one JSON fragment
+# per top-level key and one per miner. The full bodies are joined from those, and
+# sparse /data requests (fields=, miners=, online=, limit/offset) pick only the
+# pieces they need instead of building anything per request.
+Snapshot = namedtuple("Snapshot", "version built_unix data body body_v2 data_v2 enc enc_v2 miner_idx online_idx")
+EncodedDoc = namedtuple("EncodedDoc", "top items")
+
+_publish_lock = threading.Lock()
+published = None
+_snapshot_version = 0
+snapshot_last_err = None   # last failed build, shown in /metrics; the previous snapshot stays up
+
+def _build_data():
     with _coin_lock:
         coins_out = {}
         for sym in COIN_ORDER:
@@ -1521,6 +3614,13 @@ def data():
             }
         coin_ok_unix = coin_last_ok_unix
         coin_err = coin_last_err
+        coin_src = {name: dict(st) for name, st in coin_sources.items()}
+
+    with _coin_hist_lock:
+        for sym, c in coins_out.items():
+            t = coin_trends.get(sym) or {}
+            c["price_trend"] = t.get("price_trend")
+            c["diff_trend"] = t.get("diff_trend")
 
     with _logo_lock:
         logos_out = dict(coin_logos)
@@ -1567,6 +3667,7 @@ def data():
         "coins": coins_out,
         "coin_last_ok_unix": coin_ok_unix,
         "coin_last_err": coin_err,
+        "coin_sources": coin_src,
         "coin_logos": logos_out,
         "coin_logos_last_ok_unix": logos_ok_unix,
         "coin_logos_last_err": logos_err,
@@ -1582,9 +3683,17 @@ def data():
         "miners_per_page": MINERS_PER_PAGE,
         "maintenance_days_left": maint_days_left,
         "notifications": pending_notifs,
+        "farm": farm_aggregates(),
     }
 
-    for _, m in miners_state.items():
+    order, leaders, rank_ver = leaderboard()
+    out["leaders"] = leaders
+    out["rank_version"] = rank_ver
+    by_ip = {m["ip"]: m for m in miners_state.values()}
+    ranked = [by_ip.pop(ip) for ip in order if ip in by_ip]
+    ranked.extend(by_ip.values())   # polled but not indexed yet
+
+    for rank, m in enumerate(ranked):
         weekly_raw = diff_to_number(m.get("weekly_best"))
         if weekly_raw is None:
             weekly_raw = diff_to_number(m.get("session_best"))
@@ -1605,35 +3714,17 @@ def data():
 
         rej_pct_str = f"{rej_pct_val:.2f}%" if rej_pct_val is not None else "-"
 
+        rates = share_rates_for(m["ip"])
+        spm_val = (rates.get("5m") or {}).get("acc_per_min")
+        rej_1h_val = (rates.get("1h") or {}).get("reject_pct")
+
         ths_val = None
         try:
             ths_val = float(m.get("hashrate_ths")) if m.get("hashrate_ths") is not None else None
         except Exception:
             ths_val = None
 
-        raw_power = m.get("power_raw")
-        power_w = None
-        try:
-            if isinstance(raw_power, (list, tuple)):
-                vals = [float(x) for x in raw_power if x is not None]
-                if vals:
-                    power_w = sum(vals)
-            elif raw_power is not None:
-                power_w = float(raw_power)
-        except Exception:
-            power_w = None
-
-        if power_w is None:
-            v = m.get("voltage")
-            a = m.get("currentA")
-            try:
-                if v is not None and a is not None:
-                    v_f = float(v)
-                    a_f = float(a)
-                    if v_f > 0 and a_f > 0:
-                        power_w = v_f * a_f
-            except Exception:
-                power_w = None
+        power_w = miner_power_watts(m)
 
         eff_jth = None
         try:
@@ -1665,6 +3756,11 @@ def data():
             "shares_rejected_raw": m.get("shares_rejected"),
             "shares_rejected_pct": rej_pct_str,
             "shares_rejected_pct_raw": rej_pct_val,
+            "shares_per_min": f"{spm_val:.1f}/min" if spm_val is not None else "-",
+            "shares_per_min_raw": spm_val,
+            "shares_rejected_pct_1h": f"{rej_1h_val:.2f}%" if rej_1h_val is not None else "-",
+            "shares_rejected_pct_1h_raw": rej_1h_val,
+            "share_rates": rates,
             "session_best": fmt_diff_si_adaptive(weekly_raw) if weekly_raw is not None else "-",
             "session_best_raw": weekly_raw,
             "best_overall": fmt_diff_si_adaptive(m.get("best_overall")) if m.get("best_overall") is not None else "-",
@@ -1677,9 +3773,471 @@ def data():
             "efficiency_display": eff_display,
             "mining_display": mining_text,
             "mining_symbol": mining_symbol,
+            "rank": rank,
         })
 
-    return jsonify(out)
+    return out
+
+# /data?v=2: raw numbers only, short keys, null fields left out. The browser
+# formats everything. Keys:
+#   top    : v, ver, ts, fiat, cok (coins last ok), cerr, lb (last block ts),
+#            pwn/pwv (prev week best name/value), motw, motws (MOTW line), maint,
+#            refresh, sy/sr (stale thresholds), page, lg (coins with a logo),
+#            c (coins), m (miners, in rank order), nt (notifications), popup, farm,
+#            ld, rv
+#   coin   : p price, d diff, pt/dt price/diff trend
+#   miner  : n name, ip, md model, on online, up uptime s, h TH/s, ta/tv ASIC/VR C,
+#            f fan %, sa/sr shares acc/rej, rp reject %, rp1 reject % 1h,
+#            spm shares/min 5m, wb weekly best, bo best ever, b blocks,
+#            ls last seen, pw watts, ef J/TH, mt mining text, ms mining coin, rk rank
+#   ld     : leaders, bl block leader, w top weekly, b top best; rv rank version
+V2_MINER_KEYS = (
+    ("n", "name"), ("ip", "ip"), ("md", "model"), ("on", "online"), ("up", "uptime_seconds"),
+    ("h", "hashrate_ths_raw"), ("ta", "asic_temp_raw"), ("tv", "vr_temp_raw"), ("f", "fan_speed"),
+    ("sa", "shares_accepted_raw"), ("sr", "shares_rejected_raw"), ("rp", "shares_rejected_pct_raw"),
+    ("rp1", "shares_rejected_pct_1h_raw"), ("spm", "shares_per_min_raw"),
+    ("wb", "session_best_raw"), ("bo", "best_overall_raw"), ("b", "blocks"),
+    ("ls", "last_seen_unix"), ("pw", "power_watts"), ("ef", "efficiency_jth"),
+    ("mt", "mining_display"), ("ms", "mining_symbol"), ("rk", "rank"),
+)
+
+def _compact(d):
+    return {k: v for k, v in d.items() if v is not None}
+
+def _round_sig(v, nd=4):
+    if isinstance(v, float):
+        return float(f"{v:.{nd}g}") if math.isfinite(v) else None
+    return v
+
+def _v2_miner(m):
+    return _compact({k: _round_sig(m.get(src), 6) for k, src in V2_MINER_KEYS})
+
+def _build_data_v2(out):
+    with _weekly_lock:
+        prev_val = weekly_best.get("prev_value")
+    return _compact({
+        "v": 2,
+        "ver": out.get("version"),
+        "ts": int(time.time()),
+        "fiat": FIAT_SYMBOL,
+        "cok": out.get("coin_last_ok_unix"),
+        "cerr": out.get("coin_last_err"),
+        "lb": out.get("last_any_block_ts"),
+        "pwn": out.get("prev_week_best_name"),
+        "pwv": prev_val,
+        "motw": out.get("motw_name"),
+        "motws": out.get("motw_str"),
+        "maint": out.get("maintenance_days_left"),
+        "refresh": out.get("refresh_seconds"),
+        "sy": out.get("stale_yellow_seconds"),
+        "sr": out.get("stale_red_seconds"),
+        "page": out.get("miner_page_seconds"),
+        "lg": [sym for sym, url in (out.get("coin_logos") or {}).items() if url],
+        "c": {
+            sym: _compact({"p": c.get("price_gbp_raw"), "d": c.get("diff_raw"),
+                           "pt": c.get("price_trend"), "dt": c.get("diff_trend")})
+            for sym, c in (out.get("coins") or {}).items()
+        },
+        "m": [_v2_miner(m) for m in out.get("miners") or []],
+        "nt": out.get("notifications") or [],
+        "popup": out.get("last_block_popup"),
+        "farm": _compact({k: _round_sig(v, 6) for k, v in (out.get("farm") or {}).items()}),
+        "ld": _compact({
+            "bl": (out.get("leaders") or {}).get("block_leader"),
+            "w": (out.get("leaders") or {}).get("top_weekly"),
+            "b": (out.get("leaders") or {}).get("top_best"),
+        }),
+        "rv": out.get("rank_version"),
+    })
+
+def publish_snapshot():
+    global published, snapshot_last_err
+    with _publish_lock:
+        try:
+            snap = _build_snapshot(_snapshot_version + 1)
+        except Exception as e:
+            snapshot_last_err = f"{int(time.time())}: {str(e)[:200]}"
+            app.logger.exception("building /data snapshot failed; keeping version %s",
+                                 published.version if published is not None else None)
+            return published
+        published = snap
+        return published
+
+def _build_snapshot(version: int):
+    global _snapshot_version
+    out = _build_data()
+    out["version"] = version
+    out_v2 = _build_data_v2(out)
+    enc = _encode_doc(out, "miners")
+    enc_v2 = _encode_doc(out_v2, "m", ensure_ascii=False)
+
+    miner_idx = {}
+    online_idx = ([], [])
+    for i, m in enumerate(out["miners"]):
+        miner_idx.setdefault(str(m.get("name") or "").lower(), i)
+        miner_idx.setdefault(str(m.get("ip") or "").lower(), i)
+        online_idx[1 if m.get("online") else 0].append(i)
+
+    snap = Snapshot(
+        version, time.time(), out,
+        _join_doc(enc, "miners", enc.top, enc.items),
+        _join_doc(enc_v2, "m", enc_v2.top, enc_v2.items),
+        out_v2, enc, enc_v2, miner_idx, (tuple(online_idx[0]), tuple(online_idx[1])),
+    )
+    _snapshot_version = version
+    return snap
+
+def _encode_doc(doc, list_key, ensure_ascii=True):
+    enc = json.JSONEncoder(separators=(",", ":"), ensure_ascii=ensure_ascii).encode
+    top = {k: (enc(k) + ":" + enc(v)).encode("utf-8") for k, v in doc.items() if k != list_key}
+    items = tuple(enc(x).encode("utf-8") for x in doc.get(list_key) or [])
+    return EncodedDoc(top, items)
+
+def _join_doc(enc, list_key, top_keys, items, extra=b""):
+    parts = [enc.top[k] for k in top_keys if k in enc.top]
+    if items is not None:
+        parts.append(b'"' + list_key.encode("ascii") + b'":[' + b",".join(items) + b"]")
+    if extra:
+        parts.append(extra)
+    return b"{" + b",".join(parts) + b"}"
+
+def current_snapshot():
+    snap = published
+    if snap is None:
+        snap = publish_snapshot()
+    return snap
+
+def snapshot_meta():
+    snap = published
+    if snap is None:
+        return {"version": None, "last_err": snapshot_last_err}
+    return {"version": snap.version, "age_s": round(time.time() - snap.built_unix, 1),
+            "bytes": len(snap.body), "last_err": snapshot_last_err}
+
+
+# =========================
+# API
+# =========================
+
+@app.get("/health")
+def health():
+    return jsonify({"ok": True})
+
+@app.post("/ack_notification")
+def ack_notification():
+    try:
+        js = request.get_json(silent=True) or {}
+    except Exception:
+        js = {}
+    ids = []
+    if isinstance(js, dict):
+        if "id" in js and js.get("id") is not None:
+            ids = [js.get("id")]
+        elif "ids" in js and isinstance(js.get("ids"), list):
+            ids = js.get("ids")
+    changed = ack_notification_ids(ids)
+    if changed:
+        publish_snapshot()
+    return jsonify({"ok": True, "acked": changed})
+
+@app.get("/logo/<sym>")
+def logo(sym):
+    sym = str(sym or "").upper()
+    if not re.fullmatch(r"[A-Z0-9]{1,12}", sym):
+        return Response("not found", status=404, mimetype="text/plain")
+
+    # served from disk only; downloads happen in prewarm_logo_cache() off the request path
+    with _logo_file_lock:
+        meta = logo_files.get(sym)
+    if not meta:
+        return Response("not found", status=404, mimetype="text/plain")
+
+    headers = {
+        "Cache-Control": "public, max-age=604800",
+        "ETag": meta["etag"],
+    }
+    inm = request.headers.get("If-None-Match")
+    if inm and meta["etag"] in [t.strip() for t in inm.split(",")]:
+        return Response(status=304, headers=headers)
+
+    try:
+        with open(os.path.join(LOGO_CACHE_DIR, meta["file"]), "rb") as f:
+            body = f.read()
+    except Exception:
+        with _logo_file_lock:
+            logo_files.pop(sym, None)
+        return Response("not found", status=404, mimetype="text/plain")
+
+    return Response(body, mimetype=meta["content_type"], headers=headers)
+
+@app.get("/history/spark.bin")
+def spark_feed():
+    """Binary sparkline feed; ?since=<unix> for only newer points, ?miners=ip,ip to limit."""
+    try:
+        since = max(0, int(request.args.get("since") or 0))
+    except Exception:
+        since = 0
+    raw = request.args.get("miners")
+    ips = {x.strip() for x in raw.split(",") if x.strip()} if raw else None
+    resp = Response(encode_spark_feed(since, ips), mimetype="application/octet-stream")
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.get("/coins/history")
+def coins_history():
+    syms_arg = (request.args.get("sym") or "").strip()
+    syms = [x.strip().upper() for x in syms_arg.split(",") if x.strip()] if syms_arg else list(COIN_ORDER)
+    want_points = str(request.args.get("points", "0")).lower() in ("1", "true", "yes")
+    try:
+        since = int(request.args.get("since")) if request.args.get("since") else None
+    except Exception:
+        since = None
+
+    out = {}
+    with _coin_hist_lock:
+        for sym in syms:
+            if sym not in coin_history:
+                continue
+            t = coin_trends.get(sym) or {}
+            item = {
+                "price_trend": t.get("price_trend"),
+                "diff_trend": t.get("diff_trend"),
+                "deltas": t.get("deltas") or {},
+                "points_total": len(coin_history[sym]),
+            }
+            if want_points:
+                pts = coin_history[sym]
+                if since is not None:
+                    pts = pts[bisect.bisect_right([p[0] for p in pts], since):]
+                item["points"] = [list(p) for p in pts]
+            out[sym] = item
+
+    return jsonify({
+        "step_seconds": COIN_HISTORY_STEP_SECONDS,
+        "windows": list(COIN_TREND_WINDOWS),
+        "coins": out,
+    })
+
+@app.post("/restart_miners")
+def restart_miners():
+    if not RESTART_API_ENABLED:
+        return jsonify({"ok": False, "error": "disabled (set RESTART_API_ENABLED = True)"}), 403
+    try:
+        js = request.get_json(silent=True) or {}
+    except Exception:
+        js = {}
+    if not isinstance(js, dict):
+        js = {}
+    targets = js.get("miners") if isinstance(js.get("miners"), list) else None
+
+    # take the run lock here and hand it to the thread, so a 202 always means a run started
+    if not _restart_run_lock.acquire(blocking=False):
+        return jsonify({"ok": False, "error": "a restart run is already in progress"}), 409
+    try:
+        threading.Thread(
+            target=_restart_rolling_owned,
+            args=(targets, js.get("batch_size"), js.get("concurrency"), "manual"),
+            daemon=True,
+        ).start()
+    except Exception:
+        _restart_run_lock.release()
+        raise
+    return jsonify({"ok": True, "started": True}), 202
+
+@app.get("/restart_status")
+def restart_status():
+    return jsonify(restart_snapshot())
+
+@app.get("/weeks")
+def weeks():
+    """
+    ?last=N (default 12)  : newest-first week summaries, &full=1 adds each scoring table
+    ?miner=<name>         : that miner's archived rows (rank, components, score) per week
+    ?leaderboard=<by>     : all-time totals by wins|score|blocks|diff, &limit=N
+    """
+    try:
+        limit = int(request.args.get("limit") or 20)
+    except Exception:
+        limit = 20
+    by = request.args.get("leaderboard")
+    if by:
+        return jsonify({"by": by, "leaders": weeks_leaderboard(by, limit)})
+
+    name = request.args.get("miner")
+    try:
+        n = int(request.args.get("last") or (0 if name else 12))
+    except Exception:
+        n = 12
+    if name:
+        return jsonify({"miner": name, "weeks": weeks_for_miner(name, n or None)})
+
+    full = request.args.get("full") in ("1", "true", "yes")
+    return jsonify({"weeks": weeks_last(max(0, min(n, 520)), full)})
+
+@app.route("/motw/whatif", methods=["GET", "POST"])
+def motw_whatif():
+    """
+    Re-scores the current week with custom weights (blocks, diff, hr, sph, up),
+    given as query args or a JSON body. ?weeks=N also re-scores the last N
+    archived weeks (weeks=all for every week) and reports which winners change.
+    """
+    src = dict(request.args.items())
+    js = request.get_json(silent=True) if request.method == "POST" else None
+    if isinstance(js, dict):
+        src.update(js)
+    try:
+        weights = parse_score_weights(src)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        limit = max(1, int(src.get("limit") or 50))
+    except Exception:
+        limit = 50
+
+    t0 = time.perf_counter()
+    table = score_week(list(miners_state.values()), weights=weights)
+    rows = []
+    for rank, r in enumerate(table[:limit], start=1):
+        row = {k: r.get(k) for k in ("name", "blocks_week", "weekly_best", "hr_pct", "sph_pct", "uptime_frac")}
+        for k in SCORE_COMPONENTS + ("score",):
+            row[k] = round(float(r[k]), 4)
+        row["score_int"] = int(round(_clamp(r["score"], 0.0, 1.0) * 100.0))
+        row["rank"] = rank
+        rows.append(row)
+
+    out = {
+        "engine": scoring_engine_name(),
+        "weights": {k: round(v, 4) for k, v in weights.items()},
+        "miners": len(table),
+        "leader": rows[0]["name"] if rows else None,
+        "table": rows,
+    }
+
+    weeks_arg = src.get("weeks")
+    if weeks_arg:
+        try:
+            n = None if str(weeks_arg) == "all" else max(1, int(weeks_arg))
+        except Exception:
+            n = 12
+        out["archive"] = rescore_archived_weeks(weights, n)
+
+    out["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    return jsonify(out)
+
+@app.get("/weeks/<week_iso>")
+def weeks_one(week_iso):
+    item = weeks_get(week_iso)
+    if item is None:
+        return jsonify({"error": "unknown week"}), 404
+    return jsonify(item)
+
+@app.get("/metrics")
+def metrics():
+    snap = current_snapshot()
+    return jsonify({
+        "ts_unix": int(time.time()),
+        "snapshot": snapshot_meta(),
+        "breakers": breaker_snapshot(),
+        "scheduler": scheduler_snapshot(),
+        "restarts": restart_snapshot(),
+        "discord": discord_snapshot(),
+        # no snapshot yet (first build failed): snapshot.last_err says why
+        "coin_sources": snap.data.get("coin_sources") if snap is not None else None,
+    })
+
+DATA_QUERY_ARGS = ("fields", "miners", "online", "limit", "offset")
+
+def sparse_data(snap, args, v2=False):
+    """
+    Answers a filtered /data request from the snapshot's pre-encoded pieces.
+      fields=a,b   top-level keys and/or miner keys (v2: the short keys); miner keys
+                   trim each miner to just those, "miners" (v2: "m") keeps them whole
+      miners=x,y   names or IPs, in that order (case-insensitive)
+      online=1|0   only online / offline miners
+      offset, limit  page through the matching miners; "total" is the count before paging
+    Only the requested top-level keys are copied and only the miners on the page are
+    touched, so a request for one field of a few miners costs just that.
+    """
+    enc = snap.enc_v2 if v2 else snap.enc
+    list_key = "m" if v2 else "miners"
+    ver_key = "ver" if v2 else "version"
+    rows = (snap.data_v2.get("m") or []) if v2 else snap.data["miners"]
+
+    fields = [f.strip() for f in (args.get("fields") or "").split(",") if f.strip()]
+    if fields:
+        top_keys = [ver_key] + [f for f in fields if f in enc.top and f != ver_key]
+        miner_fields = [f for f in fields if f not in enc.top and f != list_key]
+        want_miners = list_key in fields or bool(miner_fields)
+    else:
+        top_keys = list(enc.top)
+        miner_fields = []
+        want_miners = True
+
+    raw = args.get("miners")
+    if raw:
+        idxs = []
+        seen = set()
+        for x in raw.split(","):
+            i = snap.miner_idx.get(x.strip().lower())
+            if i is not None and i not in seen:
+                seen.add(i)
+                idxs.append(i)
+        want_miners = True
+    else:
+        idxs = None
+
+    online = str(args.get("online", "")).lower()
+    if online in ("1", "true", "yes", "0", "false", "no"):
+        on = online in ("1", "true", "yes")
+        if idxs is None:
+            idxs = snap.online_idx[1 if on else 0]
+        else:
+            idxs = [i for i in idxs if bool(rows[i].get("on" if v2 else "online")) == on]
+        want_miners = True
+
+    if idxs is None:
+        idxs = range(len(rows))
+    total = len(idxs)
+    try:
+        offset = max(0, int(args.get("offset") or 0))
+    except Exception:
+        offset = 0
+    try:
+        limit = max(0, int(args.get("limit"))) if args.get("limit") not in (None, "") else None
+    except Exception:
+        limit = None
+    if offset or limit is not None:
+        want_miners = True
+    page = idxs[offset:offset + limit if limit is not None else None]
+
+    if not want_miners:
+        return _join_doc(enc, list_key, top_keys, None)
+
+    if miner_fields:
+        encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=not v2).encode
+        items = [
+            encode({f: rows[i][f] for f in miner_fields if f in rows[i]}).encode("utf-8")
+            for i in page
+        ]
+    else:
+        items = [enc.items[i] for i in page]
+    extra = json.dumps({"total": total, "offset": offset, "limit": limit}, separators=(",", ":"))[1:-1]
+    return _join_doc(enc, list_key, top_keys, items, extra.encode("utf-8"))
+
+@app.get("/data")
+def data():
+    snap = current_snapshot()
+    if snap is None:
+        # nothing has ever built; say so instead of failing (see /metrics snapshot.last_err)
+        resp = jsonify({"error": "no data yet", "detail": snapshot_last_err})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = str(max(1, int(REFRESH_SECONDS)))
+        return resp
+    v2 = request.args.get("v") == "2"
+    if any(k in request.args for k in DATA_QUERY_ARGS):
+        return Response(sparse_data(snap, request.args, v2), mimetype="application/json")
+    return Response(snap.body_v2 if v2 else snap.body, mimetype="application/json")
 
 
 # =========================
@@ -1783,15 +4341,21 @@ html, body {
 .tickerTrack {
   display: inline-flex;
   white-space: nowrap;
-  gap: 22px;
-  padding: 5px 10px;
+  padding: 5px 0;
   will-change: transform;
   animation: tickerMove 32s linear infinite;
 }
 
+/* two identical halves, so -50% lands exactly on the start of the second copy */
+.tickerHalf {
+  display: inline-flex;
+  gap: 22px;
+  padding: 0 11px;
+}
+
 @keyframes tickerMove {
-  from { transform: translateX(0); }
-  to   { transform: translateX(-50%); }
+  from { transform: translate3d(0, 0, 0); }
+  to   { transform: translate3d(-50%, 0, 0); }
 }
 
 .tickerItem {
@@ -1881,6 +4445,8 @@ html, body {
 .staleYellow { background: rgba(255,216,74,1); box-shadow: 0 0 8px rgba(255,216,74,0.35); }
 .staleRed { background: rgba(255,59,59,1); box-shadow: 0 0 8px rgba(255,59,59,0.35); }
 
+.spark { display: block; width: 100%; height: 16px; margin-top: 4px; opacity: 0.75; }
+
 .valueBig { font-size: 19px; font-weight: 900; margin-top: 6px; line-height: 1.05; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; color: rgba(255,255,255,0.92); width: 100%; }
 
 .green { color: var(--green); }
@@ -1933,6 +4499,10 @@ html, body {
 
 .footerLine { margin-top: 6px; font-size: 12px; color: rgba(255,255,255,0.55); display: flex; justify-content: space-between; gap: 10px; user-select: none; }
 
+/* painted from the cached snapshot until the first live /data answer */
+body.stale .miners, body.stale .tickerWrap { opacity: 0.55; }
+body.stale .updated { color: var(--yellow); }
+
 @media (max-width: 520px) {
   .title { font-size: 22px; }
   .live { font-size: 13px; }
@@ -1990,17 +4560,12 @@ const FALLBACK_LOGO = __FALLBACK_LOGO__;
 
 let MOTW_NAME = null;
 let MOTW_STR = null;
-let TICKER_STATS = null;
+let FARM = null;
 let MAINT_DAYS_LEFT = null;
 
-let globalSorted = [];
-let rotateOffset = 0;
-let lastSortedFingerprint = null;
-
 let DASH_LAST_OK_UNIX = null;
 
 let NOTIF_QUEUE = [];
-let NOTIF_IDS = new Set();
 let ACTIVE_NOTIF = null;
 
 function showBlockPopup(minerName) {
@@ -2071,6 +4636,13 @@ function dismissActiveNotification() {
   el.addEventListener('touchstart', dismissActiveNotification, { passive: true });
 })();
 
+function trendIndicator(t) {
+  if (t === 'up') return { ch: '▲', cls: 'indUp' };
+  if (t === 'down') return { ch: '▼', cls: 'indDown' };
+  if (t === 'flat') return { ch: '—', cls: 'indFlat' };
+  return null;
+}
+
 function indicator(newVal, oldVal) {
   const n = Number(newVal);
   const o = Number(oldVal);
@@ -2182,74 +4754,15 @@ function rankIconForIndex(idx) {
 function coinLogoHTML(sym) {
   const primary = (LIVE_LOGOS && LIVE_LOGOS[sym]) ? LIVE_LOGOS[sym] : '';
   const fallbackList = (FALLBACK_LOGO[sym] || []);
-  const urls = [];
-  if (primary) urls.push(primary);
-  for (let i = 0; i < fallbackList.length; i++) if (fallbackList[i]) urls.push(fallbackList[i]);
-  if (!urls.length) return '';
-  const first = urls[0];
-  return '<img class="coinLogo" src="' + first + '" alt="' + sym +
+  if (!primary && !fallbackList.length) return '';
+  // served from the local on-disk logo cache so kiosks never need the WAN
+  const src = '/logo/' + encodeURIComponent(sym);
+  return '<img class="coinLogo" src="' + src + '" alt="' + sym +
          '" loading="lazy" onerror="this.style.display=\\'none\\';">';
 }
 
 function motwTickerHTML() { return MOTW_STR || null; }
 
-function computeTickerStats(miners) {
-  if (!miners || !miners.length) { TICKER_STATS = null; return; }
-
-  let totalMiners = miners.length;
-  let activeMiners = 0;
-  let hashSum = 0, hashCount = 0;
-  let tempSum = 0, tempCount = 0;
-  let maxTemp = null;
-  let totalBlocks = 0;
-  let blocksSeen = false;
-  let totalPower = 0, powerCount = 0;
-
-  for (const m of miners) {
-    if (m.online) activeMiners++;
-
-    const hrStr = (m.hashrate || '').split(' ')[0];
-    const hv = parseFloat(hrStr);
-    if (Number.isFinite(hv)) { hashSum += hv; hashCount++; }
-
-    const t1 = Number(m.asic_temp_raw);
-    const t2 = Number(m.vr_temp_raw);
-    for (const t of [t1, t2]) {
-      if (Number.isFinite(t)) {
-        tempSum += t; tempCount++;
-        if (maxTemp === null || t > maxTemp) maxTemp = t;
-      }
-    }
-
-    const b = Number(m.blocks);
-    if (Number.isFinite(b) && b >= 0) { totalBlocks += b; blocksSeen = true; }
-
-    const pw = Number(m.power_watts);
-    if (Number.isFinite(pw) && pw > 0) {
-      totalPower += pw;
-      powerCount++;
-    }
-  }
-
-  const totalHash = hashCount ? hashSum : null;
-  const totalPowerW = powerCount ? totalPower : null;
-  let avgEff = null;
-  if (totalPowerW != null && totalHash != null && Number.isFinite(totalHash) && totalHash > 0) {
-    avgEff = totalPowerW / totalHash;
-  }
-
-  TICKER_STATS = {
-    activeMiners: activeMiners,
-    totalMiners: totalMiners,
-    totalHash: totalHash,
-    avgTemp: tempCount ? (tempSum / tempCount) : null,
-    maxTemp: maxTemp,
-    totalBlocks: blocksSeen ? totalBlocks : null,
-    totalPowerW: totalPowerW,
-    avgEffJTH: avgEff,
-  };
-}
-
 function formatTotalHash(th) {
   const v = Number(th);
   if (!Number.isFinite(v)) return '-';
@@ -2258,89 +4771,147 @@ function formatTotalHash(th) {
   return v.toFixed(2) + ' TH/s';
 }
 
+function tickerTextItem(key, text) {
+  return { key: key, cls: ' tickerWeekly', tpl: '<span class="tf"></span>', vals: [{ t: text }] };
+}
+
+// farm totals come from the server (d.farm), so every screen shows the same numbers
 function statsTickerItems() {
-  if (!TICKER_STATS) return [];
-  const s = TICKER_STATS;
+  if (!FARM || !(FARM.total_miners > 0)) return [];
+  const s = FARM;
   const items = [];
 
-  if (s.totalBlocks != null && Number.isFinite(Number(s.totalBlocks))) {
-    items.push({ html: '🧱 Total Blocks Found - ' + s.totalBlocks + ' 🧱', cls: ' tickerWeekly' });
+  if (s.total_blocks != null && Number.isFinite(Number(s.total_blocks))) {
+    items.push(tickerTextItem('blocks', '🧱 Total Blocks Found - ' + s.total_blocks + ' 🧱'));
   }
-  if (s.totalMiners > 0) {
-    items.push({ html: '👷 Active Miners: ' + s.activeMiners + ' / ' + s.totalMiners + ' 👷', cls: ' tickerWeekly' });
+  if (s.total_miners > 0) {
+    items.push(tickerTextItem('active', '👷 Active Miners: ' + s.active_miners + ' / ' + s.total_miners + ' 👷'));
   }
-  if (s.totalHash != null && Number.isFinite(Number(s.totalHash))) {
-    items.push({ html: '⚡ Total Hashrate: ' + formatTotalHash(s.totalHash) + ' ⚡', cls: ' tickerWeekly' });
+  if (s.total_hashrate_ths != null && Number.isFinite(Number(s.total_hashrate_ths))) {
+    items.push(tickerTextItem('hash', '⚡ Total Hashrate: ' + formatTotalHash(s.total_hashrate_ths) + ' ⚡'));
   }
-  if (s.totalPowerW != null && Number.isFinite(Number(s.totalPowerW))) {
-    const p = Math.round(Number(s.totalPowerW));
-    items.push({ html: '🔌 Total Power: ' + p + ' W 🔌', cls: ' tickerWeekly' });
+  if (s.total_power_w != null && Number.isFinite(Number(s.total_power_w))) {
+    const p = Math.round(Number(s.total_power_w));
+    items.push(tickerTextItem('power', '🔌 Total Power: ' + p + ' W 🔌'));
   }
-  if (s.avgEffJTH != null && Number.isFinite(Number(s.avgEffJTH))) {
-    const e = Number(s.avgEffJTH);
+  if (s.avg_efficiency_jth != null && Number.isFinite(Number(s.avg_efficiency_jth))) {
+    const e = Number(s.avg_efficiency_jth);
     const val = (e >= 100 ? e.toFixed(0) : e.toFixed(1));
-    items.push({ html: '📈 Avg Efficiency: ' + val + ' J/Th 📈', cls: ' tickerWeekly' });
+    items.push(tickerTextItem('eff', '📈 Avg Efficiency: ' + val + ' J/Th 📈'));
   }
-  if (s.avgTemp != null && Number.isFinite(Number(s.avgTemp))) {
-    const avgC = Number(s.avgTemp);
-    const maxC = (s.maxTemp != null && Number.isFinite(Number(s.maxTemp))) ? Number(s.maxTemp) : avgC;
+  if (s.avg_temp_c != null && Number.isFinite(Number(s.avg_temp_c))) {
+    const avgC = Number(s.avg_temp_c);
+    const maxC = (s.max_temp_c != null && Number.isFinite(Number(s.max_temp_c))) ? Number(s.max_temp_c) : avgC;
     const avg = formatTempDisplay(avgC);
     const max = formatTempDisplay(maxC);
-    items.push({ html: '🌡 Temperatures - Avg ' + avg + ' / Max ' + max + ' 🌡', cls: ' tickerWeekly' });
+    items.push(tickerTextItem('temp', '🌡 Temperatures - Avg ' + avg + ' / Max ' + max + ' 🌡'));
   }
   if (MAINT_DAYS_LEFT != null && Number.isFinite(Number(MAINT_DAYS_LEFT))) {
-    items.push({ html: '🧰 Maintenance in ' + MAINT_DAYS_LEFT + ' days 🧰', cls: ' tickerWeekly' });
+    items.push(tickerTextItem('maint', '🧰 Maintenance in ' + MAINT_DAYS_LEFT + ' days 🧰'));
   }
   return items;
 }
 
-function buildTickerHTML(coins) {
+// Ticker items: { key, cls, tpl, vals }. tpl is the static markup with one
+// <span class="tf"> per entry in vals ({ t: text, c: className }). Item nodes
+// are built once per tpl and only changed fields are written afterwards.
+function tickerItems(coins) {
   function item(sym) {
     var c = coins[sym] || {};
     var prev = prevCoins[sym];
 
-    var pInd = indicator(c.price_gbp_raw, prev.price);
-    var dInd = indicator(c.diff_raw, prev.diff);
+    // server-side trend (shared by every screen); local compare only until history exists
+    var pInd = trendIndicator(c.price_trend) || indicator(c.price_gbp_raw, prev.price);
+    var dInd = trendIndicator(c.diff_trend) || indicator(c.diff_raw, prev.diff);
 
     if (c.price_gbp_raw != null) prev.price = c.price_gbp_raw;
     if (c.diff_raw != null) prev.diff = c.diff_raw;
 
-    var html = '';
-    html += coinLogoHTML(sym);
-    html += sym;
-    html += '<span class="mut">Price:</span>';
-    html += '<span class="ind ' + pInd.cls + '">' + pInd.ch + '</span>';
-    html += '<span>' + (c.price_gbp || '-') + '</span>';
-    html += '<span class="mut">Diff:</span>';
-    html += '<span class="ind ' + dInd.cls + '">' + dInd.ch + '</span>';
-    html += '<span>' + (c.diff || '-') + '</span>';
-    return html;
+    return {
+      key: 'coin:' + sym,
+      cls: '',
+      tpl: coinLogoHTML(sym) + sym +
+           '<span class="mut">Price:</span><span class="tf"></span><span class="tf"></span>' +
+           '<span class="mut">Diff:</span><span class="tf"></span><span class="tf"></span>',
+      vals: [
+        { t: pInd.ch, c: 'tf ind ' + pInd.cls },
+        { t: c.price_gbp || '-' },
+        { t: dInd.ch, c: 'tf ind ' + dInd.cls },
+        { t: c.diff || '-' },
+      ],
+    };
   }
 
   var items = [];
-  for (const sym of COIN_ORDER) items.push({ html: item(sym), cls: "" });
+  for (const sym of COIN_ORDER) items.push(item(sym));
 
   var motwLine = motwTickerHTML();
-  if (motwLine) items.push({ html: motwLine, cls: " tickerWeekly" });
+  if (motwLine) items.push({ key: 'motw', cls: ' tickerWeekly', tpl: motwLine, vals: [] });
+
+  return items.concat(statsTickerItems());
+}
+
+const TICKER_ITEMS = new Map();   // key -> { tpl, cls, nodes: [copyA, copyB], fields, last }
+let tickerHalves = null;
+
+function renderTicker(items) {
+  if (!tickerHalves) {
+    const track = document.getElementById('tickerTrack');
+    track.textContent = '';
+    tickerHalves = [document.createElement('div'), document.createElement('div')];
+    for (const h of tickerHalves) {
+      h.className = 'tickerHalf';
+      track.appendChild(h);
+    }
+  }
+
+  const seen = new Set();
+  for (let i = 0; i < items.length; i++) {
+    const it = items[i];
+    seen.add(it.key);
+
+    let entry = TICKER_ITEMS.get(it.key);
+    if (!entry || entry.tpl !== it.tpl || entry.cls !== it.cls) {
+      if (entry) for (const n of entry.nodes) n.remove();
+      const nodes = tickerHalves.map(function() {
+        const el = document.createElement('div');
+        el.className = 'tickerItem' + it.cls;
+        el.innerHTML = it.tpl;
+        return el;
+      });
+      entry = { tpl: it.tpl, cls: it.cls, nodes: nodes, fields: nodes.map(n => n.querySelectorAll('.tf')), last: [] };
+      TICKER_ITEMS.set(it.key, entry);
+    }
+
+    for (let h = 0; h < tickerHalves.length; h++) {
+      const half = tickerHalves[h];
+      const at = half.children[i];
+      if (at !== entry.nodes[h]) half.insertBefore(entry.nodes[h], at || null);
+    }
 
-  items = items.concat(statsTickerItems());
+    for (let f = 0; f < it.vals.length; f++) {
+      const v = it.vals[f];
+      const last = entry.last[f] || {};
+      for (const fields of entry.fields) {
+        if (last.t !== v.t) fields[f].textContent = v.t;
+        if (v.c !== undefined && last.c !== v.c) fields[f].className = v.c;
+      }
+      entry.last[f] = v;
+    }
+  }
 
-  var doubled = items.concat(items);
-  return doubled.map(function(obj) {
-    return '<div class="tickerItem' + obj.cls + '">' + obj.html + '</div>';
-  }).join('');
+  for (const [key, entry] of TICKER_ITEMS) {
+    if (seen.has(key)) continue;
+    for (const n of entry.nodes) n.remove();
+    TICKER_ITEMS.delete(key);
+  }
 }
 
 function applyCoinsIfReady() {
   if (!pendingCoins) return;
   currentCoins = pendingCoins;
   pendingCoins = null;
-  document.getElementById('tickerTrack').innerHTML = buildTickerHTML(currentCoins);
-}
-
-async function fetchData() {
-  const r = await fetch('/data', {cache:'no-store'});
-  return await r.json();
+  renderTicker(tickerItems(currentCoins));
 }
 
 document.getElementById('tickerTrack')
@@ -2348,25 +4919,56 @@ document.getElementById('tickerTrack')
     applyCoinsIfReady();
   });
 
-function buildSortedFingerprint(sortedMiners) {
-  return sortedMiners.map(m => (m.name + ':' + (m.blocks||0) + ':' + (m.best_overall_raw||0))).join('|');
+// One DOM row per miner, built once and then patched cell by cell.
+const ROW_TEMPLATE =
+  '<div class="card"><div class="label">MINER</div>' +
+    '<div class="minerLine"><div class="rankIcon"></div><span class="blocks"></span><div class="minerName"></div></div>' +
+    '<div class="sub"><span class="miningWrap"></span><span class="statusDot"></span><span></span></div>' +
+  '</div>' +
+  '<div class="card"><div class="label">HASHRATE</div><div class="valueBig"></div><canvas class="spark"></canvas></div>' +
+  '<div class="card"><div class="label">ASIC / VR / FAN</div><div class="valueBig"></div><canvas class="spark"></canvas></div>' +
+  '<div class="card"><div class="label">REJECT %</div><div class="valueBig"></div></div>' +
+  '<div class="card"><div class="label">WEEKLY / BEST</div><div class="valueBig"></div></div>';
+
+const ROW_CACHE = new Map();   // name|ip -> row (see createMinerRow)
+let LEADERS = { topWeekly: null, topBest: null, blockLeader: null };
+
+function createMinerRow() {
+  const el = document.createElement('div');
+  el.className = 'row';
+  el.innerHTML = ROW_TEMPLATE;
+  const vals = el.querySelectorAll('.valueBig');
+  const sparks = el.querySelectorAll('canvas');
+  const sub = el.querySelector('.sub');
+  return {
+    sparkHr: sparks[0],
+    sparkTemp: sparks[1],
+    el: el,
+    cards: el.querySelectorAll('.card'),
+    rank: el.querySelector('.rankIcon'),
+    blocks: el.querySelector('.blocks'),
+    name: el.querySelector('.minerName'),
+    mining: el.querySelector('.miningWrap'),
+    dot: el.querySelector('.statusDot'),
+    third: sub.lastElementChild,
+    hashrate: vals[0],
+    temp: vals[1],
+    reject: vals[2],
+    best: vals[3],
+    last: {},
+  };
 }
 
-function minerRowHTML(m, globalIdx, slide, topWeeklyName, topBestName, blockLeaderName) {
-  const isTopWeekly = (m.name === topWeeklyName);
-  const isTopBest = (m.name === topBestName);
-
-  const icon = rankIconForIndex(globalIdx);
-  const isBlockLeader = (m.name === blockLeaderName);
-  const blockIcon = isBlockLeader ? '🟨' : '🧱';
-  const blocksStr = padBlocks(m.blocks);
+function patch(row, key, el, prop, val) {
+  if (row.last[key] === val) return;
+  row.last[key] = val;
+  el[prop] = val;
+}
 
+function patchMinerRow(row, m, globalIdx, slide) {
+  const isBlockLeader = (m.name === LEADERS.blockLeader);
   const st = staleStatus(m);
   const uptimeText = m.online ? uptimeDaysHoursText(m.uptime_seconds) : 'offline';
-  const thirdBit = st.extraText ? st.extraText : uptimeText;
-
-  const cardClass = slide ? 'card slideRow' : 'card';
-  const motwClass = (MOTW_NAME && m.name === MOTW_NAME) ? ' motwName' : '';
 
   const miningText = m.mining_display || (m.ip || '');
   let miningLogoHTML = '';
@@ -2374,33 +4976,68 @@ function minerRowHTML(m, globalIdx, slide, topWeeklyName, topBestName, blockLead
     miningLogoHTML = coinLogoHTML(m.mining_symbol);
   }
 
-  let html = '';
-  html += '<div class="row">';
-  html += '<div class="' + cardClass + '">';
-  html += '<div class="label">MINER</div>';
-  html += '<div class="minerLine">';
-  html += '<div class="rankIcon">' + icon + '</div>';
-  html += '<span class="blocks' + (isBlockLeader ? ' blocksLeader' : '') + '">';
-  html += blockIcon + ' ' + blocksStr + '</span>';
-  html += '<div class="minerName' + motwClass + '" title="' + m.name + '">';
-  html += m.name;
-  html += '</div></div>';
-  html += '<div class="sub">';
-  html += '<span class="miningWrap">' + (miningLogoHTML || '') + '<span>' + miningText + '</span></span>';
-  html += '<span class="statusDot ' + st.dotClass + '"></span>';
-  html += '<span>' + thirdBit + '</span>';
-  html += '</div>';
-  html += '</div>';
-
-  html += '<div class="' + cardClass + '"><div class="label">HASHRATE</div><div class="valueBig">' + (m.hashrate || '-') + '</div></div>';
-  html += '<div class="' + cardClass + '"><div class="label">ASIC / VR / FAN</div><div class="valueBig">' + tempHTML(m) + '</div></div>';
-
-  const sharesText = (m.shares_rejected_pct || '-');
-  html += '<div class="' + cardClass + '"><div class="label">REJECT %</div><div class="valueBig">' + sharesText + '</div></div>';
-
-  html += '<div class="' + cardClass + '"><div class="label">WEEKLY / BEST</div><div class="valueBig">' + sessionBestHTML(m, isTopWeekly, isTopBest) + '</div></div>';
-  html += '</div>';
-  return html;
+  patch(row, 'rank', row.rank, 'textContent', rankIconForIndex(globalIdx));
+  patch(row, 'blocksCls', row.blocks, 'className', 'blocks' + (isBlockLeader ? ' blocksLeader' : ''));
+  patch(row, 'blocks', row.blocks, 'textContent', (isBlockLeader ? '🟨' : '🧱') + ' ' + padBlocks(m.blocks));
+  patch(row, 'nameCls', row.name, 'className', 'minerName' + ((MOTW_NAME && m.name === MOTW_NAME) ? ' motwName' : ''));
+  patch(row, 'name', row.name, 'textContent', m.name);
+  patch(row, 'title', row.name, 'title', m.name);
+  patch(row, 'mining', row.mining, 'innerHTML', (miningLogoHTML || '') + '<span>' + miningText + '</span>');
+  patch(row, 'dot', row.dot, 'className', 'statusDot ' + st.dotClass);
+  patch(row, 'third', row.third, 'textContent', st.extraText ? st.extraText : uptimeText);
+  patch(row, 'hashrate', row.hashrate, 'textContent', m.hashrate || '-');
+  patch(row, 'temp', row.temp, 'innerHTML', tempHTML(m));
+  patch(row, 'reject', row.reject, 'textContent', m.shares_rejected_pct || '-');
+  patch(row, 'best', row.best, 'innerHTML',
+        sessionBestHTML(m, m.name === LEADERS.topWeekly, m.name === LEADERS.topBest));
+
+  if (slide) {
+    // restart the slide-in animation on the reused nodes
+    for (const c of row.cards) c.classList.remove('slideRow');
+    void row.cards[0].offsetWidth;
+    for (const c of row.cards) c.classList.add('slideRow');
+    row.last.slide = true;
+  } else if (row.last.slide) {
+    for (const c of row.cards) c.classList.remove('slideRow');
+    row.last.slide = false;
+  }
+}
+
+// Sparklines: the worker decodes /history/spark.bin and sends a miner's arrays
+// only when they changed; they're drawn once per change.
+const SPARK_POINTS = __SPARK_POINTS__;
+
+function drawSpark(cv, vals, color) {
+  if (!cv || !vals) return;
+  const dpr = window.devicePixelRatio || 1;
+  const w = Math.max(1, Math.round((cv.clientWidth || 80) * dpr));
+  const h = Math.max(1, Math.round((cv.clientHeight || 16) * dpr));
+  if (cv.width !== w) cv.width = w;
+  if (cv.height !== h) cv.height = h;
+  const ctx = cv.getContext('2d');
+  ctx.clearRect(0, 0, w, h);
+  let lo = Infinity, hi = -Infinity;
+  for (let i = 0; i < vals.length; i++) {
+    const v = vals[i];
+    if (v === v) { if (v < lo) lo = v; if (v > hi) hi = v; }
+  }
+  if (!(hi >= lo) || vals.length < 2) return;
+  const span = (hi - lo) || 1;
+  const step = w / (SPARK_POINTS - 1);
+  const x0 = w - (vals.length - 1) * step;
+  ctx.strokeStyle = color;
+  ctx.lineWidth = dpr;
+  ctx.beginPath();
+  let pen = false;
+  for (let i = 0; i < vals.length; i++) {
+    const v = vals[i];
+    if (v !== v) { pen = false; continue; }   // NaN = offline gap
+    const x = x0 + i * step;
+    const y = h - 1 - ((v - lo) / span) * (h - 2);
+    if (pen) ctx.lineTo(x, y); else ctx.moveTo(x, y);
+    pen = true;
+  }
+  ctx.stroke();
 }
 
 function getVisibleRows() {
@@ -2411,170 +5048,121 @@ function getVisibleRows() {
   return 2;
 }
 
-function renderAllMiners(slideRotatingRow) {
+// The pipeline (fetch, parse, paging, sparklines, notification de-dup) runs in
+// /dash_worker.js. This side only draws what it's sent: the visible rows, the
+// ticker when something on it changed, and new notifications.
+function renderRows(f) {
   const container = document.getElementById('miners');
   const footer = document.getElementById('footerLine');
   if (!container) return;
+  if (f.leaders) LEADERS = f.leaders;
+  for (const key of (f.gone || [])) ROW_CACHE.delete(key);
 
-  const sorted = globalSorted;
-  const total = sorted.length;
-  if (!total) {
-    container.innerHTML = '';
+  const rows = f.rows;
+  if (!f.total) {
+    container.textContent = '';
     if (footer) footer.textContent = '';
     return;
   }
 
-  const visibleCount = Math.max(1, getVisibleRows());
-  const display = [];
-  let rotatingRowIndex = null;
-
-  if (total <= visibleCount) {
-    for (let i = 0; i < total; i++) display.push(sorted[i]);
-  } else {
-    const fixedCount = Math.max(1, visibleCount - 1);
-    const fixedToShow = Math.min(fixedCount, total);
-    for (let i = 0; i < fixedToShow; i++) display.push(sorted[i]);
-
-    const rotPool = sorted.slice(fixedToShow);
-    const len = rotPool.length;
-    if (len === 1) {
-      display.push(rotPool[0]);
-      rotatingRowIndex = display.length - 1;
-    } else if (len > 1) {
-      const idx = ((rotateOffset % len) + len) % len;
-      display.push(rotPool[idx]);
-      rotatingRowIndex = display.length - 1;
+  for (let i = 0; i < rows.length; i++) {
+    const r = rows[i];
+    let row = ROW_CACHE.get(r.key);
+    if (!row) {
+      row = createMinerRow();
+      ROW_CACHE.set(r.key, row);
     }
-  }
+    const at = container.children[i];
+    if (at !== row.el) container.insertBefore(row.el, at || null);
 
-  const topWeeklyName = (function() {
-    let bestName = null;
-    let bestVal = -Infinity;
-    for (const m of sorted) {
-      const v = Number(m.session_best_raw);
-      if (Number.isFinite(v) && v > bestVal) { bestVal = v; bestName = m.name; }
-    }
-    return bestName;
-  })();
-
-  const topBestName = (function() {
-    let bestName = null;
-    let bestVal = -Infinity;
-    for (const m of sorted) {
-      const v = Number(m.best_overall_raw);
-      if (Number.isFinite(v) && v > bestVal) { bestVal = v; bestName = m.name; }
+    patchMinerRow(row, r.m, r.rank, f.slide && i === f.rotIdx);
+    if (r.spark) {
+      drawSpark(row.sparkHr, r.spark.hr, 'rgba(39,245,167,0.9)');
+      drawSpark(row.sparkTemp, r.spark.temp, 'rgba(255,159,42,0.9)');
     }
-    return bestName;
-  })();
-
-  let maxBlocks = -Infinity;
-  let maxBlocksName = null;
-  for (const m of sorted) {
-    const b = Number(m.blocks || 0);
-    if (Number.isFinite(b) && b > maxBlocks) { maxBlocks = b; maxBlocksName = m.name; }
   }
-
-  let html = '';
-  for (let i = 0; i < display.length; i++) {
-    const m = display[i];
-    const globalIdx = sorted.findIndex(x => x.name === m.name && x.ip === m.ip);
-    const isRotRow = (rotatingRowIndex !== null && i === rotatingRowIndex);
-    const slide = slideRotatingRow && isRotRow;
-    html += minerRowHTML(m, globalIdx < 0 ? 0 : globalIdx, slide, topWeeklyName, topBestName, maxBlocksName);
-  }
-
-  container.innerHTML = html;
+  while (container.children.length > rows.length) container.removeChild(container.lastElementChild);
 
   if (footer) {
-    let txt = 'Showing top ' + display.length + ' miners (of ' + total + ')';
-    if (rotatingRowIndex !== null) txt += ' • row ' + (rotatingRowIndex + 1) + ' rotates every ' + MINER_PAGE_SECONDS + 's';
+    let txt = 'Showing top ' + rows.length + ' miners (of ' + f.total + ')';
+    if (f.rotIdx !== null) txt += ' • row ' + (f.rotIdx + 1) + ' rotates every ' + MINER_PAGE_SECONDS + 's';
     footer.textContent = txt;
   }
 }
 
-function mergeNotificationsFromServer(arr) {
-  if (!arr || !arr.length) return;
-  for (const n of arr) {
-    if (!n || !n.id) continue;
-    const id = String(n.id);
-    if (NOTIF_IDS.has(id)) continue;
-    NOTIF_IDS.add(id);
-    NOTIF_QUEUE.push({ id: id, type: n.type, ts_unix: Number(n.ts_unix || 0), payload: n.payload || {} });
-  }
-  NOTIF_QUEUE.sort((a,b) => (Number(a.ts_unix||0) - Number(b.ts_unix||0)));
-}
+function applyFrame(f) {
+  if (!f.stale) DASH_LAST_OK_UNIX = Math.floor(Date.now() / 1000);
+  document.body.classList.toggle('stale', !!f.stale);
 
-async function tick() {
-  try {
-    const d = await fetchData();
-    DASH_LAST_OK_UNIX = Math.floor(Date.now() / 1000);
+  const sinceTxt = sinceLastBlockText(f.lastBlock);
+  const coinsAge = secondsAgoText(f.coinOk);
+  const dashAge = f.stale ? 'cached ' + secondsAgoText(f.builtAt) + ', reconnecting…' : secondsAgoText(DASH_LAST_OK_UNIX);
 
-    const sinceTxt = sinceLastBlockText(d.last_any_block_ts);
-    const coinsAge = secondsAgoText(d.coin_last_ok_unix);
-    const dashAge = secondsAgoText(DASH_LAST_OK_UNIX);
+  if (f.logos) LIVE_LOGOS = f.logos;
 
-    if (d.coin_logos) LIVE_LOGOS = d.coin_logos || LIVE_LOGOS;
+  MOTW_NAME = f.motwName || null;
+  MOTW_STR = f.motwStr || null;
+  MAINT_DAYS_LEFT = f.maint;
 
-    MOTW_NAME = d.motw_name || null;
-    MOTW_STR = d.motw_str || null;
-    MAINT_DAYS_LEFT = d.maintenance_days_left;
+  const updatedEl = document.getElementById('updated');
+  if (updatedEl) {
+    updatedEl.textContent =
+      'Dash Updated: ' + dashAge +
+      ' • Coins Updated: ' + coinsAge +
+      ' • Last Block: ' + sinceTxt;
+  }
 
-    const updatedEl = document.getElementById('updated');
-    if (updatedEl) {
-      updatedEl.textContent =
-        'Dash Updated: ' + dashAge +
-        ' • Coins Updated: ' + coinsAge +
-        ' • Last Block: ' + sinceTxt;
-    }
+  if (f.notifs && f.notifs.length) {
+    for (const n of f.notifs) NOTIF_QUEUE.push(n);
+    NOTIF_QUEUE.sort((a,b) => (Number(a.ts_unix||0) - Number(b.ts_unix||0)));
+    showNextNotificationIfIdle();
+  }
 
-    if (d.notifications && Array.isArray(d.notifications)) {
-      mergeNotificationsFromServer(d.notifications);
-      showNextNotificationIfIdle();
+  if (f.coins) {
+    FARM = f.farm || null;
+    if (!currentCoins) {
+      currentCoins = f.coins;
+      renderTicker(tickerItems(currentCoins));
+    } else {
+      pendingCoins = f.coins;
     }
+  }
+}
 
-    const miners = (d.miners || []).slice();
-    const sorted = miners.sort(function(a, b) {
-      const ab = Number(a.blocks || 0);
-      const bb = Number(b.blocks || 0);
-      if (Number.isFinite(ab) && Number.isFinite(bb) && bb !== ab) return bb - ab;
-
-      const av = Number(a.best_overall_raw);
-      const bv = Number(b.best_overall_raw);
-      if (Number.isFinite(av) && Number.isFinite(bv) && bv !== av) return bv - av;
-
-      return (a.name || '').localeCompare(b.name || '');
-    });
-
-    computeTickerStats(sorted);
-
-    if (d.coins) {
-      if (!currentCoins) {
-        currentCoins = d.coins;
-        document.getElementById('tickerTrack').innerHTML = buildTickerHTML(currentCoins);
-      } else {
-        pendingCoins = d.coins;
-      }
-    }
+function onPipelineMessage(f) {
+  if (!f) return;
+  if (f.t === 'frame') applyFrame(f);
+  if (f.rows) renderRows(f);
+}
 
-    const fingerprint = buildSortedFingerprint(sorted);
-    const changed = (fingerprint !== lastSortedFingerprint);
-    lastSortedFingerprint = fingerprint;
+let PIPE = null;   // (msg) => void, into the worker or the in-page fallback
 
-    globalSorted = sorted;
-    if (changed) rotateOffset = 0;
-    renderAllMiners(false);
-  } catch (e) {}
+function startPipeline() {
+  function ready(send) {
+    PIPE = send;
+    PIPE({ cmd: 'rows', n: getVisibleRows() });
+    PIPE({ cmd: 'tick' });
+  }
+  if (window.Worker) {
+    try {
+      const w = new Worker('/dash_worker.js');
+      w.onmessage = function(e) { onPipelineMessage(e.data); };
+      ready(function(msg) { w.postMessage(msg); });
+      return;
+    } catch (e) {}
+  }
+  // no Workers here: run the same script on the page
+  const s = document.createElement('script');
+  s.src = '/dash_worker.js';
+  s.onload = function() {
+    self.MSDPipeline.connect(onPipelineMessage);
+    ready(self.MSDPipeline.handle);
+  };
+  document.head.appendChild(s);
 }
 
-function rotatePage() {
-  const sorted = globalSorted;
-  if (!sorted || sorted.length === 0) return;
-  const visibleCount = Math.max(1, getVisibleRows());
-  if (sorted.length <= visibleCount) return;
-  const fixedCount = Math.max(1, visibleCount - 1);
-  const rotLen = Math.max(1, sorted.length - fixedCount);
-  rotateOffset = (rotateOffset + 1) % rotLen;
-  renderAllMiners(true);
+function pipe(msg) {
+  if (PIPE) PIPE(msg);
 }
 
 function updateLiveClock() {
@@ -2591,11 +5179,28 @@ function updateLiveClock() {
   liveEl.textContent = dateStr + ' ' + timeStr;
 }
 
-window.addEventListener('resize', function() { renderAllMiners(false); });
+// only the number of visible rows depends on width; CSS handles the rest
+let resizeTimer = null;
+let lastVisibleRows = getVisibleRows();
+window.addEventListener('resize', function() {
+  if (resizeTimer) clearTimeout(resizeTimer);
+  resizeTimer = setTimeout(function() {
+    resizeTimer = null;
+    const v = getVisibleRows();
+    if (v === lastVisibleRows) return;
+    lastVisibleRows = v;
+    pipe({ cmd: 'rows', n: v });
+  }, 150);
+}, { passive: true });
+
+// app shell + last snapshot for instant start (only where the browser allows service workers)
+if ('serviceWorker' in navigator) {
+  navigator.serviceWorker.register('/sw.js').catch(function() {});
+}
 
-tick();
-setInterval(tick, REFRESH_MS);
-setInterval(rotatePage, MINER_PAGE_SECONDS * 1000);
+startPipeline();
+setInterval(function() { pipe({ cmd: 'tick' }); }, REFRESH_MS);
+setInterval(function() { pipe({ cmd: 'rotate' }); }, MINER_PAGE_SECONDS * 1000);
 
 updateLiveClock();
 setInterval(updateLiveClock, 1000);
@@ -2603,18 +5208,6 @@ setInterval(updateLiveClock, 1000);
 </body>
 </html>"""
 
-    fallback_logo = {
-        "BTC": ["https://assets.coingecko.com/coins/images/1/large/bitcoin.png"],
-        "BCH": ["https://assets.coingecko.com/coins/images/780/large/bitcoin-cash-circle.png"],
-        "FB":  ["https://assets.coingecko.com/coins/images/37001/large/fractal-bitcoin.png"],
-        "DGB": ["https://assets.coingecko.com/coins/images/63/large/digibyte.png"],
-        "CAS": ["https://cascoin.net/assets/logo.CIwpWNZk_Z1m8T3m.webp"],
-        "QUAI": [
-            "https://s2.coinmarketcap.com/static/img/coins/64x64/22354.png",
-            "https://assets.coingecko.com/coins/images/27928/standard/QuaiLogoFinal.png?1696526947"
-        ],
-        "XEC": ["https://assets.coingecko.com/coins/images/16646/large/Logo_Final-21.png"],
-    }
 
     html = (
         html_template
@@ -2624,9 +5217,705 @@ setInterval(updateLiveClock, 1000);
         .replace("__STALE_YELLOW__", str(int(STALE_YELLOW_SECONDS)))
         .replace("__STALE_RED__", str(int(STALE_RED_SECONDS)))
         .replace("__COIN_ORDER__", json.dumps(COIN_ORDER))
-        .replace("__FALLBACK_LOGO__", json.dumps(fallback_logo))
+        .replace("__FALLBACK_LOGO__", json.dumps({sym: fallback_logo_urls(sym) for sym in FALLBACK_LOGOS}))
         .replace("__MINER_PAGE_SECONDS__", str(int(MINER_PAGE_SECONDS)))
         .replace("__MINERS_PER_PAGE__", str(int(MINERS_PER_PAGE)))
+        .replace("__SPARK_POINTS__", str(int(SPARK_POINTS)))
+        .replace("__TEMP_UNIT__", TEMP_UNIT.upper())
+    )
+    return Response(html, mimetype="text/html; charset=utf-8")
+
+@app.get("/dash_worker.js")
+def dash_worker():
+    js_template = """// Dashboard data pipeline. Runs as a Web Worker (or on the page when Workers
+// aren't available): fetches /data?v=2 and the sparkline feed, decodes them,
+// works out which miners are on screen and posts only those, already formatted.
+// Messages in : {cmd:'tick'} | {cmd:'rotate'} | {cmd:'rows', n}
+// Messages out: {t:'frame', ...header, coins?, notifs, rows...} | {t:'rows', rows...}
+(function(scope) {
+'use strict';
+
+const SPARK_STEP_MS = __SPARK_STEP_SECONDS__ * 1000;
+const SPARK_POINTS = __SPARK_POINTS__;
+
+let post = null;              // (msg, transfer) => void
+let MINERS = [];              // v2 miner objects, in rank order from the server
+let KEYS = new Set();
+let LEADERS = { topWeekly: null, topBest: null, blockLeader: null };
+let rankFingerprint = null;
+let visibleRows = 3;
+let rotateOffset = 0;
+let tickerSig = null;
+let logosSig = null;
+let ticking = false;
+let haveLive = false;
+let triedCache = false;
+const NOTIF_IDS = new Set();
+
+const SPARKS = new Map();     // ip -> { hr: Float32Array, temp: Float32Array, ver }
+const SPARK_SENT = new Map(); // name|ip -> spark ver last posted
+let SPARK_SINCE = 0;
+let sparkLastFetch = 0;
+let sparkInFlight = false;
+
+// ---- /data?v=2: raw values under short keys, formatted here (see _build_data_v2)
+function fmtHashrate(ths) {
+  const v = Number(ths);
+  return Number.isFinite(v) ? v.toFixed(2) + ' TH/s' : '-';
+}
+
+function fmtDiffAdaptive(n) {
+  const v = Number(n);
+  if (n == null || !Number.isFinite(v)) return '-';
+  const sign = v < 0 ? '-' : '';
+  const a = Math.abs(v);
+  const units = [[1e15, 'P'], [1e12, 'T'], [1e9, 'G'], [1e6, 'M'], [1e3, 'K']];
+  for (const u of units) {
+    if (a >= u[0]) {
+      const val = a / u[0];
+      return sign + val.toFixed(val < 10 ? 2 : (val < 100 ? 1 : 0)) + u[1];
+    }
+  }
+  return sign + Math.round(a);
+}
+
+function fmtDiffSI(n) {
+  const v = Number(n);
+  if (n == null || !Number.isFinite(v)) return '-';
+  const units = [[1e15, 'P'], [1e12, 'T'], [1e9, 'G'], [1e6, 'M'], [1e3, 'K']];
+  for (const u of units) if (v >= u[0]) return (v / u[0]).toFixed(2) + u[1];
+  return v.toFixed(2);
+}
+
+function fmtFiat(x, sym) {
+  const v = Number(x);
+  if (x == null || !Number.isFinite(v)) return '-';
+  if (v >= 1) return sym + v.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+  if (v >= 0.01) return sym + v.toLocaleString('en-US', { minimumFractionDigits: 4, maximumFractionDigits: 4 });
+  return sym + v.toFixed(6);
+}
+
+function fmtPct(v) {
+  const n = Number(v);
+  return (v == null || !Number.isFinite(n)) ? '-' : n.toFixed(2) + '%';
+}
+
+function minerKey(x) { return (x.n || '') + '|' + (x.ip || ''); }
+
+// only miners that end up on screen are formatted
+function minerFromV2(x) {
+  return {
+    name: x.n, ip: x.ip, model: x.md, online: !!x.on, uptime_seconds: x.up,
+    hashrate: fmtHashrate(x.h), hashrate_ths_raw: x.h,
+    asic_temp_raw: x.ta, vr_temp_raw: x.tv, fan_speed: x.f,
+    shares_rejected_pct: fmtPct(x.rp), shares_rejected_pct_raw: x.rp,
+    shares_rejected_pct_1h_raw: x.rp1, shares_per_min_raw: x.spm,
+    session_best: fmtDiffAdaptive(x.wb), session_best_raw: x.wb,
+    best_overall: fmtDiffAdaptive(x.bo), best_overall_raw: x.bo,
+    blocks: x.b || 0, last_seen_unix: x.ls,
+    power_watts: x.pw, efficiency_jth: x.ef,
+    mining_display: x.mt, mining_symbol: x.ms, rank: x.rk,
+  };
+}
+
+function coinsFromV2(d) {
+  const fiat = d.fiat || '';
+  const coins = {};
+  for (const sym of Object.keys(d.c || {})) {
+    const c = d.c[sym];
+    coins[sym] = {
+      price_gbp: fmtFiat(c.p, fiat), price_gbp_raw: c.p,
+      diff: fmtDiffSI(c.d), diff_raw: c.d,
+      price_trend: c.pt, diff_trend: c.dt,
+    };
+  }
+  return coins;
+}
+
+// ---- sparklines: binary feed from /history/spark.bin, decoded straight into typed
+// arrays; after the first load only points newer than SPARK_SINCE are fetched.
+function decodeSparkFeed(buf) {
+  const dv = new DataView(buf);
+  if (buf.byteLength < 16 || String.fromCharCode(dv.getUint8(0), dv.getUint8(1), dv.getUint8(2), dv.getUint8(3)) !== 'MSDS') return null;
+  const count = dv.getUint16(6, true);
+  const out = { latest: dv.getUint32(8, true), miners: [] };
+  const td = new TextDecoder();
+  let off = 16;
+  for (let i = 0; i < count; i++) {
+    const kl = dv.getUint16(off, true);
+    off += 2;
+    const key = td.decode(new Uint8Array(buf, off, kl));
+    off = (off + kl + 3) & ~3;
+    const n = dv.getUint32(off, true);
+    off += 4 + 4 * n;   // timestamps are not needed for drawing
+    const hr = new Float32Array(buf, off, n);
+    off += 4 * n;
+    const temp = new Float32Array(buf, off, n);
+    off += 4 * n;
+    out.miners.push({ key: key, hr: hr, temp: temp });
+  }
+  return out;
+}
+
+function appendSpark(old, add) {
+  const keep = Math.min(SPARK_POINTS, (old ? old.length : 0) + add.length);
+  const out = new Float32Array(keep);
+  const fromAdd = Math.min(add.length, keep);
+  const fromOld = keep - fromAdd;
+  if (fromOld > 0) out.set(old.subarray(old.length - fromOld), 0);
+  out.set(add.subarray(add.length - fromAdd), fromOld);
+  return out;
+}
+
+async function fetchSparks() {
+  const now = Date.now();
+  if (sparkInFlight || (SPARK_SINCE && now - sparkLastFetch < SPARK_STEP_MS)) return;
+  sparkLastFetch = now;
+  sparkInFlight = true;
+  try {
+    const r = await fetch('/history/spark.bin?since=' + SPARK_SINCE, { cache: 'no-store' });
+    const feed = decodeSparkFeed(await r.arrayBuffer());
+    if (!feed) return;
+    for (const m of feed.miners) {
+      const cur = SPARKS.get(m.key);
+      SPARKS.set(m.key, {
+        hr: appendSpark(cur && cur.hr, m.hr),
+        temp: appendSpark(cur && cur.temp, m.temp),
+        ver: (cur ? cur.ver : 0) + 1,
+      });
+    }
+    if (feed.latest) SPARK_SINCE = feed.latest;
+  } catch (e) {
+  } finally {
+    sparkInFlight = false;
+  }
+}
+
+// ---- paging: the top rows stay put, the last one rotates through the rest
+function layout() {
+  const total = MINERS.length;
+  const visibleCount = Math.max(1, visibleRows);
+  const idxs = [];
+  let rotIdx = null;
+  if (total <= visibleCount) {
+    for (let i = 0; i < total; i++) idxs.push(i);
+  } else {
+    const fixedToShow = Math.min(Math.max(1, visibleCount - 1), total);
+    for (let i = 0; i < fixedToShow; i++) idxs.push(i);
+    const len = total - fixedToShow;
+    if (len >= 1) {
+      idxs.push(fixedToShow + (((rotateOffset % len) + len) % len));
+      rotIdx = idxs.length - 1;
+    }
+  }
+  return { idxs: idxs, rotIdx: rotIdx };
+}
+
+function rowsMessage(msg, slide) {
+  const lay = layout();
+  const transfer = [];
+  msg.rows = lay.idxs.map(function(i) {
+    const x = MINERS[i];
+    const key = minerKey(x);
+    const row = { key: key, m: minerFromV2(x), rank: i };
+    const sp = SPARKS.get(x.ip);
+    if (sp && SPARK_SENT.get(key) !== sp.ver) {
+      SPARK_SENT.set(key, sp.ver);
+      row.spark = { hr: sp.hr.slice(), temp: sp.temp.slice() };
+      transfer.push(row.spark.hr.buffer, row.spark.temp.buffer);
+    }
+    return row;
+  });
+  msg.rotIdx = lay.rotIdx;
+  msg.total = MINERS.length;
+  msg.slide = !!slide;
+  msg.leaders = LEADERS;
+  post(msg, transfer);
+}
+
+// Last /data?v=2 the service worker kept (see /sw.js), or null. Only used before
+// the first live answer, so a restarted screen has something to show at once.
+async function cachedData() {
+  try {
+    if (!scope.caches) return null;
+    const r = await scope.caches.match('/data?v=2');
+    return r ? await r.json() : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+async function tick() {
+  if (ticking) return;
+  ticking = true;
+  try {
+    if (!haveLive && !triedCache) {
+      triedCache = true;
+      const cached = await cachedData();
+      if (cached) applyData(cached, true);
+    }
+    const r = await fetch('/data?v=2', { cache: 'no-store' });
+    if (!r.ok) return;   // 503 until the server has built its first snapshot
+    const d = await r.json();
+    const stale = r.headers && r.headers.get('X-MSD-Stale') === '1';   // server unreachable, SW answered
+    if (!stale) haveLive = true;
+    await fetchSparks();
+    applyData(d, stale);
+  } catch (e) {
+  } finally {
+    ticking = false;
+  }
+}
+
+function applyData(d, stale) {
+  const msg = {
+    t: 'frame',
+    stale: stale,
+    builtAt: d.ts,
+    coinOk: d.cok,
+    lastBlock: d.lb,
+    motwName: d.motw,
+    motwStr: d.motws,
+    maint: d.maint,
+    notifs: [],
+  };
+
+  const logos = {};
+  for (const sym of (d.lg || [])) logos[sym] = true;
+  const lsig = (d.lg || []).join(',');
+  if (lsig !== logosSig) {
+    logosSig = lsig;
+    msg.logos = logos;
+  }
+
+  // the ticker is only re-rendered when something on it changed
+  const tsig = JSON.stringify([d.c, d.farm, d.motws, d.maint, d.fiat]);
+  if (tsig !== tickerSig) {
+    tickerSig = tsig;
+    msg.coins = coinsFromV2(d);
+    msg.farm = d.farm || null;
+  }
+
+  for (const n of (stale ? [] : (d.nt || []))) {   // cached ones may be acked already
+    if (!n || !n.id) continue;
+    const id = String(n.id);
+    if (NOTIF_IDS.has(id)) continue;
+    NOTIF_IDS.add(id);
+    msg.notifs.push({ id: id, type: n.type, ts_unix: Number(n.ts_unix || 0), payload: n.payload || {} });
+  }
+
+  MINERS = d.m || [];
+  const ld = d.ld || {};
+  LEADERS = { topWeekly: ld.w || null, topBest: ld.b || null, blockLeader: ld.bl || null };
+
+  // order changed (server rank version): restart the rotation, drop rows that left
+  const fp = d.rv + ':' + MINERS.length;
+  if (fp !== rankFingerprint) {
+    rankFingerprint = fp;
+    rotateOffset = 0;
+    const keys = new Set(MINERS.map(minerKey));
+    msg.gone = [];
+    for (const k of KEYS) {
+      if (keys.has(k)) continue;
+      msg.gone.push(k);
+      SPARK_SENT.delete(k);
+    }
+    KEYS = keys;
+  }
+
+  rowsMessage(msg, false);
+}
+
+function rotate() {
+  const visibleCount = Math.max(1, visibleRows);
+  if (MINERS.length <= visibleCount) return;
+  const rotLen = Math.max(1, MINERS.length - Math.max(1, visibleCount - 1));
+  rotateOffset = (rotateOffset + 1) % rotLen;
+  rowsMessage({ t: 'rows' }, true);
+}
+
+function handle(msg) {
+  if (!msg) return;
+  if (msg.cmd === 'tick') tick();
+  else if (msg.cmd === 'rotate') rotate();
+  else if (msg.cmd === 'rows') {
+    visibleRows = Number(msg.n) || visibleRows;
+    if (MINERS.length) rowsMessage({ t: 'rows' }, false);
+  }
+}
+
+scope.MSDPipeline = {
+  handle: handle,
+  connect: function(fn) { post = function(msg) { fn(msg); }; },
+};
+if (typeof importScripts === 'function') {
+  post = function(msg, transfer) { scope.postMessage(msg, transfer || []); };
+  scope.onmessage = function(e) { handle(e.data); };
+}
+})(self);
+"""
+    js = (
+        js_template
+        .replace("__SPARK_STEP_SECONDS__", str(int(SPARK_STEP_SECONDS)))
+        .replace("__SPARK_POINTS__", str(int(SPARK_POINTS)))
+    )
+    resp = Response(js, mimetype="application/javascript; charset=utf-8")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.get("/sw.js")
+def service_worker():
+    # Browsers only run service workers on https:// or localhost. On a plain-http LAN
+    # address (the usual Pi setup) none of this runs at all: the page loads normally
+    # and there is no instant start, unless the kiosk browser has the flag from the README.
+    js = """// App shell + last /data for instant start. Pages and the pipeline script are
+// answered from cache straight away and refreshed in the background; /data always
+// goes to the network, and a recent good answer is kept for the next cold start.
+const SHELL_CACHE = 'msd-shell-v1';
+const DATA_CACHE = 'msd-data-v1';
+const SHELL = ['/', '/kiosk', '/dash_worker.js'];
+// /data is polled every few seconds; storing every answer would wear the Pi's SD card.
+// Save the first answer after the worker starts and then at most once a minute.
+const DATA_SAVE_MS = 60000;
+const dataSavedAt = {};   // url -> ms; in memory, so a restarted worker saves straight away
+
+self.addEventListener('install', function(e) {
+  e.waitUntil(caches.open(SHELL_CACHE)
+    .then(function(c) { return c.addAll(SHELL); })
+    .then(function() { return self.skipWaiting(); }));
+});
+
+self.addEventListener('activate', function(e) {
+  e.waitUntil(caches.keys()
+    .then(function(keys) {
+      return Promise.all(keys.filter(function(k) { return k !== SHELL_CACHE && k !== DATA_CACHE; })
+        .map(function(k) { return caches.delete(k); }));
+    })
+    .then(function() { return self.clients.claim(); }));
+});
+
+self.addEventListener('fetch', function(e) {
+  const req = e.request;
+  if (req.method !== 'GET') return;
+  const url = new URL(req.url);
+  if (url.origin !== self.location.origin) return;
+  if (SHELL.indexOf(url.pathname) >= 0 && !url.search) e.respondWith(shell(e, req));
+  else if (url.pathname === '/data') e.respondWith(data(req));
+});
+
+async function shell(e, req) {
+  const cache = await caches.open(SHELL_CACHE);
+  const hit = await cache.match(req, { ignoreVary: true });
+  const refresh = fetch(req).then(function(r) {
+    if (r.ok) cache.put(req, r.clone());
+    return r;
+  });
+  if (!hit) return refresh;
+  e.waitUntil(refresh.catch(function() {}));
+  return hit;
+}
+
+async function data(req) {
+  const cache = await caches.open(DATA_CACHE);
+  try {
+    const r = await fetch(req);
+    const now = Date.now();
+    if (r.ok && !(now - (dataSavedAt[req.url] || 0) < DATA_SAVE_MS)) {
+      dataSavedAt[req.url] = now;
+      await cache.put(req.url, r.clone());
+    }
+    return r;
+  } catch (err) {
+    // server unreachable: hand back the last answer, flagged so the page shows it as stale
+    const hit = await cache.match(req.url);
+    if (!hit) throw err;
+    const headers = new Headers(hit.headers);
+    headers.set('X-MSD-Stale', '1');
+    return new Response(await hit.blob(), { status: 200, headers: headers });
+  }
+}
+"""
+    resp = Response(js, mimetype="application/javascript; charset=utf-8")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+# =========================
+# KIOSK UI
+# =========================
+
+@app.get("/kiosk")
+def kiosk():
+    html_template = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1" />
+<title>Mining Stats Dashboard — Kiosk</title>
+<style>
+html, body { margin: 0; background: #0b1020; color: rgba(255,255,255,0.9);
+  font-family: system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif;
+  font-variant-numeric: tabular-nums; }
+.wrap { padding: 8px 10px; }
+.top { display: flex; justify-content: space-between; align-items: baseline; }
+.title { font-size: 22px; font-weight: 900; }
+.meta { font-size: 12px; color: rgba(255,255,255,0.55); }
+.banner { font-weight: 900; color: #ffcf33; min-height: 1.2em; margin: 2px 0; }
+#ticker { display: block; width: 100%; height: 26px; margin: 6px 0; background: rgba(255,255,255,0.04); }
+table { width: 100%; border-collapse: collapse; font-size: 14px; }
+th { text-align: left; font-size: 11px; color: rgba(255,255,255,0.55); font-weight: 800; padding: 3px 6px; }
+td { padding: 4px 6px; border-top: 1px solid rgba(255,255,255,0.06); white-space: nowrap; }
+td.name { font-weight: 800; }
+.online { color: #27f5a7; } .staleYellow { color: #ffd84a; } .staleRed, .offline, .red { color: #ff3b3b; }
+.orange { color: #ff9f2a; } .green { color: #27f5a7; } .motw { color: #ffcf33; }
+</style>
+</head>
+<body>
+<div class="wrap">
+  <div class="top">
+    <div class="title">Mining Stats</div>
+    <div class="meta" id="meta">-</div>
+  </div>
+  <div class="banner" id="banner"></div>
+  <canvas id="ticker"></canvas>
+  <table>
+    <thead><tr><th>#</th><th>MINER</th><th>STATUS</th><th>HASHRATE</th><th>ASIC / VR</th><th>REJECT %</th><th>WEEKLY / BEST</th><th>BLOCKS</th></tr></thead>
+    <tbody id="rows"></tbody>
+  </table>
+</div>
+
+<script>
+const REFRESH_MS = __KIOSK_REFRESH_SECONDS__ * 1000;
+// only what this page shows
+const DATA_URL = '/data?fields=coins,farm,motw_name,motw_str,coin_last_ok_unix,last_any_block_ts,notifications,' +
+  'name,ip,online,hashrate,asic_temp_raw,vr_temp_raw,shares_rejected_pct,session_best,best_overall,blocks,last_seen_unix';
+const TICKER_FPS = __KIOSK_TICKER_FPS__;
+const TICKER_PX_PER_SECOND = 50;
+const TEMP_ORANGE_AT = __TEMP_ORANGE_AT__;
+const TEMP_RED_AT = __TEMP_RED_AT__;
+const STALE_YELLOW_SECONDS = __STALE_YELLOW__;
+const STALE_RED_SECONDS = __STALE_RED__;
+const TEMP_UNIT = "__TEMP_UNIT__";
+const COIN_ORDER = __COIN_ORDER__;
+
+// ---- canvas ticker: text is rendered once into an offscreen strip, frames only blit it
+const canvas = document.getElementById('ticker');
+const ctx = canvas.getContext('2d');
+const dpr = window.devicePixelRatio || 1;
+let strip = null;
+let stripKey = '';
+let offset = 0;
+let lastFrame = 0;
+let rafId = null;
+
+function sizeCanvas() {
+  const w = Math.max(1, Math.round(canvas.getBoundingClientRect().width * dpr));
+  const h = Math.round(26 * dpr);
+  if (canvas.width !== w || canvas.height !== h) {
+    canvas.width = w;
+    canvas.height = h;
+    stripKey = '';
+  }
+}
+
+function buildStrip(segs) {
+  const key = segs.map(s => s.t + '|' + s.c).join('~');
+  if (key === stripKey) return;
+  stripKey = key;
+  const font = '800 ' + Math.round(13 * dpr) + 'px system-ui, sans-serif';
+  ctx.font = font;
+  const gap = 28 * dpr;
+  let w = 0;
+  for (const s of segs) w += ctx.measureText(s.t).width + gap;
+  const off = document.createElement('canvas');
+  off.width = Math.max(1, Math.ceil(w));
+  off.height = canvas.height;
+  const o = off.getContext('2d');
+  o.font = font;
+  o.textBaseline = 'middle';
+  let x = 0;
+  for (const s of segs) {
+    o.fillStyle = s.c;
+    o.fillText(s.t, x, off.height / 2);
+    x += o.measureText(s.t).width + gap;
+  }
+  strip = off;
+}
+
+function frame(ts) {
+  rafId = requestAnimationFrame(frame);
+  if (lastFrame && ts - lastFrame < 1000 / TICKER_FPS) return;
+  const dt = lastFrame ? (ts - lastFrame) / 1000 : 0;
+  lastFrame = ts;
+  if (!strip) return;
+  offset = (offset + dt * TICKER_PX_PER_SECOND * dpr) % strip.width;
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  for (let x = -offset; x < canvas.width; x += strip.width) ctx.drawImage(strip, Math.round(x), 0);
+}
+
+function tempText(c) {
+  const v = Number(c);
+  if (c == null || !Number.isFinite(v)) return '-';
+  return Math.round(TEMP_UNIT === 'F' ? v * 9 / 5 + 32 : v) + '°';
+}
+
+function tickerSegments(d) {
+  const W = 'rgba(255,255,255,0.86)', G = '#27f5a7', R = '#ff3b3b', Y = '#ffcf33';
+  const segs = [];
+  const coins = d.coins || {};
+  for (const sym of COIN_ORDER) {
+    const c = coins[sym] || {};
+    const arrow = c.price_trend === 'up' ? '▲' : (c.price_trend === 'down' ? '▼' : '');
+    segs.push({ t: sym + '  ' + (c.price_gbp || '-') + (arrow ? ' ' + arrow : '') + '  Diff ' + (c.diff || '-'),
+                c: c.price_trend === 'up' ? G : (c.price_trend === 'down' ? R : W) });
+  }
+  if (d.motw_str) segs.push({ t: String(d.motw_str).replace(/<[^>]*>/g, ''), c: Y });
+  const f = d.farm || {};
+  if (f.total_miners > 0) segs.push({ t: '👷 ' + f.active_miners + ' / ' + f.total_miners + ' online', c: W });
+  if (f.total_hashrate_ths != null) segs.push({ t: '⚡ ' + Number(f.total_hashrate_ths).toFixed(2) + ' TH/s', c: W });
+  if (f.total_power_w != null) segs.push({ t: '🔌 ' + Math.round(f.total_power_w) + ' W', c: W });
+  if (f.max_temp_c != null) segs.push({ t: '🌡 max ' + tempText(f.max_temp_c), c: W });
+  if (f.total_blocks != null) segs.push({ t: '🧱 ' + f.total_blocks + ' blocks', c: W });
+  return segs;
+}
+
+// ---- miner table: one <tr> per miner, cells written only when they change
+const ROWS = new Map();
+const tbody = document.getElementById('rows');
+
+function rowFor(key) {
+  let r = ROWS.get(key);
+  if (r) return r;
+  const tr = document.createElement('tr');
+  tr.innerHTML = '<td></td><td class="name"></td><td></td><td></td><td></td><td></td><td></td><td></td>';
+  r = { tr: tr, tds: tr.querySelectorAll('td'), last: [] };
+  ROWS.set(key, r);
+  return r;
+}
+
+function setCell(r, i, text, cls) {
+  const v = text + '#' + (cls || '');
+  if (r.last[i] === v) return;
+  r.last[i] = v;
+  r.tds[i].textContent = text;
+  r.tds[i].className = cls || (i === 1 ? 'name' : '');
+}
+
+function statusOf(m, now) {
+  if (!m.online) return ['offline', 'offline'];
+  const age = now - Number(m.last_seen_unix || 0);
+  if (age >= STALE_RED_SECONDS) return ['stale ' + age + 's', 'staleRed'];
+  if (age >= STALE_YELLOW_SECONDS) return ['stale ' + age + 's', 'staleYellow'];
+  return ['online', 'online'];
+}
+
+function tempClass(m) {
+  const t = Math.max(Number(m.asic_temp_raw) || -Infinity, Number(m.vr_temp_raw) || -Infinity);
+  if (t >= TEMP_RED_AT) return 'red';
+  if (t >= TEMP_ORANGE_AT) return 'orange';
+  return 'green';
+}
+
+function renderRows(d) {
+  const now = Math.floor(Date.now() / 1000);
+  const miners = d.miners || [];   // server sends them in rank order
+  const seen = new Set();
+  for (let i = 0; i < miners.length; i++) {
+    const m = miners[i];
+    const key = m.name + '|' + m.ip;
+    seen.add(key);
+    const r = rowFor(key);
+    if (tbody.children[i] !== r.tr) tbody.insertBefore(r.tr, tbody.children[i] || null);
+    const st = statusOf(m, now);
+    setCell(r, 0, String(i + 1));
+    setCell(r, 1, m.name, m.name === d.motw_name ? 'name motw' : 'name');
+    setCell(r, 2, st[0], st[1]);
+    setCell(r, 3, m.hashrate || '-');
+    setCell(r, 4, tempText(m.asic_temp_raw) + ' / ' + tempText(m.vr_temp_raw), tempClass(m));
+    setCell(r, 5, m.shares_rejected_pct || '-');
+    setCell(r, 6, (m.session_best || '-') + ' / ' + (m.best_overall || '-'));
+    setCell(r, 7, String(m.blocks || 0));
+  }
+  for (const [key, r] of ROWS) {
+    if (seen.has(key)) continue;
+    r.tr.remove();
+    ROWS.delete(key);
+  }
+}
+
+function ago(ts) {
+  const t = Number(ts);
+  if (!Number.isFinite(t) || t <= 0) return 'never';
+  const s = Math.max(0, Math.floor(Date.now() / 1000) - t);
+  if (s < 120) return s + 's ago';
+  if (s < 7200) return Math.floor(s / 60) + 'm ago';
+  return Math.floor(s / 3600) + 'h ago';
+}
+
+function setText(id, text) {
+  const el = document.getElementById(id);
+  if (el && el.textContent !== text) el.textContent = text;
+}
+
+async function tick() {
+  try {
+    const r = await fetch(DATA_URL, { cache: 'no-store' });
+    if (!r.ok) return;
+    const d = await r.json();
+    const now = new Date();
+    const hhmm = String(now.getHours()).padStart(2, '0') + ':' + String(now.getMinutes()).padStart(2, '0');
+    setText('meta', hhmm + ' • coins ' + ago(d.coin_last_ok_unix) + ' • last block ' + ago(d.last_any_block_ts));
+    const blocks = (d.notifications || []).filter(n => n.type === 'block');
+    const latest = blocks.length ? blocks[blocks.length - 1] : null;
+    setText('banner', latest ? '🧱 BLOCK FOUND — ' + ((latest.payload || {}).miner || '') : '');
+    buildStrip(tickerSegments(d));
+    renderRows(d);
+  } catch (e) {}
+}
+
+// ---- pause everything while the screen is hidden (screen off, other tab)
+let pollTimer = null;
+function start() {
+  if (pollTimer) return;
+  tick();
+  pollTimer = setInterval(tick, REFRESH_MS);
+  lastFrame = 0;
+  if (!rafId) rafId = requestAnimationFrame(frame);
+}
+function stop() {
+  if (pollTimer) clearInterval(pollTimer);
+  pollTimer = null;
+  if (rafId) cancelAnimationFrame(rafId);
+  rafId = null;
+}
+document.addEventListener('visibilitychange', function() {
+  if (document.hidden) stop(); else start();
+});
+
+let resizeTimer = null;
+window.addEventListener('resize', function() {
+  if (resizeTimer) clearTimeout(resizeTimer);
+  resizeTimer = setTimeout(function() { sizeCanvas(); stripKey = ''; tick(); }, 250);
+}, { passive: true });
+
+if ('serviceWorker' in navigator) {
+  navigator.serviceWorker.register('/sw.js').catch(function() {});
+}
+
+sizeCanvas();
+if (!document.hidden) start();
+</script>
+</body>
+</html>"""
+    html = (
+        html_template
+        .replace("__KIOSK_REFRESH_SECONDS__", str(max(1, int(KIOSK_REFRESH_SECONDS))))
+        .replace("__KIOSK_TICKER_FPS__", str(max(1, int(KIOSK_TICKER_FPS))))
+        .replace("__TEMP_ORANGE_AT__", str(int(TEMP_ORANGE_AT)))
+        .replace("__TEMP_RED_AT__", str(int(TEMP_RED_AT)))
+        .replace("__STALE_YELLOW__", str(int(STALE_YELLOW_SECONDS)))
+        .replace("__STALE_RED__", str(int(STALE_RED_SECONDS)))
+        .replace("__COIN_ORDER__", json.dumps(COIN_ORDER))
         .replace("__TEMP_UNIT__", TEMP_UNIT.upper())
     )
     return Response(html, mimetype="text/html; charset=utf-8")
@@ -2643,6 +5932,10 @@ if __name__ == "__main__":
     _load_maintenance()
     _load_weekly_current()
     _load_notifications()
+    _load_logo_index()
+    _load_coin_history()
+    _load_week_archive()
+    _load_discord_outbox()
 
     with _blocks_lock:
         if week_start_unix is None:
@@ -2651,8 +5944,6 @@ if __name__ == "__main__":
             week_start_counts = dict(block_counts)
         _save_blocks()
 
-    threading.Thread(target=miner_loop, daemon=True).start()
-    threading.Thread(target=coin_loop, daemon=True).start()
-    threading.Thread(target=weekly_rollover_loop, daemon=True).start()
+    start_background_jobs()
 
     app.run(host=HOST, port=PORT)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# ============================================================
+# Mining Stats Dashboard — offline upstream stand-ins
+# Author: kurbzi
+# License: MIT
+#
+# Local mock of the public APIs used by the coin ticker, one port per
+# service (like the real, separate hosts) starting at --port:
+#   port + 0   CoinGecko   (/api/v3/simple/price, /api/v3/coins/markets) and
+#              every logo image path (.png/.webp/...) for the logo hosts
+#   port + 1   WhatToMine  (/asic.json, /coins/<id>.json)
+#   port + 2   Kryptex     (/<pool>/about-coin HTML page)
+#   port + 3   CAS explorer (/api/getdifficulty)
+#
+# Standard library only, so it runs on an air-gapped box.
+#
+# Run the mock:
+#   python3 mock_upstreams.py --port 8799 --latency-ms 300 --p429 0.1
+#
+# Then point MSD.py at it (CONFIG SECTION):
+#   COINGECKO_BASE_URL  = "http://127.0.0.1:8799/api/v3"
+#   WHATTOMINE_BASE_URL = "http://127.0.0.1:8800"
+#   KRYPTEX_BASE_URL    = "http://127.0.0.1:8801"
+#   CASPLORER_BASE_URL  = "http://127.0.0.1:8802/api"
+#   COINGECKO_ASSETS_BASE_URL = COINMARKETCAP_STATIC_BASE_URL = CASCOIN_BASE_URL = "http://127.0.0.1:8799"
+#
+# Or time the whole coin pipeline against it in one go:
+#   python3 mock_upstreams.py --bench 20 --latency-ms 500 --jitter-ms 300
+#
+# Faults can be changed while running (on any of the ports):
+#   curl -X POST localhost:8799/_mock/config -d '{"coingecko": {"p429": 1.0}}'
+#   curl localhost:8799/_mock/stats
+# ============================================================
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SERVICES = ("coingecko", "whattomine", "kryptex", "casplorer")
+
+# Fault knobs per service:
+# - latency_ms / jitter_ms: delay before answering (jitter is uniform 0..jitter_ms)
+# - p429: probability of "429 Too Many Requests" (with Retry-After: retry_after)
+# - p500: probability of "503 Service Unavailable"
+# - p_hang: probability of sleeping hang_seconds (longer than the client timeout)
+# - malformed: probability of a truncated / non-JSON body
+# - html_change: Kryptex page wording changes so the difficulty regex no longer matches
+DEFAULT_FAULTS = {
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "p429": 0.0,
+    "retry_after": 30,
+    "p500": 0.0,
+    "p_hang": 0.0,
+    "hang_seconds": 30,
+    "malformed": 0.0,
+    "html_change": False,
+}
+
+# same ids/numbers as COIN_REGISTRY in MSD.py
+COINS = {
+    "bitcoin":         {"tag": "BTC",  "wtm_id": 1,   "price": 52000.0,  "diff": 1.1e14},
+    "bitcoin-cash":    {"tag": "BCH",  "wtm_id": 193, "price": 280.0,    "diff": 5.2e11},
+    "fractal-bitcoin": {"tag": "FB",   "wtm_id": 431, "price": 0.45,     "diff": 3.4e12},
+    "digibyte":        {"tag": "DGB",  "wtm_id": 113, "price": 0.0085,   "diff": 4.1e9},
+    "ecash":           {"tag": "XEC",  "wtm_id": 370, "price": 0.000022, "diff": 2.3e11},
+    "monero":          {"tag": "XMR",  "wtm_id": None, "price": 120.0,   "diff": None},
+    "quai-network":    {"tag": "QUAI", "wtm_id": None, "price": 0.05,    "diff": None},
+    "cashaa":          {"tag": "CAS",  "wtm_id": None, "price": 0.002,   "diff": None},
+}
+QUAI_DIFF_MH = 1234.56
+CAS_DIFF = 98765.4321
+
+# 1x1 transparent PNG served for every logo
+LOGO_EXTENSIONS = (".png", ".webp", ".jpg", ".jpeg", ".gif", ".svg")
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+_lock = threading.Lock()
+faults = {svc: dict(DEFAULT_FAULTS) for svc in SERVICES}
+stats = {svc: {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "hang": 0, "malformed": 0} for svc in SERVICES}
+
+
+# =========================
+# HELPERS
+# =========================
+
+def _walk(val, pct=0.01):
+    """Small random walk so prices/difficulty move between refreshes."""
+    if val is None:
+        return None
+    return val * (1.0 + random.uniform(-pct, pct))
+
+def _count(svc: str, key: str):
+    with _lock:
+        stats[svc][key] += 1
+
+def _update_faults(obj: dict):
+    with _lock:
+        for svc, cfg in obj.items():
+            targets = SERVICES if svc in ("*", "all") else ([svc] if svc in faults else [])
+            if not isinstance(cfg, dict):
+                continue
+            for t in targets:
+                for k, v in cfg.items():
+                    if k in DEFAULT_FAULTS:
+                        faults[t][k] = v
+
+
+# =========================
+# UPSTREAM PAYLOADS
+# =========================
+
+def coingecko(path: str, qs: dict, base: str):
+    ids = [x for x in (qs.get("ids", [""])[0]).split(",") if x]
+    if path == "simple/price":
+        vs = (qs.get("vs_currencies", ["gbp"])[0] or "gbp").lower()
+        return 200, "application/json", {cid: {vs: round(_walk(COINS[cid]["price"]), 8)} for cid in ids if cid in COINS}
+    if path == "coins/markets":
+        return 200, "application/json", [
+            {"id": cid, "symbol": COINS[cid]["tag"].lower(), "image": f"{base}/logos/{cid}.png"}
+            for cid in ids if cid in COINS
+        ]
+    if path.startswith("logos/") or path.lower().endswith(LOGO_EXTENSIONS):
+        return 200, "image/png", TINY_PNG
+    return 404, "application/json", {"error": "not found"}
+
+def whattomine(path: str, qs: dict, base: str):
+    if path == "asic.json":
+        coins = {}
+        for cid, c in COINS.items():
+            if c["wtm_id"] is None or c["tag"] == "FB":  # leave one out to exercise the per-coin fallback
+                continue
+            coins[cid] = {"id": c["wtm_id"], "tag": c["tag"], "algorithm": "SHA-256", "difficulty": _walk(c["diff"], 0.002)}
+        return 200, "application/json", {"coins": coins}
+    if path.startswith("coins/") and path.endswith(".json"):
+        try:
+            wid = int(path[len("coins/"):-len(".json")])
+        except Exception:
+            return 404, "application/json", {"error": "not found"}
+        for c in COINS.values():
+            if c["wtm_id"] == wid:
+                return 200, "application/json", {"id": wid, "tag": c["tag"], "difficulty": _walk(c["diff"], 0.002)}
+        return 404, "application/json", {"error": "not found"}
+    return 404, "application/json", {"error": "not found"}
+
+def kryptex(path: str, qs: dict, base: str, html_change=False):
+    if not path.endswith("/about-coin"):
+        return 404, "text/html", "<html><body>not found</body></html>"
+    mh = _walk(QUAI_DIFF_MH, 0.002)
+    if html_change:
+        body = f"<html><body><h1>About</h1><p>Network diff: <b>{mh:.2f}</b> MH</p></body></html>"
+    else:
+        body = f"<html><body><h1>About</h1><p>The coin has a mining difficulty of {mh:.2f} MH right now.</p></body></html>"
+    return 200, "text/html; charset=utf-8", body
+
+def casplorer(path: str, qs: dict, base: str):
+    if path == "getdifficulty":
+        return 200, "text/plain", f"{_walk(CAS_DIFF, 0.002):.4f}"
+    return 404, "text/plain", "not found"
+
+
+# =========================
+# HTTP SERVER
+# =========================
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MSDMock/1.0"
+
+    def log_message(self, fmt, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(fmt, *args)
+
+    def _send(self, status, ctype, body, headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except Exception:
+            pass
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/_mock/config":
+            return self._send(404, "text/plain", "not found")
+        try:
+            n = int(self.headers.get("Content-Length") or 0)
+            obj = json.loads(self.rfile.read(n) or b"{}")
+        except Exception:
+            return self._send(400, "text/plain", "bad json")
+        if isinstance(obj, dict):
+            _update_faults(obj)
+        with _lock:
+            return self._send(200, "application/json", faults)
+
+    def do_GET(self):
+        u = urlparse(self.path)
+        qs = parse_qs(u.query)
+        rest = u.path.strip("/")
+        svc = self.server.service
+
+        if rest.startswith("_mock/"):
+            with _lock:
+                if rest == "_mock/config":
+                    return self._send(200, "application/json", faults)
+                if rest == "_mock/stats":
+                    return self._send(200, "application/json", stats)
+            return self._send(404, "text/plain", "not found")
+
+        with _lock:
+            f = dict(faults[svc])
+            stats[svc]["requests"] += 1
+
+        delay = (float(f["latency_ms"]) + random.uniform(0, float(f["jitter_ms"]))) / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < f["p_hang"]:
+            _count(svc, "hang")
+            time.sleep(float(f["hang_seconds"]))
+        roll = random.random()
+        if roll < f["p429"]:
+            _count(svc, "429")
+            return self._send(429, "application/json", {"status": {"error_code": 429}},
+                              headers={"Retry-After": int(f["retry_after"])})
+        roll = random.random()
+        if roll < f["p500"]:
+            _count(svc, "5xx")
+            return self._send(503, "text/html", "<html><body>Service Unavailable</body></html>")
+
+        base = f"http://{self.headers.get('Host') or 'localhost'}"
+        if svc == "coingecko":
+            rest = rest[len("api/v3/"):] if rest.startswith("api/v3/") else rest
+            status, ctype, body = coingecko(rest, qs, base)
+        elif svc == "whattomine":
+            status, ctype, body = whattomine(rest, qs, base)
+        elif svc == "kryptex":
+            status, ctype, body = kryptex(rest, qs, base, html_change=bool(f["html_change"]))
+        else:
+            rest = rest[len("api/"):] if rest.startswith("api/") else rest
+            status, ctype, body = casplorer(rest, qs, base)
+
+        if status == 200 and random.random() < f["malformed"]:
+            _count(svc, "malformed")
+            raw = json.dumps(body) if isinstance(body, (dict, list)) else str(body)
+            return self._send(200, ctype, raw[: max(1, len(raw) // 2)] + "<!-- truncated")
+
+        if status == 200:
+            _count(svc, "ok")
+        return self._send(status, ctype, body)
+
+def start_servers(host: str, port: int, verbose=False):
+    """Starts one server per service on consecutive ports. Returns {service: (server, base_url)}."""
+    out = {}
+    for i, svc in enumerate(SERVICES):
+        srv = ThreadingHTTPServer((host, port + i), MockHandler)
+        srv.daemon_threads = True
+        srv.verbose = verbose
+        srv.service = svc
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        out[svc] = (srv, f"http://{host}:{port + i}")
+    return out
+
+
+# =========================
+# BENCH (times MSD's coin pipeline against the mock)
+# =========================
+
+def run_bench(bases: dict, rounds: int, keep_cache=False):
+    import MSD
+
+    MSD.COINGECKO_BASE_URL = f"{bases['coingecko']}/api/v3"
+    MSD.WHATTOMINE_BASE_URL = bases["whattomine"]
+    MSD.KRYPTEX_BASE_URL = bases["kryptex"]
+    MSD.CASPLORER_BASE_URL = f"{bases['casplorer']}/api"
+    MSD.COINGECKO_ASSETS_BASE_URL = bases["coingecko"]
+    MSD.COINMARKETCAP_STATIC_BASE_URL = bases["coingecko"]
+    MSD.CASCOIN_BASE_URL = bases["coingecko"]
+
+    timings = []
+    for i in range(rounds):
+        if not keep_cache:
+            # time the upstream calls, not the source cache
+            with MSD._src_cache_lock:
+                MSD._src_cache.clear()
+        t0 = time.monotonic()
+        out, status = MSD.fetch_coin_stats_gbp()
+        ms = int((time.monotonic() - t0) * 1000)
+        timings.append(ms)
+        bad = {name: st.get("err") for name, st in status.items() if not st.get("ok")}
+        filled = sum(1 for c in out.values() if c.get("price_gbp") is not None or c.get("diff") is not None)
+        print(f"round {i + 1:3d}: {ms:6d} ms  coins with data {filled}/{len(out)}  failed {bad or '-'}")
+
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"\n{rounds} rounds: min {timings[0]} ms, p50 {p50} ms, p95 {p95} ms, max {timings[-1]} ms")
+    print("breakers:", json.dumps(MSD.breaker_snapshot(), indent=2))
+    with _lock:
+        print("mock stats:", json.dumps(stats, indent=2))
+
+
+# =========================
+# START
+# =========================
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Offline stand-ins for the MSD coin APIs")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8799)
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--jitter-ms", type=float, default=0)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=int, default=30)
+    ap.add_argument("--p500", type=float, default=0.0)
+    ap.add_argument("--p-hang", type=float, default=0.0)
+    ap.add_argument("--malformed", type=float, default=0.0)
+    ap.add_argument("--html-change", action="store_true")
+    ap.add_argument("--faults", default="", help='per-service JSON, e.g. \'{"whattomine": {"p500": 1}}\'')
+    ap.add_argument("--bench", type=int, default=0, help="run N coin refresh rounds of MSD.py against the mock and exit")
+    ap.add_argument("--keep-cache", action="store_true", help="bench with MSD's source cache enabled (steady state)")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    _update_faults({"*": {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "p429": args.p429,
+        "retry_after": args.retry_after,
+        "p500": args.p500,
+        "p_hang": args.p_hang,
+        "malformed": args.malformed,
+        "html_change": args.html_change,
+    }})
+    if args.faults:
+        _update_faults(json.loads(args.faults))
+
+    servers = start_servers(args.host, args.port, verbose=args.verbose)
+    for svc, (_, base) in servers.items():
+        print(f"mock {svc:<10} on {base}")
+
+    try:
+        if args.bench > 0:
+            run_bench({svc: base for svc, (_, base) in servers.items()}, args.bench, keep_cache=args.keep_cache)
+        else:
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for srv, _ in servers.values():
+            srv.shutdown()
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+def _failing(items):
+    raise RuntimeError("upstream down")
+
+
+def _setup(monkeypatch, fetched_ago):
+    monkeypatch.setattr(MSD, "_coin_sources", lambda: {"test:price": ("price", _failing, ["BTC"])})
+    monkeypatch.setattr(MSD, "coin_state", {"BTC": {"price_gbp": 50000.0, "diff": 1e14}})
+    monkeypatch.setattr(MSD, "coin_sources", {})
+    monkeypatch.setattr(MSD, "_src_cache", {"test:price": {
+        "value": {"BTC": {"price_gbp": 50000.0}}, "fetched_unix": time.time() - fetched_ago,
+        "err": "upstream down", "neg_until": time.time() + 60, "refreshing": False,
+    }})
+    monkeypatch.setattr(MSD, "record_coin_history", lambda: None)
+    monkeypatch.setattr(MSD, "publish_snapshot", lambda: None)
+
+
+def test_failing_source_keeps_its_value_inside_the_stale_window(monkeypatch):
+    ttls = MSD.SOURCE_CACHE_TTLS["price"]
+    _setup(monkeypatch, ttls["ttl"] + 1)
+    MSD.refresh_coins_once()
+    assert MSD.coin_state["BTC"]["price_gbp"] == 50000.0
+
+
+def test_failing_source_past_the_stale_window_clears_its_coins(monkeypatch):
+    ttls = MSD.SOURCE_CACHE_TTLS["price"]
+    _setup(monkeypatch, ttls["ttl"] + ttls["stale"] + 1)
+    MSD.refresh_coins_once()
+    assert MSD.coin_state["BTC"]["price_gbp"] is None
+    assert MSD.coin_state["BTC"]["diff"] == 1e14
+    assert MSD.coin_sources["test:price"]["ok"] is False
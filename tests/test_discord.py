@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+def test_queueing_an_alert_does_not_touch_the_disk(monkeypatch):
+    writes = []
+    monkeypatch.setattr(MSD, "DISCORD_WEBHOOK_URL", "https://discord.invalid/webhook")
+    monkeypatch.setattr(MSD, "discord_outbox", [])
+    monkeypatch.setattr(MSD, "_outbox_dirty", False)
+    monkeypatch.setattr(MSD, "_safe_write_json", lambda path, obj, **kw: writes.append(obj))
+
+    with MSD._blocks_lock:
+        MSD.send_discord_block_found("bitaxe-1", "12:00:00")
+    assert writes == []
+    assert MSD._outbox_dirty
+
+    MSD._flush_discord_outbox()
+    assert len(writes) == 1
+    assert "bitaxe-1" in writes[0]["items"][0]["content"]
+    MSD._flush_discord_outbox()
+    assert len(writes) == 1
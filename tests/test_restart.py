@@ -0,0 +1,31 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+def test_second_restart_request_gets_409_while_a_run_is_going(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(MSD, "RESTART_API_ENABLED", True)
+    monkeypatch.setattr(MSD, "MINERS", {"a": {"ip": "10.0.0.9"}})
+    monkeypatch.setattr(MSD, "restart_miner_and_wait",
+                        lambda ip: release.wait(5) and {"ok": True, "latency_s": 1.0, "err": None})
+    # a slow thread start must not let a second request through
+    rolling = MSD.restart_miners_rolling
+    monkeypatch.setattr(MSD, "restart_miners_rolling", lambda **kw: (time.sleep(0.3), rolling(**kw))[1])
+    client = MSD.app.test_client()
+
+    assert client.post("/restart_miners", json={}).status_code == 202
+    assert client.post("/restart_miners", json={}).status_code == 409
+    assert MSD.restart_miners_rolling() is None
+
+    release.set()
+    deadline = time.time() + 5
+    while MSD._restart_run_lock.locked() and time.time() < deadline:
+        time.sleep(0.01)
+    assert not MSD._restart_run_lock.locked()
+    assert MSD.restart_snapshot()["run"]["state"] == "done"
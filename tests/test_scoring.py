@@ -0,0 +1,31 @@
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+COLS = {
+    "blocks_week": [0, 2, None, 1],
+    "weekly_best": [3.2e9, None, 8.1e9, 5.0e8],
+    "hr_pct": [98.0, None, 160.0, 71.5],
+    "sph_pct": [101.0, 87.0, None, 40.0],
+    "uptime_frac": [1.0, 0.5, None, 0.99],
+}
+
+
+@pytest.mark.skipif(MSD.np is None, reason="numpy not installed")
+def test_numpy_and_python_scoring_agree_with_missing_values():
+    w = MSD.MOTW_WEIGHTS
+    fast = MSD._score_columns_numpy(COLS, w)
+    slow = MSD._score_columns_python(COLS, w)
+
+    for k in MSD.SCORE_COMPONENTS + ("score",):
+        assert all(math.isfinite(x) for x in fast[k]), k
+        assert fast[k] == pytest.approx(slow[k]), k
+    assert fast["order"] == slow["order"]
+    assert fast["s_diff"][2] == 1.0
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+def _run_online(ip, t0, minutes, per_min=10):
+    step = int(MSD.REFRESH_SECONDS)
+    t = t0
+    for i in range(int(minutes * 60 / step) + 1):
+        t = t0 + i * step
+        MSD.update_share_rates(ip, t, True, i * step * per_min / 60, 0)
+    return t
+
+
+def test_rates_while_online(monkeypatch):
+    monkeypatch.setattr(MSD, "share_rates", {})
+    ip = "10.0.0.2"
+    t = _run_online(ip, 1_800_000, 20)
+    r = MSD.share_rates_for(ip, t)
+    assert abs(r["5m"]["acc_per_min"] - 10) < 1
+    assert abs(r["1h"]["acc_per_min"] - 10) < 1
+
+
+def test_reboot_keeps_the_windows(monkeypatch):
+    monkeypatch.setattr(MSD, "share_rates", {})
+    ip = "10.0.0.4"
+    t = _run_online(ip, 1_800_000, 20)
+    before = MSD.share_rates_for(ip, t)["24h"]
+
+    # miner reboots: 90s without answers, then counters start again from 0
+    MSD.update_share_rates(ip, t + 90, True, 0, 0)
+    MSD.update_share_rates(ip, t + 95, True, 1, 0)
+
+    st = MSD.share_rates[ip]
+    assert st["since_unix"] == 1_800_000
+    assert st["last_accepted"] == 1
+    r = MSD.share_rates_for(ip, t + 95)
+    # the 200 shares from before the reboot are still in the day window, plus the one since
+    assert r["24h"]["seconds"] > before["seconds"]
+    assert abs(r["24h"]["acc_per_min"] * r["24h"]["seconds"] / 60 - 201) < 0.01
+
+
+def test_offline_miner_buckets_expire_against_now(monkeypatch):
+    monkeypatch.setattr(MSD, "share_rates", {})
+    ip = "10.0.0.3"
+    t = _run_online(ip, 1_800_000, 20)
+    for i in range(1, 200):
+        MSD.update_share_rates(ip, t + i * 60, False, None, None)
+
+    r = MSD.share_rates_for(ip, t + 3 * 3600)
+    assert "5m" not in r
+    assert "1h" not in r
+    # 200 shares over the 3h20m since the miner was first seen
+    assert abs(r["24h"]["acc_per_min"] - 1.0) < 0.1
+
+    # 10 minutes after going quiet the 1h window only keeps what is still in it
+    r = MSD.share_rates_for(ip, t + 600)
+    assert "5m" not in r
+    assert r["1h"]["acc_per_min"] < 10
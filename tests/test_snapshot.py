@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+def _boom():
+    raise RuntimeError("build exploded")
+
+
+def test_data_is_503_when_no_snapshot_was_ever_built(monkeypatch):
+    monkeypatch.setattr(MSD, "published", None)
+    monkeypatch.setattr(MSD, "snapshot_last_err", None)
+    monkeypatch.setattr(MSD, "_build_data", _boom)
+
+    r = MSD.app.test_client().get("/data")
+    assert r.status_code == 503
+    assert r.get_json()["error"] == "no data yet"
+    assert "build exploded" in MSD.snapshot_last_err
+
+
+def test_metrics_answers_when_no_snapshot_was_ever_built(monkeypatch):
+    monkeypatch.setattr(MSD, "published", None)
+    monkeypatch.setattr(MSD, "snapshot_last_err", None)
+    monkeypatch.setattr(MSD, "_build_data", _boom)
+
+    r = MSD.app.test_client().get("/metrics")
+    assert r.status_code == 200
+    m = r.get_json()
+    assert m["coin_sources"] is None
+    assert m["snapshot"]["version"] is None
+    assert "build exploded" in m["snapshot"]["last_err"]
+    assert "breakers" in m
+
+
+def test_failed_build_keeps_previous_snapshot(monkeypatch):
+    monkeypatch.setattr(MSD, "published", None)
+    monkeypatch.setattr(MSD, "snapshot_last_err", None)
+    good = {"miners": [{"name": "a", "ip": "10.0.0.1", "online": True}]}
+    monkeypatch.setattr(MSD, "_build_data", lambda: dict(good))
+    monkeypatch.setattr(MSD, "_build_data_v2", lambda out: {"m": []})
+    first = MSD.publish_snapshot()
+    assert first is not None
+
+    monkeypatch.setattr(MSD, "_build_data", _boom)
+    assert MSD.publish_snapshot() is first
+    assert MSD.published is first
+
+    r = MSD.app.test_client().get("/data")
+    assert r.status_code == 200
+    assert r.get_json()["version"] == first.version
@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MSD
+
+
+def _poll(ip, t, accepted, online=True):
+    MSD._update_weekly_agg(ip, t, online, 1.0, accepted, 0, None)
+
+
+def test_shares_during_a_polling_gap_are_not_counted(monkeypatch):
+    monkeypatch.setattr(MSD, "weekly_agg", {})
+    ip = "10.0.0.1"
+    t = 1_000_000
+    step = int(MSD.REFRESH_SECONDS)
+
+    # one hour polled at 40 shares/hour
+    for i in range(int(3600 / step) + 1):
+        _poll(ip, t + i * step, i * step * 40 / 3600)
+    t_end = t + int(3600 / step) * step
+    shares_end = int(3600 / step) * step * 40 / 3600
+
+    # dashboard down for 10h; the miner kept hashing (400 more shares), then one more poll
+    _poll(ip, t_end + 10 * 3600, shares_end + 400)
+    _poll(ip, t_end + 10 * 3600 + step, shares_end + 400 + step * 40 / 3600)
+
+    a = MSD.weekly_agg[ip]
+    sph = a["shares_accepted"] / (a["online_seconds"] / 3600.0)
+    assert abs(sph - 40.0) < 0.5
+    assert a["last_accepted"] == shares_end + 400 + step * 40 / 3600
+
+
+def test_counter_reset_still_counts_shares_after_restart(monkeypatch):
+    monkeypatch.setattr(MSD, "weekly_agg", {})
+    ip = "10.0.0.2"
+    step = int(MSD.REFRESH_SECONDS)
+    _poll(ip, 0 + 1_000_000, 500)
+    _poll(ip, step + 1_000_000, 510)
+    _poll(ip, 2 * step + 1_000_000, 3)   # miner restarted, counter from 0
+    assert MSD.weekly_agg[ip]["shares_accepted"] == 13
+
+
+def test_last_weeks_session_best_is_not_credited_before_the_restart(monkeypatch):
+    ip = "10.0.0.3"
+    rollover = 2_000_000
+    monkeypatch.setattr(MSD, "carried_best", {ip: [5e9, rollover]})
+    up_before = 3 * 86400   # still running since before the rollover
+
+    assert MSD._week_session_best(ip, 5e9, up_before, rollover + 60) is None
+    assert MSD._week_session_best(ip, 5e9, None, rollover + 90) is None   # offline
+    # a higher best found after the rollover is this week's
+    assert MSD._week_session_best(ip, 7e9, up_before + 120, rollover + 120) == 7e9
+    assert ip in MSD.carried_best
+
+    # booted 30s after the rollover: session best is this week's again
+    assert MSD._week_session_best(ip, 1e6, 300, rollover + 330) == 1e6
+    assert ip not in MSD.carried_best
+    assert MSD._week_session_best(ip, 2e6, 305, rollover + 335) == 2e6